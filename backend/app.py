@@ -1,15 +1,31 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+import base64
+import io
+import json
+import itertools
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 from services.gemini_service import GeminiService
 from services.parser_service import ParserService
 from services.latex_service import LatexService
+from services.keyword_scorer import KeywordScorer
+from services.jd_ranker import JDRanker
+from services.tectonic_env import CompileQueueFull
+from services.llm_client import LLMBusy
+from services.job_service import JobQueue
+from services.janitor import OutputJanitor
+from services.browser_pool import BrowserPool
+from services.agent_scheduler import AgentScheduler
+from services.page_analysis_cache import PageAnalysisCache
 from extensions import db, login_manager, bcrypt, migrate
 from routes.auth import auth_bp
-from models import Application, User, Resume
+from models import Application, User, Resume, Job, ParsedResume, AgentRun
 from flask_login import current_user, login_required
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.orm import load_only
 
 load_dotenv()
 
@@ -29,7 +45,7 @@ CORS(app, resources={r"/api/*": {"origins": ["http://localhost:5173", "http://lo
 db.init_app(app)
 login_manager.init_app(app)
 bcrypt.init_app(app)
-migrate.init_app(app, db)
+migrate.init_app(app, db, render_as_batch=True) # batch mode lets SQLite alter constraints
 
 # Register Blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -37,51 +53,293 @@ app.register_blueprint(auth_bp, url_prefix='/api/auth')
 gemini_service = GeminiService()
 parser_service = ParserService()
 latex_service = LatexService()
+keyword_scorer = KeywordScorer()
+jd_ranker = JDRanker(keyword_scorer)
+if os.getenv('TECTONIC_WARMUP', 'false').lower() == 'true':
+    latex_service.warm_up()
+job_queue = JobQueue(app)
+output_janitor = OutputJanitor(latex_service.output_dir, job_queue=job_queue)
+# Chromium is launched on the first auto-apply run, not at import
+browser_pool = BrowserPool()
+page_analysis_cache = PageAnalysisCache(app)
+agent_scheduler = AgentScheduler(app, browser_pool, gemini_service, page_cache=page_analysis_cache)
 
-# Create DB tables
-with app.app_context():
-    db.create_all()
+def _insert_application(**values):
+    """Inserts an Application unless (user_id, company, job_title) already exists.
+
+    Returns (application_id, created). Relies on the unique constraint, so two
+    concurrent requests for the same job can never both create a row.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        insert = None
+    
+    if insert is not None:
+        stmt = insert(Application).values(**values).on_conflict_do_nothing(
+            index_elements=['user_id', 'company', 'job_title']
+        ).returning(Application.id)
+        new_id = db.session.execute(stmt).scalar()
+    else:
+        try:
+            with db.session.begin_nested():
+                new_app = Application(**values)
+                db.session.add(new_app)
+            new_id = new_app.id
+        except IntegrityError:
+            new_id = None
+    
+    if new_id is not None:
+        return new_id, True
+    existing = db.session.query(Application.id).filter_by(
+        user_id=values['user_id'], company=values['company'], job_title=values['job_title']
+    ).scalar()
+    return existing, False
+
+def _save_quick_mode_application(user_id, tailored_data, jd_text):
+    """Creates an Application + Resume for a tailoring run that wasn't started from one."""
+    try:
+        # Extract company/title from tailored data or fallback
+        company = tailored_data.get('experience', [{}])[0].get('company', 'Unknown Company')
+        job_title = tailored_data.get('role', 'Unknown Role')
+        
+        # Skip if it already exists to avoid duplicates in Quick Mode
+        app_id, created = _insert_application(
+            user_id=user_id,
+            job_title=job_title,
+            company=company,
+            jd_text=jd_text,
+            # resume_data=tailored_data, # Deprecated
+            status='Drafting'
+        )
+        if created:
+            # We should probably create a Resume record here too for legacy support?
+            # For now, let's just leave it as is, but maybe add the Resume record.
+            new_resume = Resume(
+                application_id=app_id,
+                json_data=tailored_data
+            )
+            _rendered_latex(new_resume)
+            db.session.add(new_resume)
+        db.session.commit()
+            
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error saving application: {e}")
+
+def _rendered_latex(resume):
+    """Returns the resume's LaTeX, rendering and memoizing it on the row if stale.
+
+    The caller is responsible for committing the session.
+    """
+    if resume.latex_code and resume.template_version == latex_service.template_version:
+        return resume.latex_code
+    if not resume.json_data:
+        return None
+    latex_code = latex_service.render_latex(resume.json_data)
+    if latex_code is not None:
+        resume.latex_code = latex_code
+        resume.template_version = latex_service.template_version
+    return latex_code
+
+# ===== Background job handlers =====
+
+def _tailor(resume_text, jd_text, user_answers, mode=None):
+    """mode "rewrite" parses the resume locally and only asks Gemini to rewrite its content;
+    the default ("full", or TAILOR_MODE) has Gemini parse and rewrite the whole text."""
+    if (mode or os.getenv('TAILOR_MODE', 'full')) == 'rewrite':
+        structured = parser_service.parse_structured(resume_text)
+        if structured['experience']:
+            return gemini_service.rewrite_resume(structured, jd_text, user_answers)
+        print("Structured parse found no experience; falling back to full tailoring")
+    return gemini_service.tailor_resume(resume_text, jd_text, user_answers)
+
+@job_queue.handler('tailor_resume')
+def run_tailor_resume_job(payload):
+    tailored_data = _tailor(payload['resume_text'], payload['jd_text'], payload.get('user_answers', []), payload.get('mode'))
+    latex_code = latex_service.render_latex(tailored_data)
+    if payload.get('user_id') and not payload.get('application_id'):
+        _save_quick_mode_application(payload['user_id'], tailored_data, payload['jd_text'])
+    return {"tailored_data": tailored_data, "latex_code": latex_code}
+
+@job_queue.handler('analyze_and_score')
+def run_analyze_and_score_job(payload):
+    return gemini_service.analyze_and_score(payload['resume_text'], payload['jd_text'])
+
+@job_queue.handler('generate_pdf')
+def run_generate_pdf_job(payload):
+    return {"pdf_path": latex_service.generate_pdf(payload['data'])}
+
+@job_queue.handler('compile_latex')
+def run_compile_latex_job(payload):
+    return {"pdf_path": latex_service.compile_pdf_from_string(payload['latex_code'])}
+
+def _scoring_mode(data):
+    """'local' for the keyword scorer, otherwise the LLM; from ?mode= or the JSON body."""
+    return request.args.get('mode') or data.get('mode') or 'llm'
+
+def _send_pdf(pdf_bytes, filename='resume.pdf'):
+    return send_file(io.BytesIO(pdf_bytes), mimetype='application/pdf', as_attachment=True, download_name=filename)
+
+def _busy_response(e):
+    """503 telling the client when the LaTeX compile or LLM queue should have room again."""
+    return jsonify({"error": str(e)}), 503, {"Retry-After": str(e.retry_after)}
+
+@app.errorhandler(LLMBusy)
+def llm_busy(e):
+    return _busy_response(e)
+
+def _enqueue(kind, payload):
+    """Queues a job and returns the 202 response pointing at its status URL."""
+    user_id = current_user.id if current_user.is_authenticated else None
+    job = job_queue.submit(kind, dict(payload, user_id=user_id), user_id=user_id)
+    return jsonify({"job_id": job.id, "status": job.status, "status_url": f"/api/jobs/{job.id}"}), 202
+
+def start_background_work():
+    """Starts the output janitor and picks up jobs and agent runs left behind by a previous worker.
+
+    Called once per serving process (gunicorn's post_worker_init hook in
+    gunicorn.conf.py, or `python app.py`), never at import: `flask db upgrade`
+    imports this module too, and work it claimed would be stranded in
+    "running" when the command exits.
+    """
+    output_janitor.start()
+    # Schema is managed by Flask-Migrate (`flask db upgrade`); recover once the tables exist
+    with app.app_context():
+        try:
+            job_queue.recover()
+            agent_scheduler.recover()
+        except (OperationalError, ProgrammingError) as e:
+            db.session.rollback()
+            print(f"Skipping job recovery, database not migrated yet: {e.__class__.__name__}")
 
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy"}), 200
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    return jsonify({
+        "llm_cache": gemini_service.cache.stats(),
+        "llm": gemini_service.llm.metrics(),
+        "pdf_cache": latex_service.pdf_cache.stats(),
+        "latex_compile": latex_service.tectonic.metrics(),
+        "jd_ranker": jd_ranker.stats(),
+        "browser_pool": browser_pool.stats(),
+        "agent_runs": agent_scheduler.stats(),
+        "page_analysis": page_analysis_cache.stats()
+    })
+
+class UnknownResumeHash(Exception):
+    pass
+
+@app.errorhandler(UnknownResumeHash)
+def unknown_resume_hash(e):
+    return jsonify({"error": "Unknown resume_hash, please upload the resume again"}), 404
+
+def _upload_owner():
+    return current_user.id if current_user.is_authenticated else None
+
+def _resume_text(data):
+    """resume_text from the body, or the cached parse named by resume_hash.
+    
+    Anonymous uploads stay usable after logging in; other users' uploads are never visible.
+    """
+    if data.get('resume_text') or not data.get('resume_hash'):
+        return data.get('resume_text')
+    owners = [ParsedResume.user_id.is_(None)]
+    if current_user.is_authenticated:
+        owners.append(ParsedResume.user_id == current_user.id)
+    parsed = ParsedResume.query.filter(ParsedResume.file_hash == data['resume_hash'], or_(*owners)).first()
+    if parsed is None:
+        raise UnknownResumeHash()
+    return parsed.text
+
 @app.route('/api/parse-resume', methods=['POST'])
 def parse_resume():
     if 'resume' not in request.files:
         return jsonify({"error": "No resume file provided"}), 400
     
     file = request.files['resume']
+    file_hash = parser_service.file_hash(file)
+    
+    # The same file is usually uploaded many times; only parse it once per user
+    user_id = _upload_owner()
+    parsed = ParsedResume.query.filter_by(user_id=user_id, file_hash=file_hash).first()
+    if parsed:
+        return jsonify({"text": parsed.text, "resume_hash": file_hash, "cached": True})
+    
     text = parser_service.extract_text(file)
-    return jsonify({"text": text})
+    if parser_service.is_error(text):
+        return jsonify({"text": text})
+    
+    try:
+        db.session.add(ParsedResume(user_id=user_id, file_hash=file_hash, filename=file.filename, text=text))
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent upload of the same file got there first
+        db.session.rollback()
+    return jsonify({"text": text, "resume_hash": file_hash, "cached": False})
 
 @app.route('/api/analyze-gap', methods=['POST'])
 def analyze_gap():
     data = request.json
-    resume_text = data.get('resume_text')
+    resume_text = _resume_text(data)
     jd_text = data.get('jd_text')
     
     if not resume_text or not jd_text:
         return jsonify({"error": "Missing resume or JD text"}), 400
         
+    if _scoring_mode(data) == 'local':
+        return jsonify(keyword_scorer.analyze_gap(resume_text, jd_text))
+        
     analysis = gemini_service.analyze_gap(resume_text, jd_text)
     return jsonify(analysis)
 
 @app.route('/api/score-resume', methods=['POST'])
 def score_resume():
     data = request.json
-    resume_text = data.get('resume_text')
+    resume_text = _resume_text(data)
     jd_text = data.get('jd_text')
     
+    if _scoring_mode(data) == 'local':
+        if not resume_text or not jd_text:
+            return jsonify({"error": "Missing resume or JD text"}), 400
+        return jsonify(keyword_scorer.score_resume(resume_text, jd_text))
+    
     score_data = gemini_service.score_resume(resume_text, jd_text)
     return jsonify(score_data)
 
+@app.route('/api/analyze-and-score', methods=['POST'])
+def analyze_and_score():
+    data = request.json
+    resume_text = _resume_text(data)
+    jd_text = data.get('jd_text')
+    
+    if not resume_text or not jd_text:
+        return jsonify({"error": "Missing resume or JD text"}), 400
+        
+    if request.args.get('async'):
+        return _enqueue('analyze_and_score', {"resume_text": resume_text, "jd_text": jd_text})
+        
+    result = gemini_service.analyze_and_score(resume_text, jd_text)
+    return jsonify(result)
+
 @app.route('/api/generate-pdf', methods=['POST'])
 def generate_pdf():
     data = request.json
+    if request.args.get('async'):
+        return _enqueue('generate_pdf', {"data": data})
+        
     # This expects the final merged data structure
-    pdf_path = latex_service.generate_pdf(data)
-    return send_file(pdf_path, as_attachment=True)
+    try:
+        pdf_bytes = latex_service.generate_pdf_bytes(data)
+    except CompileQueueFull as e:
+        return _busy_response(e)
+    return _send_pdf(pdf_bytes)
 
 @app.route('/api/compile-latex', methods=['POST'])
 def compile_latex():
@@ -91,12 +349,52 @@ def compile_latex():
     if not latex_code:
         return jsonify({"error": "No LaTeX code provided"}), 400
         
+    if request.args.get('async'):
+        return _enqueue('compile_latex', {"latex_code": latex_code})
+        
     try:
-        pdf_path = latex_service.compile_pdf_from_string(latex_code)
-        return send_file(pdf_path, as_attachment=True)
+        pdf_bytes = latex_service.compile_pdf_bytes(latex_code)
+        return _send_pdf(pdf_bytes)
+    except CompileQueueFull as e:
+        return _busy_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = db.session.get(Job, job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    if job.user_id and (not current_user.is_authenticated or job.user_id != current_user.id):
+        return jsonify({"error": "Unauthorized"}), 403
+        
+    result = job.result
+    if result and 'pdf_path' in result:
+        # Never leak server paths; the PDF is fetched through its own route
+        result = {"download_url": f"/api/jobs/{job.id}/pdf"}
+        
+    return jsonify({
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'result': result,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'updated_at': job.updated_at.isoformat() if job.updated_at else None
+    })
+
+@app.route('/api/jobs/<job_id>/pdf', methods=['GET'])
+def get_job_pdf(job_id):
+    job = db.session.get(Job, job_id)
+    if not job or job.status != 'done' or not (job.result or {}).get('pdf_path'):
+        return jsonify({"error": "PDF not available"}), 404
+    if job.user_id and (not current_user.is_authenticated or job.user_id != current_user.id):
+        return jsonify({"error": "Unauthorized"}), 403
+    if not os.path.exists(job.result['pdf_path']):
+        # Pruned from output/ by the janitor; the job has to be resubmitted
+        return jsonify({"error": "PDF has expired"}), 410
+    return send_file(job.result['pdf_path'], as_attachment=True)
+
 @app.route('/api/initiate-tailoring', methods=['POST'])
 @login_required
 def initiate_tailoring():
@@ -109,14 +407,21 @@ def initiate_tailoring():
     if not company_name or not job_title:
         return jsonify({"error": "Company name and Job title are required"}), 400
         
-    # Check if application exists
-    existing_app = Application.query.filter_by(
-        user_id=current_user.id,
-        company=company_name,
-        job_title=job_title
-    ).first()
-    
-    if existing_app:
+    try:
+        # Insert-or-reuse in one statement; the unique constraint makes it race-free
+        app_id, created = _insert_application(
+            user_id=current_user.id,
+            company=company_name,
+            job_title=job_title,
+            jd_text=jd_text,
+            job_url=job_url,
+            status='Drafting'
+        )
+        if created:
+            db.session.commit()
+            return jsonify({"application_id": app_id, "status": "created"})
+        
+        existing_app = db.session.get(Application, app_id)
         # Update JD if provided
         if jd_text:
             existing_app.jd_text = jd_text
@@ -128,21 +433,6 @@ def initiate_tailoring():
             "job_title": existing_app.job_title,
             "jd_text": existing_app.jd_text
         }})
-        
-    # Create new application
-    new_app = Application(
-        user_id=current_user.id,
-        company=company_name,
-        job_title=job_title,
-        jd_text=jd_text,
-        job_url=job_url,
-        status='Drafting'
-    )
-    
-    try:
-        db.session.add(new_app)
-        db.session.commit()
-        return jsonify({"application_id": new_app.id, "status": "created"})
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
@@ -169,6 +459,8 @@ def finalize_resume(app_id):
         pdf_path=pdf_path,
         score=score
     )
+    # Render now so application detail reads never have to
+    _rendered_latex(new_resume)
     
     # Update Application status if it was Drafting
     if app_record.status == 'Drafting':
@@ -185,7 +477,7 @@ def finalize_resume(app_id):
 @app.route('/api/tailor-resume', methods=['POST'])
 def tailor_resume():
     data = request.json
-    resume_text = data.get('resume_text')
+    resume_text = _resume_text(data)
     jd_text = data.get('jd_text')
     user_answers = data.get('user_answers', [])
     application_id = data.get('application_id') # Optional now
@@ -193,8 +485,17 @@ def tailor_resume():
     if not resume_text or not jd_text:
         return jsonify({"error": "Missing resume or JD text"}), 400
         
+    if request.args.get('async'):
+        return _enqueue('tailor_resume', {
+            "resume_text": resume_text,
+            "jd_text": jd_text,
+            "user_answers": user_answers,
+            "application_id": application_id,
+            "mode": data.get('mode')
+        })
+        
     # 1. Use Gemini to rewrite/tailor the resume into structured JSON
-    tailored_data = gemini_service.tailor_resume(resume_text, jd_text, user_answers)
+    tailored_data = _tailor(resume_text, jd_text, user_answers, data.get('mode'))
     
     # 2. Render the LaTeX code (but don't compile yet)
     latex_code = latex_service.render_latex(tailored_data)
@@ -202,35 +503,7 @@ def tailor_resume():
     # 3. Save Application if user is logged in AND application_id is NOT provided (Legacy/Quick Mode)
     # If application_id IS provided, we don't save yet, we wait for finalize-resume
     if current_user.is_authenticated and not application_id:
-        try:
-            # Extract company/title from tailored data or fallback
-            company = tailored_data.get('experience', [{}])[0].get('company', 'Unknown Company')
-            job_title = tailored_data.get('role', 'Unknown Role')
-            
-            # Check if exists to avoid duplicates in Quick Mode
-            existing = Application.query.filter_by(user_id=current_user.id, company=company, job_title=job_title).first()
-            if not existing:
-                new_app = Application(
-                    user_id=current_user.id,
-                    job_title=job_title,
-                    company=company,
-                    jd_text=jd_text,
-                    # resume_data=tailored_data, # Deprecated
-                    status='Drafting'
-                )
-                db.session.add(new_app)
-                db.session.commit()
-                # We should probably create a Resume record here too for legacy support?
-                # For now, let's just leave it as is, but maybe add the Resume record.
-                new_resume = Resume(
-                    application_id=new_app.id,
-                    json_data=tailored_data
-                )
-                db.session.add(new_resume)
-                db.session.commit()
-                
-        except Exception as e:
-            print(f"Error saving application: {e}")
+        _save_quick_mode_application(current_user.id, tailored_data, jd_text)
 
     # 4. Return both the data and the source code
     return jsonify({
@@ -238,19 +511,201 @@ def tailor_resume():
         "latex_code": latex_code
     })
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/tailor-resume/stream', methods=['POST'])
+def tailor_resume_stream():
+    """
+    Same inputs as /api/tailor-resume, answered as Server-Sent Events while Gemini writes:
+      item    {key, index, value}  - an entry of a list section (experience, projects...) is complete
+      section {key, value}         - a top-level section is complete
+      result  {tailored_data, latex_code}
+      error   {error}
+    """
+    data = request.json
+    resume_text = _resume_text(data)
+    jd_text = data.get('jd_text')
+    user_answers = data.get('user_answers', [])
+    application_id = data.get('application_id')
+    
+    if not resume_text or not jd_text:
+        return jsonify({"error": "Missing resume or JD text"}), 400
+    
+    events = gemini_service.tailor_resume_stream(resume_text, jd_text, user_answers)
+    # Pull the first event here so a busy or failing LLM is still a plain 503
+    try:
+        first = next(events)
+    except LLMBusy as e:
+        return _busy_response(e)
+    except Exception as e:
+        print(f"Error in tailor_resume_stream: {e}")
+        return jsonify({"error": str(e)}), 500
+    
+    def generate():
+        try:
+            for event in itertools.chain([first], events):
+                if event[0] == 'item':
+                    yield _sse('item', {"key": event[1], "index": event[2], "value": event[3]})
+                elif event[0] == 'field':
+                    yield _sse('section', {"key": event[1], "value": event[2]})
+                else:
+                    tailored_data = event[1]
+            latex_code = latex_service.render_latex(tailored_data)
+            if current_user.is_authenticated and not application_id:
+                _save_quick_mode_application(current_user.id, tailored_data, jd_text)
+            yield _sse('result', {"tailored_data": tailored_data, "latex_code": latex_code})
+        except Exception as e:
+            print(f"Error in tailor_resume_stream: {e}")
+            yield _sse('error', {"error": str(e)})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no" # Keep nginx/Render proxies from buffering the stream
+    })
+
+APPLICATION_LIST_FIELDS = ('id', 'job_title', 'company', 'job_url', 'status', 'notes', 'created_at')
+
+def _filter_applications(query, args):
+    """Applies the listing filters from the query string; raises ValueError on bad dates."""
+    if args.get('status'):
+        query = query.filter(Application.status == args['status'])
+    if args.get('company'):
+        query = query.filter(func.lower(Application.company) == args['company'].lower())
+    if args.get('since'):
+        query = query.filter(Application.created_at >= _parse_date(args['since']))
+    if args.get('until'):
+        query = query.filter(Application.created_at <= _parse_date(args['until']))
+    if args.get('q'):
+        pattern = f"%{args['q']}%"
+        query = query.filter(or_(
+            Application.job_title.ilike(pattern),
+            Application.company.ilike(pattern),
+            Application.notes.ilike(pattern)
+        ))
+    return query
+
+def _parse_date(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+
+def _encode_cursor(app):
+    raw = f"{app.created_at.isoformat()}|{app.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    created_at, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(created_at), int(last_id)
+
 @app.route('/api/applications', methods=['GET'])
 @login_required
 def get_applications():
-    apps = Application.query.filter_by(user_id=current_user.id).order_by(Application.created_at.desc()).all()
-    return jsonify([{
-        'id': app.id,
-        'job_title': app.job_title,
-        'company': app.company,
-        'job_url': app.job_url,
-        'status': app.status,
-        'notes': app.notes,
-        'created_at': app.created_at.isoformat()
-    } for app in apps])
+    """Lists the user's applications, newest first.
+
+    Query params (all optional):
+      status, company        - exact-match filters (company is case-insensitive)
+      since, until           - ISO dates bounding created_at
+      q                      - substring search over title, company and notes
+      fields                 - comma-separated subset of the listing columns
+      limit, cursor          - keyset pagination; when either is given the response
+                               is {"items", "next_cursor", "total", "status_counts"}
+                               instead of a bare list
+    """
+    fields = request.args.get('fields')
+    fields = [f for f in fields.split(',') if f in APPLICATION_LIST_FIELDS] if fields else list(APPLICATION_LIST_FIELDS)
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    
+    query = Application.query.filter(Application.user_id == current_user.id)
+    try:
+        query = _filter_applications(query, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Never pull jd_text (or anything else not requested) for the listing
+    columns = [getattr(Application, f) for f in fields]
+    if 'created_at' not in fields:
+        columns.append(Application.created_at)
+    ordered = query.options(load_only(*columns)).order_by(Application.created_at.desc(), Application.id.desc())
+    
+    def serialize(app):
+        item = {f: getattr(app, f) for f in fields}
+        if 'created_at' in item:
+            item['created_at'] = app.created_at.isoformat()
+        return item
+    
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return jsonify([serialize(app) for app in ordered.all()])
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            created_at, last_id = _decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        ordered = ordered.filter(or_(
+            Application.created_at < created_at,
+            and_(Application.created_at == created_at, Application.id < last_id)
+        ))
+    
+    page = ordered.limit(limit + 1).all()
+    has_more = len(page) > limit
+    page = page[:limit]
+    
+    status_counts = dict(
+        query.with_entities(Application.status, func.count(Application.id))
+        .group_by(Application.status)
+        .all()
+    )
+    
+    return jsonify({
+        'items': [serialize(app) for app in page],
+        'next_cursor': _encode_cursor(page[-1]) if has_more else None,
+        'total': sum(status_counts.values()),
+        'status_counts': status_counts
+    })
+
+@app.route('/api/applications/rank', methods=['POST'])
+@login_required
+def rank_applications():
+    """
+    Ranks every saved application with a JD by keyword fit to the posted resume_text.
+    Local scoring only; use /api/score-resume on the top picks for an LLM opinion.
+    """
+    data = request.json or {}
+    resume_text = _resume_text(data)
+    if not resume_text:
+        return jsonify({"error": "Missing resume text"}), 400
+    try:
+        limit = min(max(int(data.get('limit', 20)), 1), 500)
+    except (TypeError, ValueError):
+        return jsonify({"error": "limit must be an integer"}), 400
+    
+    user_id = current_user.id
+    with_jd = Application.query.filter(Application.user_id == user_id, Application.jd_text.isnot(None))
+    versions = dict(with_jd.with_entities(Application.id, Application.updated_at).all())
+    
+    def load(ids):
+        rows = with_jd.filter(Application.id.in_(ids)).with_entities(
+            Application.id, Application.company, Application.job_title, Application.status, Application.jd_text
+        )
+        return [
+            (row.id, {"company": row.company, "job_title": row.job_title, "status": row.status}, row.jd_text)
+            for row in rows
+        ]
+    
+    jd_ranker.sync(user_id, versions, load)
+    return jsonify({
+        "results": jd_ranker.rank(user_id, resume_text, limit=limit),
+        "total": len(versions)
+    })
 
 @app.route('/api/applications/<int:app_id>', methods=['GET'])
 @login_required
@@ -267,12 +722,15 @@ def get_application(app_id):
     
     if latest_resume:
         resume_data = latest_resume.json_data
-        # Regenerate LaTeX code if we have the data
-        if resume_data:
-            try:
-                latex_code = latex_service.render_latex(resume_data)
-            except Exception as e:
-                print(f"Error rendering latex for app {app_id}: {e}")
+        # Memoized on the row; only re-rendered if missing or the template changed
+        try:
+            stale = latest_resume.template_version != latex_service.template_version
+            latex_code = _rendered_latex(latest_resume)
+            if stale and latex_code is not None:
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rendering latex for app {app_id}: {e}")
 
     return jsonify({
         'id': app_record.id,
@@ -377,6 +835,9 @@ def create_application():
             return jsonify({'message': 'Application created', 'id': new_app.id})
         
         return jsonify({'error': 'Invalid request'}), 400
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'An application for this company and job title already exists'}), 409
     except Exception as e:
         db.session.rollback()
         print(f"Error creating/updating application: {e}")
@@ -394,6 +855,8 @@ def delete_application(app_id):
         if app_record.user_id != current_user.id:
             return jsonify({'error': 'Unauthorized'}), 403
         
+        # Keep the run history, just detach it
+        AgentRun.query.filter_by(application_id=app_id).update({'application_id': None})
         db.session.delete(app_record)
         db.session.commit()
         return jsonify({'message': 'Application deleted successfully'})
@@ -405,17 +868,19 @@ def delete_application(app_id):
 
 
 
+def _resume_pdf_path(resume):
+    # Generate a PDF from the resume_data (simplified - in production, retrieve the actual PDF)
+    # For now, we'll assume the PDF exists. In production, you'd generate it here.
+    return resume.pdf_path or os.path.join('output', 'latest_resume.pdf')
+
 @app.route('/api/auto-apply', methods=['POST'])
 @login_required
 def trigger_auto_apply():
-    """Trigger the auto-apply agent"""
+    """Queue an auto-apply agent run; poll /api/auto-apply/<run_id> for progress"""
     # Check for CLOUD_MODE
     if os.getenv('CLOUD_MODE') == 'true':
         return jsonify({'error': 'Agent mode requires local hosting due to cloud memory limits.'}), 400
 
-    import threading
-    import asyncio
-    from services.agent_service import AutoApplyAgent
     from models import UserProfile
     
     data = request.json
@@ -425,21 +890,20 @@ def trigger_auto_apply():
     
     if not job_url:
         return jsonify({'error': 'job_url is required'}), 400
+
+    # The run writes its outcome back to this application
+    if application_id is not None:
+        target = db.session.get(Application, application_id)
+        if not target:
+            return jsonify({'error': 'Application not found'}), 404
+        if target.user_id != current_user.id:
+            return jsonify({'error': 'Unauthorized'}), 403
     
-    # Get user profile
+    # The profile itself is read when the run starts
     profile = UserProfile.query.filter_by(user_id=current_user.id).first()
     if not profile:
         return jsonify({'error': 'Please complete your profile first'}), 400
     
-    profile_dict = {
-        'full_name': profile.full_name,
-        'email': profile.email,
-        'phone': profile.phone,
-        'linkedin_url': profile.linkedin_url,
-        'github_url': profile.github_url,
-        'portfolio_url': profile.portfolio_url
-    }
-    
     # Get the latest resume for this user (or use a specific one)
     latest_app = Application.query.filter_by(user_id=current_user.id).order_by(Application.created_at.desc()).first()
     
@@ -452,36 +916,143 @@ def trigger_auto_apply():
     if not latest_resume:
         return jsonify({'error': 'No resume found for this application.'}), 400
     
-    # Generate a PDF from the resume_data (simplified - in production, retrieve the actual PDF)
-    resume_path = latest_resume.pdf_path or os.path.join('output', 'latest_resume.pdf')
-    # For now, we'll assume the PDF exists. In production, you'd generate it here.
-    
-    def run_agent():
-        """Run the agent in a background thread"""
-        agent = AutoApplyAgent(headless=headless)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(agent.start_application(job_url, profile_dict, resume_path))
-        
-        # Update application status based on result
-        if application_id:
-            app_record = Application.query.get(application_id)
-            if app_record and result.get('success'):
-                app_record.status = 'Applied' if result.get('status') == 'applied' else app_record.status
-                app_record.notes = f"Agent log:\n" + "\n".join(result.get('log', []))
-                db.session.commit()
-        
-        print(f"Agent completed: {result}")
-    
-    # Start agent in background thread
-    thread = threading.Thread(target=run_agent, daemon=True)
-    thread.start()
+    run = agent_scheduler.submit(current_user.id, job_url, _resume_pdf_path(latest_resume), application_id=application_id, headless=headless)
     
     return jsonify({
-        'message': 'Auto-apply agent started',
-        'status': 'running'
+        'message': 'Auto-apply agent queued',
+        'run_id': run.id,
+        'status': run.status,
+        'status_url': f"/api/auto-apply/{run.id}"
+    }), 202
+
+@app.route('/api/auto-apply/batch', methods=['POST'])
+@login_required
+def trigger_auto_apply_batch():
+    """Queue one agent run per application, each with that application's latest resume"""
+    if os.getenv('CLOUD_MODE') == 'true':
+        return jsonify({'error': 'Agent mode requires local hosting due to cloud memory limits.'}), 400
+
+    from models import UserProfile
+
+    data = request.json or {}
+    application_ids = data.get('application_ids')
+    headless = data.get('headless', True)
+    max_batch = int(os.getenv('AGENT_BATCH_MAX', '50'))
+
+    if not isinstance(application_ids, list) or not application_ids:
+        return jsonify({'error': 'application_ids must be a non-empty list'}), 400
+    if len(application_ids) > max_batch:
+        return jsonify({'error': f'At most {max_batch} applications per batch'}), 400
+    if not UserProfile.query.filter_by(user_id=current_user.id).first():
+        return jsonify({'error': 'Please complete your profile first'}), 400
+
+    applications = {
+        a.id: a for a in Application.query.options(load_only(Application.id, Application.job_url))
+        .filter(Application.user_id == current_user.id, Application.id.in_(application_ids))
+    }
+    # Newest resume per application in one indexed query instead of one per application
+    latest = {}
+    resumes = (Resume.query.options(load_only(Resume.id, Resume.application_id, Resume.pdf_path, Resume.created_at))
+               .filter(Resume.application_id.in_(list(applications)))
+               .order_by(Resume.application_id, Resume.created_at.desc()))
+    for resume in resumes:
+        latest.setdefault(resume.application_id, resume)
+
+    items, skipped = [], []
+    for app_id in dict.fromkeys(application_ids):
+        application = applications.get(app_id)
+        if application is None:
+            skipped.append({'application_id': app_id, 'reason': 'Application not found'})
+        elif not application.job_url:
+            skipped.append({'application_id': app_id, 'reason': 'No job URL'})
+        elif app_id not in latest:
+            skipped.append({'application_id': app_id, 'reason': 'No resume found for this application'})
+        else:
+            items.append({'application_id': app_id, 'job_url': application.job_url,
+                          'resume_path': _resume_pdf_path(latest[app_id])})
+
+    if not items:
+        return jsonify({'error': 'No applications could be queued', 'skipped': skipped}), 400
+
+    runs = agent_scheduler.submit_batch(current_user.id, items, headless=headless)
+    batch_id = runs[0].batch_id
+    return jsonify({
+        'batch_id': batch_id,
+        'runs': [{'application_id': run.application_id, 'run_id': run.id} for run in runs],
+        'skipped': skipped,
+        'status_url': f"/api/auto-apply/batch/{batch_id}"
+    }), 202
+
+@app.route('/api/auto-apply/batch/<batch_id>', methods=['GET'])
+@login_required
+def get_auto_apply_batch(batch_id):
+    progress = agent_scheduler.batch_progress(batch_id, current_user.id)
+    if progress is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    return jsonify(progress)
+
+@app.route('/api/auto-apply/batch/<batch_id>/cancel', methods=['POST'])
+@login_required
+def cancel_auto_apply_batch(batch_id):
+    if agent_scheduler.batch_progress(batch_id, current_user.id) is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    cancelled = agent_scheduler.cancel_batch(batch_id, current_user.id)
+    return jsonify({'batch_id': batch_id, 'cancelled': cancelled})
+
+def _agent_run_or_error(run_id):
+    run = db.session.get(AgentRun, run_id)
+    if not run:
+        return None, (jsonify({'error': 'Run not found'}), 404)
+    if run.user_id != current_user.id:
+        return None, (jsonify({'error': 'Unauthorized'}), 403)
+    return run, None
+
+@app.route('/api/auto-apply/<run_id>', methods=['GET'])
+@login_required
+def get_auto_apply_run(run_id):
+    run, error = _agent_run_or_error(run_id)
+    if error:
+        return error
+    # Runs executing in this worker report their log as it grows
+    log = agent_scheduler.live_log(run.id)
+    return jsonify({
+        'id': run.id,
+        'application_id': run.application_id,
+        'job_url': run.job_url,
+        'status': run.status,
+        'outcome': run.outcome,
+        'log': log if log is not None else (run.log.split('\n') if run.log else []),
+        'has_screenshot': bool(run.screenshot_path),
+        'error': run.error,
+        'cancel_requested': bool(run.cancel_requested),
+        'created_at': run.created_at.isoformat(),
+        'updated_at': run.updated_at.isoformat() if run.updated_at else None
     })
 
+@app.route('/api/auto-apply/<run_id>/cancel', methods=['POST'])
+@login_required
+def cancel_auto_apply_run(run_id):
+    run, error = _agent_run_or_error(run_id)
+    if error:
+        return error
+    if not agent_scheduler.cancel(run.id):
+        return jsonify({'error': f'Run already {run.status}'}), 409
+    db.session.refresh(run)
+    return jsonify({'id': run.id, 'status': run.status, 'cancel_requested': bool(run.cancel_requested)})
+
+@app.route('/api/auto-apply/<run_id>/screenshot', methods=['GET'])
+@login_required
+def get_auto_apply_screenshot(run_id):
+    run, error = _agent_run_or_error(run_id)
+    if error:
+        return error
+    if not run.screenshot_path or not os.path.exists(run.screenshot_path):
+        return jsonify({'error': 'Screenshot not available'}), 404
+    return send_file(os.path.abspath(run.screenshot_path), mimetype='image/png')
+
 
 if __name__ == '__main__':
+    # With the reloader on, only the child process serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_work()
     app.run(debug=True, port=5000)
@@ -0,0 +1,74 @@
+"""Benchmark for resume text extraction over large synthetic PDFs.
+
+Compares the previous string-concatenation loop with the generator/join
+pipeline, in-process and through the parser process pool.
+
+Usage (from backend/):
+    python benchmarks/bench_parser.py [pages ...]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+from reportlab.pdfgen import canvas
+from werkzeug.datastructures import FileStorage
+
+from services.parser_service import ParserService
+
+
+def synthetic_pdf(pages, lines_per_page=45):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page in range(pages):
+        for line in range(lines_per_page):
+            pdf.drawString(40, 800 - line * 17, f"p{page} l{line}: Led migration of services to Kubernetes, cutting costs 30%")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def concatenating_extract(content):
+    """The previous implementation, kept here for comparison."""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() + "\n"
+    return text
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    page_counts = [int(p) for p in sys.argv[1:]] or [10, 100, 500]
+    for pages in page_counts:
+        content = synthetic_pdf(pages)
+        in_process = ParserService(max_pages=pages, max_bytes=len(content) + 1, workers=0)
+        pooled = ParserService(max_pages=pages, max_bytes=len(content) + 1, workers=1, timeout=600)
+        upload = lambda: FileStorage(stream=io.BytesIO(content), filename='resume.pdf')
+        pooled.extract_text(upload())  # start the worker process outside the timing
+
+        old_seconds, old_text = timed(lambda: concatenating_extract(content))
+        new_seconds, new_text = timed(lambda: in_process.extract_text(upload()))
+        pool_seconds, _ = timed(lambda: pooled.extract_text(upload()))
+        capped_seconds, _ = timed(lambda: ParserService(workers=0).extract_text(upload()))
+        pooled.close()
+
+        assert old_text == new_text
+        print(f"{pages:4d} pages, {len(content) / 1024:7.0f} KB, {len(new_text):8d} chars: "
+              f"concat {old_seconds * 1000:8.1f} ms | join {new_seconds * 1000:8.1f} ms | "
+              f"pool {pool_seconds * 1000:8.1f} ms | default page cap {capped_seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Micro-benchmark for LaTeX rendering on the get_application read path.
+
+Usage (from backend/):
+    python benchmarks/bench_render.py [iterations]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.latex_service import LatexService, WARMUP_RESUME
+
+
+def chained_replace_escape(value):
+    """The previous ten-pass implementation, kept here for comparison."""
+    if not isinstance(value, str):
+        return value
+    return value.replace('\\', '\\textbackslash{}') \
+                .replace('&', '\\&') \
+                .replace('%', '\\%') \
+                .replace('$', '\\$') \
+                .replace('#', '\\#') \
+                .replace('_', '\\_') \
+                .replace('{', '\\{') \
+                .replace('}', '\\}') \
+                .replace('~', '\\textasciitilde{}') \
+                .replace('^', '\\textasciicircum{}')
+
+
+def sample_resume():
+    data = dict(WARMUP_RESUME)
+    data["objective"] = "Built R&D pipelines for 100% of #ML_ops teams, saving $2M ~ annually. " * 3
+    data["experience"] = [
+        {
+            "title": "Senior Engineer", "company": f"Company {i} & Co", "location": "City", "dates": "2019-2023",
+            "points": [f"Improved p99 latency by {j * 10}% using C_{{fast}} paths" for j in range(6)]
+        }
+        for i in range(5)
+    ]
+    return data
+
+
+def per_call_us(fn, number):
+    return timeit.timeit(fn, number=number) / number * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    service = LatexService()
+    data = sample_resume()
+    text = data["objective"]
+
+    plain = "Senior Software Engineer"
+    # The previous code looked the template up per render with auto_reload on
+    reloading_env = service.env.overlay(auto_reload=True)
+
+    print(f"latex_escape, special chars (previous): {per_call_us(lambda: chained_replace_escape(text), iterations * 10):8.2f} us")
+    print(f"latex_escape, special chars (current):  {per_call_us(lambda: service.latex_escape(text), iterations * 10):8.2f} us")
+    print(f"latex_escape, plain text (previous):    {per_call_us(lambda: chained_replace_escape(plain), iterations * 10):8.2f} us")
+    print(f"latex_escape, plain text (current):     {per_call_us(lambda: service.latex_escape(plain), iterations * 10):8.2f} us")
+    print(f"render via get_template (previous):     {per_call_us(lambda: reloading_env.get_template('resume.tex').render(data), iterations):8.2f} us")
+    print(f"render_latex, precompiled (current):    {per_call_us(lambda: service.render_latex(data), iterations):8.2f} us")
+
+    batch = [data] * 100
+    batch_us = per_call_us(lambda: service.render_many(batch), max(1, iterations // 100))
+    print(f"render_many (100 resumes):              {batch_us:8.2f} us ({batch_us / len(batch):.2f} us/resume)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+# gunicorn settings, passed with -c in the Dockerfile CMD
+
+
+def post_worker_init(worker):
+    # Per worker, after app.py is imported; not at import, so `flask db upgrade` doesn't claim queued work
+    from app import start_background_work
+    start_background_work()
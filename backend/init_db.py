@@ -1,8 +1,9 @@
-from app import app, db
-from models import User, Application
+from app import app
+from flask_migrate import upgrade
+from models import User
 
 with app.app_context():
-    db.create_all()
+    upgrade()
     print("Database initialized!")
     
     # Check if we can access User table
@@ -1,5 +1,6 @@
 import os
 from app import app, db
+from flask_migrate import upgrade
 from sqlalchemy import text
 
 def init_supabase_db():
@@ -23,9 +24,9 @@ def init_supabase_db():
             db.session.execute(text('SELECT 1'))
             print("Connection successful.")
             
-            # Create tables
-            print("Creating tables...")
-            db.create_all()
+            # Create/upgrade tables
+            print("Applying migrations...")
+            upgrade()
             print("Tables created successfully.")
             
         except Exception as e:
@@ -0,0 +1,141 @@
+"""baseline schema
+
+Brings any database created before migrations existed (by db.create_all or
+the old migrate_db.py script) up to the schema at the time Flask-Migrate was
+introduced. Every step is skipped if the table, column or index is already
+there, so it is safe on fresh and on existing databases alike.
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-18 11:32:01.658228
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    def columns(table):
+        return {c['name'] for c in inspector.get_columns(table)}
+
+    def indexes(table):
+        return {i['name'] for i in inspector.get_indexes(table)}
+
+    if 'user' not in tables:
+        op.create_table('user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=128), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+        )
+
+    if 'application' not in tables:
+        op.create_table('application',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('job_title', sa.String(length=100), nullable=False),
+        sa.Column('company', sa.String(length=100), nullable=False),
+        sa.Column('job_url', sa.String(length=500), nullable=True),
+        sa.Column('jd_text', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    else:
+        existing = columns('application')
+        with op.batch_alter_table('application', schema=None) as batch_op:
+            if 'job_url' not in existing:
+                batch_op.add_column(sa.Column('job_url', sa.String(length=500), nullable=True))
+            if 'notes' not in existing:
+                batch_op.add_column(sa.Column('notes', sa.Text(), nullable=True))
+
+    existing = indexes('application') if 'application' in tables else set()
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        if 'ix_application_user_created' not in existing:
+            batch_op.create_index('ix_application_user_created', ['user_id', 'created_at'], unique=False)
+        if 'ix_application_user_status' not in existing:
+            batch_op.create_index('ix_application_user_status', ['user_id', 'status'], unique=False)
+
+    if 'job' not in tables:
+        op.create_table('job',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('job', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_job_status'), ['status'], unique=False)
+
+    if 'user_profile' not in tables:
+        op.create_table('user_profile',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('full_name', sa.String(length=100), nullable=True),
+        sa.Column('email', sa.String(length=120), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('linkedin_url', sa.String(length=200), nullable=True),
+        sa.Column('github_url', sa.String(length=200), nullable=True),
+        sa.Column('portfolio_url', sa.String(length=200), nullable=True),
+        sa.Column('work_auth_status', sa.String(length=50), nullable=True),
+        sa.Column('disability_status', sa.String(length=50), nullable=True),
+        sa.Column('veteran_status', sa.String(length=50), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'resume' not in tables:
+        op.create_table('resume',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('application_id', sa.Integer(), nullable=False),
+        sa.Column('json_data', sa.JSON(), nullable=False),
+        sa.Column('latex_code', sa.Text(), nullable=True),
+        sa.Column('template_version', sa.String(length=64), nullable=True),
+        sa.Column('pdf_path', sa.String(length=200), nullable=True),
+        sa.Column('score', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['application_id'], ['application.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    else:
+        existing = columns('resume')
+        with op.batch_alter_table('resume', schema=None) as batch_op:
+            if 'latex_code' not in existing:
+                batch_op.add_column(sa.Column('latex_code', sa.Text(), nullable=True))
+            if 'template_version' not in existing:
+                batch_op.add_column(sa.Column('template_version', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_table('resume')
+    op.drop_table('user_profile')
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_job_status'))
+
+    op.drop_table('job')
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.drop_index('ix_application_user_status')
+        batch_op.drop_index('ix_application_user_created')
+
+    op.drop_table('application')
+    op.drop_table('user')
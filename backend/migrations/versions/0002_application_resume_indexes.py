@@ -0,0 +1,95 @@
+"""unique application per job and latest-resume index
+
+Merges duplicate (user_id, company, job_title) applications into the oldest
+one, moving their resumes over, before adding the unique constraint that
+makes application creation an atomic insert-or-reuse. Nothing is dropped:
+the kept row takes the furthest status and any missing job URL / JD, and
+each duplicate's notes (and a JD that differs) are appended to its notes.
+
+Revision ID: 0002_application_resume_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 11:40:12.104417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_application_resume_indexes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+# Pipeline order; a merged application keeps the furthest stage any duplicate reached
+STATUS_ORDER = ['Wishlist', 'Drafting', 'Ready to Apply', 'Applied', 'Interviewing', 'Offer', 'Rejected']
+
+application = sa.table(
+    'application',
+    sa.column('id', sa.Integer), sa.column('user_id', sa.Integer), sa.column('company', sa.String),
+    sa.column('job_title', sa.String), sa.column('job_url', sa.String), sa.column('jd_text', sa.Text),
+    sa.column('status', sa.String), sa.column('notes', sa.Text),
+)
+resume = sa.table('resume', sa.column('application_id', sa.Integer))
+
+
+def _rank(status):
+    return STATUS_ORDER.index(status) if status in STATUS_ORDER else -1
+
+
+def _merge(keeper, duplicates):
+    """Values for the kept row that carry over everything the duplicates hold."""
+    merged = {'job_url': keeper.job_url, 'jd_text': keeper.jd_text, 'status': keeper.status}
+    notes = [keeper.notes] if keeper.notes else []
+    for dup in duplicates:
+        merged['job_url'] = merged['job_url'] or dup.job_url
+        if _rank(dup.status) > _rank(merged['status']):
+            merged['status'] = dup.status
+        extra = []
+        if dup.notes:
+            extra.append(dup.notes)
+        if dup.jd_text and dup.jd_text != merged['jd_text']:
+            if merged['jd_text']:
+                extra.append(f"Job description:\n{dup.jd_text}")
+            else:
+                merged['jd_text'] = dup.jd_text
+        if extra:
+            notes.append(f"[Merged from duplicate application #{dup.id}]\n" + "\n\n".join(extra))
+    merged['notes'] = "\n\n".join(notes) or None
+    return merged
+
+
+def upgrade():
+    bind = op.get_bind()
+    groups = bind.execute(
+        sa.select(application.c.user_id, application.c.company, application.c.job_title)
+        .group_by(application.c.user_id, application.c.company, application.c.job_title)
+        .having(sa.func.count() > 1)
+    ).fetchall()
+    for user_id, company, job_title in groups:
+        rows = bind.execute(
+            sa.select(application).where(
+                application.c.user_id == user_id, application.c.company == company, application.c.job_title == job_title
+            ).order_by(application.c.id)
+        ).fetchall()
+        keeper, duplicates = rows[0], rows[1:]
+        dup_ids = [dup.id for dup in duplicates]
+        print(f"Merging applications {dup_ids} into #{keeper.id} ({company} / {job_title})")
+        bind.execute(application.update().where(application.c.id == keeper.id).values(**_merge(keeper, duplicates)))
+        bind.execute(resume.update().where(resume.c.application_id.in_(dup_ids)).values(application_id=keeper.id))
+        bind.execute(application.delete().where(application.c.id.in_(dup_ids)))
+
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_application_user_company_title', ['user_id', 'company', 'job_title'])
+
+    with op.batch_alter_table('resume', schema=None) as batch_op:
+        batch_op.create_index('ix_resume_application_created', ['application_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('resume', schema=None) as batch_op:
+        batch_op.drop_index('ix_resume_application_created')
+
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_application_user_company_title', type_='unique')
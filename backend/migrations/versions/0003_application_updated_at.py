@@ -0,0 +1,31 @@
+"""application.updated_at
+
+Lets the per-user JD ranking cache detect edited applications without
+reading every jd_text. Existing rows are backfilled from created_at.
+
+Revision ID: 0003_application_updated_at
+Revises: 0002_application_resume_indexes
+Create Date: 2026-10-18 14:05:37.512904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_application_updated_at'
+down_revision = '0002_application_resume_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE application SET updated_at = created_at WHERE updated_at IS NULL")
+
+
+def downgrade():
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,43 @@
+"""parsed_resume cache
+
+Extracted resume text keyed by (user, SHA-256 of the uploaded file), so
+repeat uploads skip parsing and later requests can send the hash instead
+of the text.
+
+Revision ID: 0004_parsed_resume
+Revises: 0003_application_updated_at
+Create Date: 2026-10-18 16:22:48.930215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_parsed_resume'
+down_revision = '0003_application_updated_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('parsed_resume',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('file_hash', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'file_hash', name='uq_parsed_resume_user_hash')
+    )
+    with op.batch_alter_table('parsed_resume', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_parsed_resume_file_hash'), ['file_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('parsed_resume', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_parsed_resume_file_hash'))
+
+    op.drop_table('parsed_resume')
@@ -0,0 +1,50 @@
+"""agent_run table
+
+Persisted auto-apply runs, so their status, log and screenshot can be polled
+and a run can be cancelled from any worker.
+
+Revision ID: 0005_agent_run
+Revises: 0004_parsed_resume
+Create Date: 2026-10-18 19:05:12.417730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_agent_run'
+down_revision = '0004_parsed_resume'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('agent_run',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('application_id', sa.Integer(), nullable=True),
+        sa.Column('job_url', sa.String(length=500), nullable=False),
+        sa.Column('resume_path', sa.String(length=200), nullable=True),
+        sa.Column('headless', sa.Boolean(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('outcome', sa.String(length=30), nullable=True),
+        sa.Column('log', sa.Text(), nullable=True),
+        sa.Column('screenshot_path', sa.String(length=200), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['application_id'], ['application.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('agent_run', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_agent_run_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('agent_run', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_agent_run_status'))
+
+    op.drop_table('agent_run')
@@ -0,0 +1,31 @@
+"""agent_run.batch_id
+
+Groups the runs started by one batch auto-apply request so their progress
+can be reported and cancelled together.
+
+Revision ID: 0006_agent_run_batch
+Revises: 0005_agent_run
+Create Date: 2026-10-18 20:11:37.604519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_agent_run_batch'
+down_revision = '0005_agent_run'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('agent_run', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('batch_id', sa.String(length=36), nullable=True))
+        batch_op.create_index(batch_op.f('ix_agent_run_batch_id'), ['batch_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('agent_run', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_agent_run_batch_id'))
+        batch_op.drop_column('batch_id')
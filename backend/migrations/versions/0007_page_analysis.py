@@ -0,0 +1,38 @@
+"""page_analysis cache
+
+Agent page analyses keyed by job site domain and a fingerprint of the
+page's form controls, so postings on the same ATS skip the LLM.
+
+Revision ID: 0007_page_analysis
+Revises: 0006_agent_run_batch
+Create Date: 2026-10-18 21:02:44.183022
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_page_analysis'
+down_revision = '0006_agent_run_batch'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('page_analysis',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('domain', sa.String(length=255), nullable=False),
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('analysis', sa.JSON(), nullable=False),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('hits', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('domain', 'fingerprint', name='uq_page_analysis_domain_fingerprint')
+    )
+
+
+def downgrade():
+    op.drop_table('page_analysis')
@@ -29,6 +29,14 @@ class UserProfile(db.Model):
     veteran_status = db.Column(db.String(50), nullable=True)
 
 class Application(db.Model):
+    __table_args__ = (
+        # Listing is always per user, newest first, optionally filtered by status
+        db.Index('ix_application_user_created', 'user_id', 'created_at'),
+        db.Index('ix_application_user_status', 'user_id', 'status'),
+        # One application per job; also serves the (user, company, title) dedup lookup
+        db.UniqueConstraint('user_id', 'company', 'job_title', name='uq_application_user_company_title'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     job_title = db.Column(db.String(100), nullable=False)
@@ -41,14 +49,78 @@ class Application(db.Model):
     status = db.Column(db.String(20), default='Wishlist') # Wishlist, Drafting, Applied, Interviewing, Offer, Rejected
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow) # Invalidates cached JD rankings
     
     # Relationship to Resume
     resumes = db.relationship('Resume', backref='application', lazy=True, cascade="all, delete-orphan")
 
 class Resume(db.Model):
+    __table_args__ = (
+        # "Latest resume for an application" lookups
+        db.Index('ix_resume_application_created', 'application_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False)
     json_data = db.Column(db.JSON, nullable=False) # The tailored content
+    latex_code = db.Column(db.Text, nullable=True) # Rendered from json_data, see template_version
+    template_version = db.Column(db.String(64), nullable=True) # Fingerprint of resume.tex used for latex_code
     pdf_path = db.Column(db.String(200), nullable=True)
     score = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ParsedResume(db.Model):
+    """Text extracted from an uploaded resume file, keyed by the SHA-256 of its bytes."""
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'file_hash', name='uq_parsed_resume_user_hash'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True) # None for anonymous uploads
+    file_hash = db.Column(db.String(64), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=True)
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Job(db.Model):
+    id = db.Column(db.String(36), primary_key=True) # uuid4 hex string
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    kind = db.Column(db.String(50), nullable=False) # tailor_resume, analyze_and_score, generate_pdf, compile_latex
+    status = db.Column(db.String(20), default='queued', index=True) # queued, running, done, failed
+    payload = db.Column(db.JSON, nullable=False)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class AgentRun(db.Model):
+    id = db.Column(db.String(36), primary_key=True) # uuid4 hex string
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=True)
+    batch_id = db.Column(db.String(36), nullable=True, index=True) # Set for runs started by /api/auto-apply/batch
+    job_url = db.Column(db.String(500), nullable=False)
+    resume_path = db.Column(db.String(200), nullable=True)
+    headless = db.Column(db.Boolean, default=False)
+    status = db.Column(db.String(20), default='queued', index=True) # queued, running, done, failed, cancelled
+    outcome = db.Column(db.String(30), nullable=True) # Agent result status: applied, form_filled, captcha_detected, error
+    log = db.Column(db.Text, nullable=True)
+    screenshot_path = db.Column(db.String(200), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    cancel_requested = db.Column(db.Boolean, default=False) # Seen by whichever worker owns the run
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class PageAnalysis(db.Model):
+    """Form analysis the agent got from Gemini, reused for pages with the same form structure."""
+    __table_args__ = (
+        db.UniqueConstraint('domain', 'fingerprint', name='uq_page_analysis_domain_fingerprint'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    domain = db.Column(db.String(255), nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False) # SHA-256 of the page's form controls
+    analysis = db.Column(db.JSON, nullable=False)
+    confidence = db.Column(db.Float, default=1.0) # Decays as cached selectors fail; dropped below PAGE_CACHE_MIN_CONFIDENCE
+    hits = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,283 @@
+import asyncio
+import os
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+from extensions import db
+
+FINISHED = ('done', 'failed', 'cancelled')
+
+
+def job_domain(job_url):
+    """Host a run is capped under; "www." is dropped so both spellings share a cap."""
+    host = (urlsplit(job_url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class AgentScheduler:
+    """Runs AutoApplyAgent sessions on the browser pool's event loop.
+
+    Runs are persisted in the `agent_run` table and claimed with a conditional
+    UPDATE, like JobQueue. At most max_runs execute at once per process, and
+    at most domain_limit against any one job site, so a batch of postings on
+    one ATS does not hammer it; the rest wait on the loop without holding a
+    thread. Database work happens in an app context on a helper thread so it
+    never blocks the loop.
+
+    Configuration comes from the environment:
+      AGENT_MAX_RUNS      - concurrent agent runs per worker (default: the browser pool's max contexts)
+      AGENT_DOMAIN_LIMIT  - concurrent runs per job site domain (default 2)
+      AGENT_CANCEL_POLL   - seconds between checks for a cancel sent to another worker (default 5)
+      AGENT_STALE_SECONDS - a run whose heartbeat is this old is failed at startup (default 900)
+    """
+
+    def __init__(self, app, browser_pool, gemini, max_runs=None, domain_limit=None, cancel_poll=None, stale_after=None,
+                 agent_factory=None, page_cache=None):
+        self.app = app
+        self.browser_pool = browser_pool
+        self.gemini = gemini
+        # Runs beyond the pool's contexts would only wait for one
+        self.max_runs = max_runs or int(os.getenv('AGENT_MAX_RUNS', str(browser_pool.max_contexts)))
+        self.domain_limit = domain_limit or int(os.getenv('AGENT_DOMAIN_LIMIT', '2'))
+        self.cancel_poll = cancel_poll or float(os.getenv('AGENT_CANCEL_POLL', '5'))
+        self.stale_after = stale_after or int(os.getenv('AGENT_STALE_SECONDS', '900'))
+        self.page_cache = page_cache
+        self.agent_factory = agent_factory or self._default_agent
+        self.futures = {}
+        self.agents = {}
+        self._semaphore = None
+        self._domains = {}
+
+    def _default_agent(self, headless):
+        from services.agent_service import AutoApplyAgent
+        return AutoApplyAgent(headless=headless, gemini=self.gemini, browser_pool=self.browser_pool, page_cache=self.page_cache)
+
+    def submit(self, user_id, job_url, resume_path, application_id=None, headless=False):
+        item = {'job_url': job_url, 'resume_path': resume_path, 'application_id': application_id}
+        return self._queue(user_id, [item], headless, batch_id=None)[0]
+
+    def submit_batch(self, user_id, items, headless=False):
+        """Queues one run per {job_url, resume_path, application_id} item under a new batch id."""
+        return self._queue(user_id, items, headless, batch_id=uuid.uuid4().hex)
+
+    def _queue(self, user_id, items, headless, batch_id):
+        from models import AgentRun
+
+        runs = [
+            AgentRun(
+                id=uuid.uuid4().hex, user_id=user_id, application_id=item.get('application_id'), batch_id=batch_id,
+                job_url=item['job_url'], resume_path=item['resume_path'], headless=headless, status='queued',
+            )
+            for item in items
+        ]
+        db.session.add_all(runs)
+        db.session.commit()
+        for run in runs:
+            self._dispatch(run.id, run.job_url)
+        return runs
+
+    def batch_progress(self, batch_id, user_id):
+        """Aggregated status of a batch's runs, or None if the user has no such batch."""
+        from models import AgentRun
+
+        runs = AgentRun.query.filter_by(batch_id=batch_id, user_id=user_id).order_by(AgentRun.created_at).all()
+        if not runs:
+            return None
+        counts = Counter(run.status for run in runs)
+        finished = sum(counts[status] for status in FINISHED)
+        return {
+            'batch_id': batch_id,
+            'total': len(runs),
+            'finished': finished,
+            'progress': round(finished / len(runs), 3),
+            'done': finished == len(runs),
+            'counts': {status: counts[status] for status in ('queued', 'running') + FINISHED},
+            'outcomes': dict(Counter(run.outcome for run in runs if run.outcome)),
+            'runs': [
+                {'run_id': run.id, 'application_id': run.application_id, 'domain': job_domain(run.job_url),
+                 'status': run.status, 'outcome': run.outcome, 'error': run.error}
+                for run in runs
+            ],
+        }
+
+    def cancel_batch(self, batch_id, user_id):
+        """Cancels every unfinished run in a batch; returns how many were cancelled."""
+        from models import AgentRun
+
+        runs = db.session.query(AgentRun.id, AgentRun.status).filter(
+            AgentRun.batch_id == batch_id, AgentRun.user_id == user_id, AgentRun.status.notin_(FINISHED)
+        ).all()
+        # Queued runs first: stopping a running one frees a slot a queued run would otherwise claim
+        runs.sort(key=lambda run: run.status == 'running')
+        return sum(1 for run in runs if self.cancel(run.id))
+
+    def _dispatch(self, run_id, job_url):
+        future = self.browser_pool.submit(self._run(run_id, job_domain(job_url)))
+        self.futures[run_id] = future
+        future.add_done_callback(lambda f: self.futures.pop(run_id, None))
+
+    def cancel(self, run_id):
+        """Cancels a queued or running run; returns False if it had already finished."""
+        from models import AgentRun
+
+        cancelled = AgentRun.query.filter_by(id=run_id, status='queued').update({'status': 'cancelled'})
+        if not cancelled:
+            requested = AgentRun.query.filter(AgentRun.id == run_id, AgentRun.status.notin_(FINISHED)).update(
+                {'cancel_requested': True}, synchronize_session=False
+            )
+            if not requested:
+                db.session.rollback()
+                return False
+        db.session.commit()
+        future = self.futures.get(run_id)
+        if future is not None:
+            future.cancel()
+        return True
+
+    def live_log(self, run_id):
+        """Log lines of a run executing in this process, or None."""
+        agent = self.agents.get(run_id)
+        return list(agent.status_log) if agent is not None else None
+
+    def recover(self):
+        """Re-dispatches queued runs; runs left "running" by a dead worker are failed, not retried.
+
+        A live run refreshes updated_at every cancel_poll seconds, so only runs
+        whose heartbeat stopped more than stale_after ago count as dead.
+        """
+        from models import AgentRun
+
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        AgentRun.query.filter(AgentRun.status == 'running', AgentRun.updated_at < cutoff).update(
+            {'status': 'failed', 'error': 'Interrupted by a worker restart'}, synchronize_session=False
+        )
+        db.session.commit()
+        for run_id, job_url in db.session.query(AgentRun.id, AgentRun.job_url).filter_by(status='queued').all():
+            if run_id not in self.futures:
+                self._dispatch(run_id, job_url)
+
+    async def _run(self, run_id, domain):
+        if self._semaphore is None:
+            # Created on first use so it belongs to the pool's loop
+            self._semaphore = asyncio.Semaphore(self.max_runs)
+        if domain not in self._domains:
+            self._domains[domain] = asyncio.Semaphore(self.domain_limit)
+        # Wait for the domain first so a run held back by its site doesn't sit on a global slot
+        async with self._domains[domain], self._semaphore:
+            run = await asyncio.to_thread(self._claim, run_id)
+            if run is None:
+                return None
+            agent = self.agent_factory(run['headless'])
+            self.agents[run_id] = agent
+            task = asyncio.ensure_future(agent.start_application(
+                run['job_url'], run['profile'], run['resume_path'], run_id=run_id
+            ))
+            try:
+                result = await self._until_done_or_cancelled(run_id, task)
+            except asyncio.CancelledError:
+                task.cancel()
+                # Let the agent close its browser context before the run is recorded
+                await asyncio.gather(task, return_exceptions=True)
+                await asyncio.to_thread(self._finish, run_id, 'cancelled', {'log': agent.status_log})
+                raise
+            except Exception as e:
+                print(f"Agent run {run_id} failed: {e}")
+                await asyncio.to_thread(self._finish, run_id, 'failed', {'log': agent.status_log, 'error': str(e)})
+                return None
+            finally:
+                self.agents.pop(run_id, None)
+            status = 'done' if result.get('success') else 'failed'
+            await asyncio.to_thread(self._finish, run_id, status, result)
+            return result
+
+    async def _until_done_or_cancelled(self, run_id, task):
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=self.cancel_poll)
+            if done:
+                return task.result()
+            if await asyncio.to_thread(self._heartbeat, run_id):
+                raise asyncio.CancelledError()
+
+    def _claim(self, run_id):
+        """Marks the run running if it is still queued; returns what the agent needs, or None."""
+        from models import AgentRun, UserProfile
+
+        with self.app.app_context():
+            try:
+                claimed = AgentRun.query.filter_by(id=run_id, status='queued').update(
+                    {'status': 'running', 'updated_at': datetime.utcnow()}
+                )
+                db.session.commit()
+                if not claimed:
+                    return None
+                run = db.session.get(AgentRun, run_id)
+                profile = UserProfile.query.filter_by(user_id=run.user_id).first()
+                return {
+                    'job_url': run.job_url,
+                    'resume_path': run.resume_path,
+                    'headless': bool(run.headless),
+                    'profile': {
+                        'full_name': profile.full_name if profile else None,
+                        'email': profile.email if profile else None,
+                        'phone': profile.phone if profile else None,
+                        'linkedin_url': profile.linkedin_url if profile else None,
+                        'github_url': profile.github_url if profile else None,
+                        'portfolio_url': profile.portfolio_url if profile else None,
+                    },
+                }
+            finally:
+                db.session.remove()
+
+    def _heartbeat(self, run_id):
+        """Refreshes updated_at so recover() in another worker knows the run is alive; True if cancel was requested."""
+        from models import AgentRun
+
+        with self.app.app_context():
+            try:
+                AgentRun.query.filter_by(id=run_id, status='running').update(
+                    {'updated_at': datetime.utcnow()}, synchronize_session=False
+                )
+                db.session.commit()
+                return bool(db.session.query(AgentRun.cancel_requested).filter_by(id=run_id).scalar())
+            finally:
+                db.session.remove()
+
+    def _finish(self, run_id, status, result):
+        from models import AgentRun, Application
+
+        with self.app.app_context():
+            try:
+                finished = AgentRun.query.filter_by(id=run_id, status='running').update({
+                    'status': status,
+                    'outcome': result.get('status'),
+                    'log': "\n".join(result.get('log', [])),
+                    'screenshot_path': result.get('screenshot'),
+                    'error': result.get('error'),
+                }, synchronize_session=False)
+                if not finished:
+                    # recover() elsewhere already failed it; that status stands
+                    db.session.rollback()
+                    print(f"Agent run {run_id} is no longer running, not recording {status}")
+                    return
+                run = db.session.get(AgentRun, run_id)
+                # Update application status based on result
+                if run.application_id and status == 'done':
+                    app_record = db.session.get(Application, run.application_id)
+                    if app_record and app_record.user_id == run.user_id:
+                        app_record.status = 'Applied' if run.outcome == 'applied' else app_record.status
+                        # Keep the user's own notes; the agent log goes after them
+                        agent_notes = "Agent log:\n" + run.log
+                        app_record.notes = f"{app_record.notes}\n\n{agent_notes}" if app_record.notes else agent_notes
+                db.session.commit()
+            finally:
+                db.session.remove()
+        print(f"Agent run {run_id} finished: {status}")
+
+    def stats(self):
+        return {
+            "max_runs": self.max_runs,
+            "domain_limit": self.domain_limit,
+            "active": len(self.agents),
+            "pending": len(self.futures),
+        }
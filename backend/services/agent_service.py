@@ -1,14 +1,121 @@
 import asyncio
 import json
 import os
+import uuid
 from playwright.async_api import async_playwright, Page
 from services.gemini_service import GeminiService
-import base64
+from contextlib import asynccontextmanager
+
+# Collects only the page's form controls and action buttons, with a unique CSS selector for each
+FORM_EXTRACT_JS = r"""
+() => {
+    const MAX_OPTIONS = 15, MAX_BUTTONS = 10;
+    const clean = (text) => (text || '').replace(/\s+/g, ' ').trim().slice(0, 120);
+    const esc = (value) => (window.CSS && CSS.escape) ? CSS.escape(value) : value.replace(/[^\w-]/g, '\\$&');
+    const unique = (selector) => { try { return document.querySelectorAll(selector).length === 1; } catch (e) { return false; } };
+    const visible = (el) => {
+        const style = getComputedStyle(el);
+        return style.display !== 'none' && style.visibility !== 'hidden' && el.getClientRects().length > 0;
+    };
+    const selectorFor = (el) => {
+        if (el.id && unique('#' + esc(el.id))) return '#' + esc(el.id);
+        const tag = el.tagName.toLowerCase();
+        for (const attr of ['name', 'data-automation-id', 'data-testid', 'data-qa', 'aria-label']) {
+            const value = el.getAttribute(attr);
+            const selector = value && `${tag}[${attr}="${value.replace(/"/g, '\\"')}"]`;
+            if (selector && unique(selector)) return selector;
+        }
+        const path = [];
+        for (let node = el; node && node !== document.body; node = node.parentElement) {
+            const same = Array.from(node.parentElement ? node.parentElement.children : []).filter(s => s.tagName === node.tagName);
+            path.unshift(node.tagName.toLowerCase() + (same.length > 1 ? `:nth-of-type(${same.indexOf(node) + 1})` : ''));
+            const parent = node.parentElement;
+            if (parent && parent.id && unique('#' + esc(parent.id))) return '#' + esc(parent.id) + ' > ' + path.join(' > ');
+        }
+        return 'body > ' + path.join(' > ');
+    };
+    const labelFor = (el) => {
+        if (el.labels && el.labels.length) return clean(el.labels[0].innerText);
+        if (el.getAttribute('aria-label')) return clean(el.getAttribute('aria-label'));
+        const labelledBy = (el.getAttribute('aria-labelledby') || '').split(/\s+/)
+            .map(id => document.getElementById(id)).filter(Boolean).map(node => node.innerText).join(' ');
+        if (labelledBy) return clean(labelledBy);
+        const legend = el.closest('fieldset') && el.closest('fieldset').querySelector('legend');
+        return clean(el.placeholder || (legend && legend.innerText) || el.title || el.name);
+    };
+
+    const fields = [];
+    const groups = {};
+    for (const el of document.querySelectorAll('input, select, textarea')) {
+        const type = el.tagName === 'INPUT' ? (el.type || 'text').toLowerCase() : el.tagName.toLowerCase();
+        if (['hidden', 'submit', 'button', 'reset', 'image'].includes(type)) continue;
+        // File inputs are usually visually hidden behind a styled button
+        if (type !== 'file' && !visible(el)) continue;
+        if ((type === 'radio' || type === 'checkbox') && el.name) {
+            // One entry per group, listing its choices
+            let group = groups[el.name];
+            if (!group) {
+                group = groups[el.name] = { label: '', type, name: el.name, selector: `input[name="${el.name.replace(/"/g, '\\"')}"]`, options: [] };
+                const legend = el.closest('fieldset') && el.closest('fieldset').querySelector('legend');
+                group.label = clean((legend && legend.innerText) || el.getAttribute('aria-label') || el.name);
+                fields.push(group);
+            }
+            if (group.options.length < MAX_OPTIONS) group.options.push(labelFor(el) || el.value);
+            continue;
+        }
+        const field = { label: labelFor(el), type, selector: selectorFor(el) };
+        if (el.name) field.name = el.name;
+        if (el.required || el.getAttribute('aria-required') === 'true') field.required = true;
+        if (type === 'select') {
+            field.options = Array.from(el.options).slice(0, MAX_OPTIONS).map(o => clean(o.text)).filter(Boolean);
+        }
+        fields.push(field);
+    }
+
+    const buttons = [];
+    for (const el of document.querySelectorAll('button, a, input[type="submit"], [role="button"]')) {
+        const text = clean(el.innerText || el.value || el.getAttribute('aria-label'));
+        if (!/apply|submit|next|continue/i.test(text) || !visible(el)) continue;
+        buttons.push({ text, selector: selectorFor(el) });
+        if (buttons.length >= MAX_BUTTONS) break;
+    }
+
+    const h1 = document.querySelector('h1');
+    return {
+        title: clean(document.title),
+        heading: clean(h1 && h1.innerText),
+        fields,
+        buttons,
+        captcha: !!document.querySelector('iframe[src*="recaptcha"], iframe[src*="hcaptcha"], .g-recaptcha, .h-captcha, [data-sitekey]'),
+        iframes: document.querySelectorAll('iframe').length
+    };
+}
+"""
+
+
+def form_signature(form):
+    """Structure of an extracted form ("tag|type|name"), used to key the page analysis cache."""
+    controls = []
+    for field in form['fields']:
+        tag = field['type'] if field['type'] in ('select', 'textarea') else 'input'
+        controls.append(f"{tag}|{field['type']}|{field.get('name', '')}")
+    if any('apply' in button['text'].lower() for button in form['buttons']):
+        controls.append('apply-button')
+    return controls
 
 class AutoApplyAgent:
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, gemini=None, browser_pool=None, page_cache=None, screenshots=None):
         self.headless = headless
-        self.gemini = GeminiService()
+        # When analysis also sends a screenshot: "auto" (only if no form controls were found), "always" or "never"
+        self.screenshots = screenshots or os.getenv('AGENT_ANALYSIS_SCREENSHOT', 'auto')
+        # With a BrowserPool, runs borrow a context from its long-lived browser
+        self.browser_pool = browser_pool
+        # Share the app's service so agent calls count against the same LLM limits
+        self.gemini = gemini or GeminiService()
+        # PageAnalysisCache; selector results are reported back to it per analysis
+        self.page_cache = page_cache
+        self._analysis_key = None
+        self._selector_stats = {}
         self.status_log = []
         
     def log(self, message):
@@ -16,60 +123,92 @@ class AutoApplyAgent:
         print(f"[Agent] {message}")
         self.status_log.append(message)
     
-    async def analyze_page(self, page: Page):
-        """Use Gemini Vision to analyze the page and identify form fields"""
+    async def analyze_page(self, page: Page, screenshot=None):
+        """Extract the page's form controls in-page and have Gemini map them to profile fields"""
         self.log("Analyzing page structure...")
         
-        # Take a screenshot
-        screenshot_bytes = await page.screenshot()
-        screenshot_b64 = base64.b64encode(screenshot_bytes).decode()
+        form = await page.evaluate(FORM_EXTRACT_JS)
+        payload = json.dumps(form, separators=(',', ':'))
+        self.log(f"Extracted {len(form['fields'])} fields and {len(form['buttons'])} buttons ({len(payload)} chars)")
         
-        # Get page HTML for context
-        html_snippet = await page.content()
-        # Truncate HTML to avoid token limits
-        html_snippet = html_snippet[:5000] if len(html_snippet) > 5000 else html_snippet
+        key = None
+        if self.page_cache is not None:
+            key = self.page_cache.key(page.url, form_signature(form))
+            cached = await asyncio.to_thread(self.page_cache.get, *key)
+            if cached is not None:
+                self.log(f"Using cached page analysis for {key[0]}: {cached.get('page_type', 'unknown')}")
+                self._use_analysis(key)
+                return dict(cached, captcha_detected=form['captcha'])
         
         prompt = f"""You are an autonomous job application agent. Analyze this job application page.
         
-Page HTML (truncated):
-{html_snippet}
+The page's form controls and action buttons, extracted as JSON. Every selector is unique on the page; use them exactly as given.
+{payload}
 
 Return a JSON object with the following structure:
 {{
-    "apply_button_selector": "CSS selector for the Apply button (or null if not found)",
+    "apply_button_selector": "selector of the Apply button from the buttons list (or null if not found)",
     "form_fields": [
         {{
             "label": "Field label or purpose (e.g., 'First Name', 'Email')",
-            "selector": "CSS selector for the input field",
+            "selector": "selector of the field from the fields list",
             "type": "text|email|tel|file|select|radio|checkbox"
         }}
     ],
     "captcha_detected": true/false,
     "page_type": "job_listing|application_form|thank_you"
 }}
-
-Be precise with CSS selectors. Look for common patterns like input[name="firstName"], input[type="email"], etc.
 """
+        contents = prompt
+        if screenshot is None:
+            screenshot = self.screenshots == 'always' or (
+                self.screenshots == 'auto' and not form['fields'] and not form['buttons']
+            )
+        if screenshot:
+            # Nothing usable in the DOM (canvas or cross-origin iframe form): let the model look at the page
+            self.log("No form controls found in the DOM, sending a screenshot")
+            contents = [prompt, {"mime_type": "image/png", "data": await page.screenshot()}]
         
         try:
-            # Note: Gemini Vision API would need the screenshot
-            # For now, we'll use text-only analysis
-            response = self.gemini.model.generate_content(
-                prompt,
+            response = await self.gemini.llm.agenerate(
+                contents,
                 generation_config={"response_mime_type": "application/json"}
             )
             analysis = json.loads(response.text)
+            # The DOM check is reliable; don't let the model talk it away
+            analysis['captcha_detected'] = bool(analysis.get('captcha_detected') or form['captcha'])
             self.log(f"Page analysis complete: {analysis.get('page_type', 'unknown')}")
+            if key is not None and (analysis.get('form_fields') or analysis.get('apply_button_selector')):
+                # CAPTCHAs come and go per visit; cached entries take it from the DOM check
+                await asyncio.to_thread(self.page_cache.put, *key, dict(analysis, captcha_detected=False))
+            self._use_analysis(key)
             return analysis
         except Exception as e:
             self.log(f"Error analyzing page: {e}")
             return {
                 "apply_button_selector": None,
                 "form_fields": [],
-                "captcha_detected": False,
+                "captcha_detected": form['captcha'],
                 "page_type": "unknown"
             }
     
+    def _use_analysis(self, key):
+        """Attributes the following selector results to the analysis stored under key."""
+        self._analysis_key = key
+        if key is not None:
+            self._selector_stats.setdefault(key, [0, 0])
+
+    def _selector_result(self, ok):
+        stats = self._selector_stats.get(self._analysis_key)
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += 0 if ok else 1
+
+    async def _report_selectors(self):
+        for key, (attempted, failed) in self._selector_stats.items():
+            await asyncio.to_thread(self.page_cache.record, *key, attempted, failed)
+        self._selector_stats.clear()
+
     async def fill_form_field(self, page: Page, field_info, user_profile):
         """Fill a single form field based on its label/type"""
         try:
@@ -96,7 +235,12 @@ Be precise with CSS selectors. Look for common patterns like input[name="firstNa
                 value = user_profile.get('portfolio_url')
             
             if value and field_type in ['text', 'email', 'tel']:
-                await page.fill(selector, value)
+                try:
+                    await page.fill(selector, value)
+                except Exception:
+                    self._selector_result(False)
+                    raise
+                self._selector_result(True)
                 self.log(f"Filled {label}: {value[:20]}...")
                 return True
             
@@ -121,13 +265,24 @@ Be precise with CSS selectors. Look for common patterns like input[name="firstNa
             self.log(f"Error uploading resume: {e}")
             return False
     
-    async def start_application(self, job_url, user_profile, resume_path):
-        """Main entry point for the agent"""
-        self.log(f"Starting application for: {job_url}")
-        
+    @asynccontextmanager
+    async def _browser_context(self):
+        if self.browser_pool is not None:
+            async with self.browser_pool.context(headless=self.headless) as context:
+                yield context
+            return
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=self.headless)
-            context = await browser.new_context()
+            try:
+                yield await browser.new_context()
+            finally:
+                await browser.close()
+
+    async def start_application(self, job_url, user_profile, resume_path, run_id=None):
+        """Main entry point for the agent; run_id names this run's files so concurrent runs don't collide"""
+        self.log(f"Starting application for: {job_url}")
+        
+        async with self._browser_context() as context:
             page = await context.new_page()
             
             try:
@@ -156,7 +311,12 @@ Be precise with CSS selectors. Look for common patterns like input[name="firstNa
                 # If it's a job listing page, click Apply button
                 if analysis.get('page_type') == 'job_listing' and analysis.get('apply_button_selector'):
                     self.log("Clicking Apply button...")
-                    await page.click(analysis['apply_button_selector'])
+                    try:
+                        await page.click(analysis['apply_button_selector'])
+                    except Exception:
+                        self._selector_result(False)
+                        raise
+                    self._selector_result(True)
                     await page.wait_for_timeout(2000)
                     
                     # Re-analyze after clicking
@@ -172,7 +332,8 @@ Be precise with CSS selectors. Look for common patterns like input[name="firstNa
                             await self.fill_form_field(page, field, user_profile)
                 
                 # Take a screenshot before submitting
-                screenshot_path = os.path.join('output', f'pre_submit_{os.path.basename(resume_path)}.png')
+                # Runs share resumes (and the latest_resume.pdf fallback), so name the shot after the run
+                screenshot_path = os.path.join('output', f'pre_submit_{run_id or uuid.uuid4().hex}.png')
                 await page.screenshot(path=screenshot_path)
                 self.log(f"Screenshot saved: {screenshot_path}")
                 
@@ -224,4 +385,5 @@ Be precise with CSS selectors. Look for common patterns like input[name="firstNa
                     'log': self.status_log
                 }
             finally:
-                await browser.close()
+                if self.page_cache is not None:
+                    await self._report_selectors()
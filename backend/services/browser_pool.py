@@ -0,0 +1,193 @@
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+
+
+class _Browser:
+    def __init__(self, browser, headless):
+        self.browser = browser
+        self.headless = headless
+        self.uses = 0
+        self.active = 0
+
+
+class BrowserPool:
+    """Long-lived Chromium shared by auto-apply runs.
+
+    One daemon thread owns an asyncio loop and every Playwright object; runs
+    are scheduled onto it with submit() and get an isolated BrowserContext
+    from context(). The browser is launched on first use (one per headless
+    setting), checked before it is handed out and in the background, and
+    replaced once it has served recycle_after contexts.
+
+    Configuration comes from the environment:
+      BROWSER_MAX_CONTEXTS     - contexts open at once; further runs wait (default 3)
+      BROWSER_RECYCLE_AFTER    - contexts served before a browser is relaunched (default 50)
+      BROWSER_HEALTH_INTERVAL  - seconds between background health checks, 0 disables (default 60)
+    """
+
+    def __init__(self, max_contexts=None, recycle_after=None, health_interval=None, launcher=None):
+        self.max_contexts = max_contexts or int(os.getenv('BROWSER_MAX_CONTEXTS', '3'))
+        self.recycle_after = recycle_after or int(os.getenv('BROWSER_RECYCLE_AFTER', '50'))
+        self.health_interval = health_interval if health_interval is not None else float(os.getenv('BROWSER_HEALTH_INTERVAL', '60'))
+        self._launcher = launcher or self._launch_chromium
+        self._playwright = None
+        self._browsers = {}
+        self._retired = []
+        self._semaphore = None
+        self._launch_lock = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.launches = 0
+        self.recycled = 0
+        self.unhealthy = 0
+        self.served = 0
+        self.waiting = 0
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='browser-pool', daemon=True)
+                self._thread.start()
+                asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+            return self._loop
+
+    async def _start(self):
+        # Created on the pool's loop so waiting runs are woken there
+        self._semaphore = asyncio.Semaphore(self.max_contexts)
+        self._launch_lock = asyncio.Lock()
+        if self.health_interval > 0:
+            asyncio.get_running_loop().create_task(self._health_loop())
+
+    def submit(self, coro):
+        """Schedules a coroutine on the pool's loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def _launch_chromium(self, headless):
+        from playwright.async_api import async_playwright
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=headless)
+
+    async def _browser(self, headless):
+        """The browser to open the next context on, claimed for that context (uses/active counted)."""
+        # Held across the launch so runs arriving together share one Chromium instead of each starting one
+        async with self._launch_lock:
+            entry = self._browsers.get(headless)
+            if entry is not None and not entry.browser.is_connected():
+                print("Browser pool: browser disconnected, relaunching")
+                self.unhealthy += 1
+                self._browsers.pop(headless, None)
+                entry = None
+            if entry is not None and entry.uses >= self.recycle_after:
+                self.recycled += 1
+                self._retire(entry)
+                entry = None
+            if entry is None:
+                entry = _Browser(await self._launcher(headless), headless)
+                self._browsers[headless] = entry
+                self.launches += 1
+            entry.uses += 1
+            entry.active += 1
+            return entry
+
+    def _retire(self, entry):
+        """Stops handing out a browser; it is closed once its last context is."""
+        self._browsers.pop(entry.headless, None)
+        self._retired.append(entry)
+
+    async def _close_retired(self):
+        for entry in [e for e in self._retired if e.active == 0]:
+            self._retired.remove(entry)
+            await self._close_browser(entry)
+
+    async def _close_browser(self, entry):
+        try:
+            await entry.browser.close()
+        except Exception as e:
+            print(f"Browser pool: error closing browser: {e}")
+
+    @asynccontextmanager
+    async def context(self, headless=True, **options):
+        """An isolated BrowserContext from the shared browser; must run on the pool's loop."""
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        entry = None
+        browser_context = None
+        try:
+            entry = await self._browser(headless)
+            self.served += 1
+            browser_context = await entry.browser.new_context(**options)
+            yield browser_context
+        finally:
+            if browser_context is not None:
+                try:
+                    await browser_context.close()
+                except Exception as e:
+                    print(f"Browser pool: error closing context: {e}")
+            if entry is not None:
+                entry.active -= 1
+            await self._close_retired()
+            self._semaphore.release()
+
+    async def check_health(self):
+        """Drops disconnected browsers and probes idle ones with a throwaway context."""
+        for headless, entry in list(self._browsers.items()):
+            healthy = entry.browser.is_connected()
+            if healthy and entry.active == 0:
+                try:
+                    probe = await asyncio.wait_for(entry.browser.new_context(), timeout=10)
+                    await probe.close()
+                except Exception as e:
+                    print(f"Browser pool: health check failed: {e}")
+                    healthy = False
+            if not healthy and self._browsers.get(headless) is entry:
+                self.unhealthy += 1
+                self._retire(entry)
+        await self._close_retired()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                print(f"Browser pool: health loop error: {e}")
+
+    async def _shutdown(self):
+        for entry in list(self._browsers.values()) + self._retired:
+            await self._close_browser(entry)
+        self._browsers.clear()
+        self._retired.clear()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=30)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout=5)
+
+    def stats(self):
+        return {
+            "browsers": len(self._browsers),
+            "retiring": len(self._retired),
+            "active_contexts": sum(e.active for e in list(self._browsers.values()) + self._retired),
+            "waiting": self.waiting,
+            "max_contexts": self.max_contexts,
+            "served": self.served,
+            "launches": self.launches,
+            "recycled": self.recycled,
+            "unhealthy": self.unhealthy,
+        }
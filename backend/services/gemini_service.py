@@ -2,18 +2,146 @@ import google.generativeai as genai
 import os
 import json
 import typing_extensions as typing
+from services.cache_service import ResponseCache, make_cache_key
+from services.llm_client import LLMClient, LLMBusy
+from services.json_stream import JSONObjectStream, object_events
+from services.text_preprocessor import TextPreprocessor
+
+class ContextQuestion(typing.TypedDict):
+    keyword: str
+    question: str
+
+class GapAndScore(typing.TypedDict):
+    missing_keywords: list[str]
+    context_questions: list[ContextQuestion]
+    score: int
+    improvement_suggestions: list[str]
+
+class RewrittenSkills(typing.TypedDict):
+    languages: str
+    web: str
+    frameworks: str
+    ai_ml: str
+    tools: str
+
+class RewrittenExperience(typing.TypedDict):
+    points: list[str]
+
+class ResumeRewrite(typing.TypedDict):
+    role: str
+    objective: str
+    experience: list[RewrittenExperience]
+    skills: RewrittenSkills
 
 class GeminiService:
-    def __init__(self):
+    def __init__(self, cache=None, llm=None, preprocessor=None):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             print("Warning: GEMINI_API_KEY not found in environment variables")
         else:
             genai.configure(api_key=api_key)
             
-        self.model = genai.GenerativeModel('gemini-flash-latest')
+        self.model_name = 'gemini-flash-latest'
+        self.llm = llm or LLMClient(genai.GenerativeModel(self.model_name))
+        self.cache = cache if cache is not None else ResponseCache.from_env()
+        self.preprocessor = preprocessor or TextPreprocessor()
+
+    @property
+    def model(self):
+        return self.llm.model
+
+    @model.setter
+    def model(self, model):
+        self.llm.model = model
+
+    def _prepare(self, resume_text, jd_text):
+        """Cleans and budgets the inputs; runs before both the prompt and the cache key are built."""
+        return self.preprocessor.prepare_resume(resume_text), self.preprocessor.prepare_jd(jd_text)
+
+    def _generate_json(self, method, prompt, *key_parts, response_schema=None):
+        """Runs a JSON-mode prompt, serving repeat inputs from the response cache."""
+        key = make_cache_key(method, self.model_name, *key_parts)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation_config = {"response_mime_type": "application/json"}
+        if response_schema is not None:
+            generation_config["response_schema"] = response_schema
+        response = self.llm.generate(prompt, generation_config=generation_config)
+        result = json.loads(response.text)
+        self.cache.set(key, result)
+        return result
+
+    def _stream_json(self, method, prompt, *key_parts):
+        """Streams a JSON-mode prompt as JSONObjectStream events, then ('done', result).
+
+        Shares cache entries with _generate_json; a cached result is replayed as events.
+        """
+        key = make_cache_key(method, self.model_name, *key_parts)
+        result = self.cache.get(key)
+        if result is not None:
+            yield from object_events(result)
+        else:
+            parser = JSONObjectStream()
+            for text in self.llm.stream(prompt, generation_config={"response_mime_type": "application/json"}):
+                yield from parser.feed(text)
+            result = parser.result()
+            self.cache.set(key, result)
+        yield ('done', result)
+
+    def _cached_gap_and_score(self, resume_text, jd_text):
+        """Returns a still-cached analyze_and_score result for these inputs, if any."""
+        key = make_cache_key('analyze_and_score', self.model_name, resume_text, jd_text)
+        return self.cache.get(key, record=False)
+
+    def analyze_and_score(self, resume_text, jd_text):
+        """Gap analysis and scoring in a single structured-output request."""
+        resume_text, jd_text = self._prepare(resume_text, jd_text)
+        prompt = f"""
+        You are an expert resume analyst. Compare the following resume text against the job description.
+        1. Identify missing skills or keywords that are critical for the job but missing or weak in the resume.
+           For each missing item, formulate a specific question to ask the candidate to gather more context.
+        2. Rate the resume against the job description on a scale of 0-100.
+        3. Provide a list of specific improvement suggestions.
+        
+        Resume Text:
+        {resume_text}
+        
+        Job Description:
+        {jd_text}
+        
+        Output strictly in JSON format with the following structure:
+        {{
+            "missing_keywords": ["keyword1", "keyword2"],
+            "context_questions": [
+                {{
+                    "keyword": "keyword1",
+                    "question": "The JD requires experience with keyword1. Can you describe your experience..."
+                }}
+            ],
+            "score": <number range from 0 to 100>,
+            "improvement_suggestions": ["suggestion1", "suggestion2"]
+        }}
+        """
+        
+        try:
+            return self._generate_json('analyze_and_score', prompt, resume_text, jd_text, response_schema=GapAndScore)
+        except LLMBusy:
+            raise
+        except Exception as e:
+            print(f"Error in analyze_and_score: {e}")
+            return {"error": str(e)}
 
     def analyze_gap(self, resume_text, jd_text):
+        resume_text, jd_text = self._prepare(resume_text, jd_text)
+        combined = self._cached_gap_and_score(resume_text, jd_text)
+        if combined is not None:
+            return {
+                "missing_keywords": combined.get("missing_keywords", []),
+                "context_questions": combined.get("context_questions", [])
+            }
+
         prompt = f"""
         You are an expert resume analyst. Compare the following resume text against the job description.
         Identify missing skills or keywords that are critical for the job but missing or weak in the resume.
@@ -38,16 +166,22 @@ class GeminiService:
         """
         
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config={"response_mime_type": "application/json"}
-            )
-            return json.loads(response.text)
+            return self._generate_json('analyze_gap', prompt, resume_text, jd_text)
+        except LLMBusy:
+            raise
         except Exception as e:
             print(f"Error in analyze_gap: {e}")
             return {"error": str(e)}
 
     def score_resume(self, resume_text, jd_text):
+        resume_text, jd_text = self._prepare(resume_text, jd_text)
+        combined = self._cached_gap_and_score(resume_text, jd_text)
+        if combined is not None:
+            return {
+                "score": combined.get("score"),
+                "improvement_suggestions": combined.get("improvement_suggestions", [])
+            }
+
         prompt = f"""
         Rate this resume against the job description on a scale of 0-100.
         Provide a list of specific improvement suggestions.
@@ -66,17 +200,15 @@ class GeminiService:
         """
         
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config={"response_mime_type": "application/json"}
-            )
-            return json.loads(response.text)
+            return self._generate_json('score_resume', prompt, resume_text, jd_text)
+        except LLMBusy:
+            raise
         except Exception as e:
             print(f"Error in score_resume: {e}")
             return {"error": str(e)}
 
-    def tailor_resume(self, resume_text, jd_text, user_answers):
-        prompt = f"""
+    def _tailor_prompt(self, resume_text, jd_text, user_answers):
+        return f"""
         You are an expert resume writer. Rewrite the candidate's resume to better match the job description, incorporating their answers to specific questions.
         
         Input:
@@ -124,13 +256,14 @@ class GeminiService:
             "achievements": ["Achievement 1", "Achievement 2"]
         }}
         """
-        
+
+    def tailor_resume(self, resume_text, jd_text, user_answers):
+        resume_text, jd_text = self._prepare(resume_text, jd_text)
+        prompt = self._tailor_prompt(resume_text, jd_text, user_answers)
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config={"response_mime_type": "application/json"}
-            )
-            return json.loads(response.text)
+            return self._generate_json('tailor_resume', prompt, resume_text, jd_text, user_answers)
+        except LLMBusy:
+            raise
         except Exception as e:
             print(f"Error in tailor_resume: {e}")
             # Return a basic structure with error to avoid crash
@@ -139,3 +272,70 @@ class GeminiService:
                 "objective": f"Failed to tailor resume: {str(e)}",
                 "experience": []
             }
+
+    def tailor_resume_stream(self, resume_text, jd_text, user_answers):
+        """tailor_resume as it is generated: section/item events, then ('done', tailored_data)."""
+        resume_text, jd_text = self._prepare(resume_text, jd_text)
+        prompt = self._tailor_prompt(resume_text, jd_text, user_answers)
+        return self._stream_json('tailor_resume', prompt, resume_text, jd_text, user_answers)
+
+    def rewrite_resume(self, structured, jd_text, user_answers):
+        """Tailors a resume already split into template fields by ParserService.parse_structured.
+
+        Only the role, objective, experience bullets and skills go to Gemini;
+        everything else is copied from the local parse.
+        """
+        jd_text = self.preprocessor.prepare_jd(jd_text)
+        experience = [
+            {"title": job["title"], "company": job["company"], "points": job["points"]}
+            for job in structured.get("experience", [])
+        ]
+        prompt = f"""
+        You are an expert resume writer. Rewrite the sections of the candidate's resume below to better match the job description, incorporating their answers to specific questions.
+
+        Input:
+        - Current Target Role: {structured.get("role", "")}
+        - Current Objective: {structured.get("objective", "")}
+        - Experience (in order):
+        {json.dumps(experience)}
+        - Skills:
+        {json.dumps(structured.get("skills", {}))}
+
+        - Job Description:
+        {jd_text}
+
+        - Candidate's Answers to Gap Analysis Questions:
+        {json.dumps(user_answers)}
+
+        Instructions:
+        1. REWRITE each job's bullet points to target the Job Description. Keep the jobs in the same order and return exactly {len(experience)} entries.
+        2. REWRITE the Skills section; keep the same keys.
+        3. GENERATE a strong 'Objective' (2-3 sentences) and a target 'Role' for the JD.
+        4. INTEGRATE the Candidate's Answers to fill gaps or strengthen the resume. Do not invent employers, titles or dates.
+        """
+        try:
+            rewrite = self._generate_json(
+                'rewrite_resume', prompt, json.dumps(structured, sort_keys=True), jd_text, user_answers,
+                response_schema=ResumeRewrite,
+            )
+        except LLMBusy:
+            raise
+        except Exception as e:
+            print(f"Error in rewrite_resume: {e}")
+            return {
+                "name": "Error Generating Resume",
+                "objective": f"Failed to tailor resume: {str(e)}",
+                "experience": []
+            }
+
+        tailored = json.loads(json.dumps(structured))
+        for key in ("role", "objective"):
+            if rewrite.get(key):
+                tailored[key] = rewrite[key]
+        for job, rewritten in zip(tailored["experience"], rewrite.get("experience") or []):
+            if rewritten.get("points"):
+                job["points"] = rewritten["points"]
+        for key, value in (rewrite.get("skills") or {}).items():
+            if value:
+                tailored["skills"][key] = value
+        return tailored
@@ -0,0 +1,101 @@
+import fnmatch
+import os
+import shutil
+import threading
+import time
+
+
+class OutputJanitor:
+    """Periodically prunes cache artifacts under output/ by age and total size.
+
+    Only files this app can regenerate are touched: the PDF cache, ReportLab
+    fallback PDFs and leftover Tectonic workdirs. Everything else in output/
+    (agent pre-submit screenshots, latest_resume.pdf) is left alone. When
+    given a JobQueue, each sweep also prunes its finished jobs.
+
+    Configuration comes from the environment:
+      OUTPUT_MAX_AGE_HOURS  - delete anything older than this (default 24)
+      OUTPUT_MAX_MB         - then delete oldest-first until the tree fits (default 500)
+      OUTPUT_JANITOR_INTERVAL - seconds between sweeps, 0 disables the thread (default 3600)
+    """
+
+    CACHE_DIRS = ('pdf_cache',)
+    CACHE_FILES = ('resume_*.pdf',)
+
+    def __init__(self, root, max_age_seconds=None, max_bytes=None, interval=None, job_queue=None):
+        self.root = root
+        self.job_queue = job_queue
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else float(os.getenv('OUTPUT_MAX_AGE_HOURS', '24')) * 3600
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv('OUTPUT_MAX_MB', '500')) * 1024 * 1024
+        self.interval = interval if interval is not None else int(os.getenv('OUTPUT_JANITOR_INTERVAL', '3600'))
+        self.removed = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _entries(self):
+        """Cache files at the top level and in CACHE_DIRS, plus leftover tectonic workdirs."""
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_file() and any(fnmatch.fnmatch(entry.name, p) for p in self.CACHE_FILES):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                elif entry.is_dir() and entry.name.startswith('tectonic_'):
+                    # Leftover workdir from a killed worker
+                    entries.append((entry.stat().st_mtime, 0, entry.path))
+                elif entry.is_dir() and entry.name in self.CACHE_DIRS:
+                    with os.scandir(entry.path) as sub:
+                        for child in sub:
+                            if child.is_file():
+                                stat = child.stat()
+                                entries.append((stat.st_mtime, stat.st_size, child.path))
+        return entries
+
+    def _remove(self, path):
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            self.removed += 1
+        except FileNotFoundError:
+            pass
+
+    def sweep(self, now=None):
+        now = now or time.time()
+        keep = []
+        for mtime, size, path in self._entries():
+            if now - mtime > self.max_age_seconds:
+                self._remove(path)
+            else:
+                keep.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in keep)
+        for mtime, size, path in sorted(keep):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Error cleaning output directory: {e}")
+            if self.job_queue is not None:
+                try:
+                    self.job_queue.prune()
+                except Exception as e:
+                    print(f"Error pruning finished jobs: {e}")
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name='output-janitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
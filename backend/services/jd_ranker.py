@@ -0,0 +1,138 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+
+class _UserIndex:
+    """One user's JDs as sparse term-weight rows, rebuilt only where they changed."""
+
+    def __init__(self):
+        self.columns = {} # term -> column, append-only so cached rows stay valid
+        self.terms = []
+        self.rows = {} # application id -> (version, meta, column array, weight array)
+        self._matrix = None
+
+    def column(self, term):
+        col = self.columns.get(term)
+        if col is None:
+            col = self.columns[term] = len(self.terms)
+            self.terms.append(term)
+        return col
+
+    def matrix(self):
+        """Returns (application ids, CSR matrix of TF-IDF weights, row totals)."""
+        if self._matrix is None:
+            ids = list(self.rows)
+            entries = [self.rows[i] for i in ids]
+            indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+            if entries:
+                np.cumsum([len(e[2]) for e in entries], out=indptr[1:])
+                cols = np.concatenate([e[2] for e in entries])
+                vals = np.concatenate([e[3] for e in entries])
+            else:
+                cols, vals = np.zeros(0, dtype=np.int64), np.zeros(0)
+            tf = sparse.csr_matrix((vals, cols, indptr), shape=(len(ids), len(self.terms)))
+
+            # BM25 idf over this user's JDs: skills every posting asks for count for less
+            df = np.bincount(cols, minlength=len(self.terms))
+            idf = np.log1p((len(ids) - df + 0.5) / (df + 0.5))
+            weights = tf.multiply(idf).tocsr()
+            totals = np.asarray(weights.sum(axis=1)).ravel()
+            self._matrix = (ids, weights, totals)
+        return self._matrix
+
+
+class JDRanker:
+    """Ranks all of a user's saved job descriptions against one resume in a single pass.
+
+    Each user's JDs are kept as a sparse (applications x terms) matrix of the same
+    term weights KeywordScorer uses, scaled by idf across that user's JDs. The
+    cache is synced against (id, updated_at) pairs from the database, so only
+    new or edited applications are re-tokenized.
+    """
+
+    def __init__(self, scorer, max_users=None):
+        self.scorer = scorer
+        self.max_users = max_users or int(os.getenv('RANK_CACHE_USERS', '256'))
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _index(self, user_id):
+        index = self._indexes.get(user_id)
+        if index is None:
+            index = self._indexes[user_id] = _UserIndex()
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(user_id)
+        return index
+
+    def _jd_terms(self, jd_text):
+        terms = self.scorer.extract_keywords(jd_text)
+        return terms or self.scorer.content_terms(jd_text)
+
+    def sync(self, user_id, versions, load):
+        """Brings the user's matrix up to date.
+
+        versions maps application id -> updated_at for every application with a JD;
+        load(ids) returns (id, meta dict, jd_text) tuples for the ones that changed.
+        Returns the number of rows that were (re)built.
+        """
+        with self._lock:
+            index = self._index(user_id)
+            stale = [i for i in index.rows if i not in versions]
+            changed = [i for i, v in versions.items() if i not in index.rows or index.rows[i][0] != v]
+            for app_id in stale:
+                del index.rows[app_id]
+            if changed:
+                for app_id, meta, jd_text in load(changed):
+                    terms = self._jd_terms(jd_text)
+                    cols = np.array([index.column(t) for t in terms], dtype=np.int64)
+                    vals = np.array([self.scorer.term_weight(t, tf) for t, tf in terms.items()])
+                    index.rows[app_id] = (versions[app_id], meta, cols, vals)
+            if stale or changed:
+                index._matrix = None
+            return len(changed)
+
+    def rank(self, user_id, resume_text, limit=20, max_missing=5):
+        """Returns the user's applications ordered by keyword coverage of the resume."""
+        with self._lock:
+            index = self._index(user_id)
+            ids, weights, totals = index.matrix()
+            if not ids:
+                return []
+
+            present = self.scorer.extract_keywords(resume_text) | self.scorer.content_terms(resume_text)
+            resume_vector = np.zeros(len(index.terms))
+            hits = [index.columns[t] for t in present if t in index.columns]
+            resume_vector[hits] = 1.0
+
+            covered = weights @ resume_vector
+            scores = np.divide(covered, totals, out=np.zeros_like(covered), where=totals > 0)
+            order = np.lexsort((np.arange(len(ids)), -scores))[:limit]
+
+            results = []
+            for row in order:
+                start, end = weights.indptr[row], weights.indptr[row + 1]
+                cols, vals = weights.indices[start:end], weights.data[start:end]
+                gaps = [(-v, index.terms[c]) for c, v in zip(cols, vals) if not resume_vector[c]]
+                results.append(dict(
+                    index.rows[ids[row]][1],
+                    application_id=ids[row],
+                    score=int(round(100 * scores[row])),
+                    missing_keywords=[t for _, t in sorted(gaps)[:max_missing]],
+                ))
+            return results
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._indexes.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._indexes),
+                'rows': sum(len(i.rows) for i in self._indexes.values()),
+            }
@@ -0,0 +1,114 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from extensions import db
+
+
+class JobQueue:
+    """Runs slow work (LLM calls, LaTeX compiles) off the request thread.
+
+    Jobs are persisted in the `job` table so their status outlives the worker
+    that accepted them. Each run claims its row with a conditional UPDATE, so
+    when several gunicorn workers recover the same backlog only one executes it.
+    Finished jobs are deleted by prune() once they are older than
+    JOB_RETENTION_HOURS (default 24); the output janitor calls it each sweep.
+    """
+
+    def __init__(self, app=None, max_workers=None, stale_after=None, retention_seconds=None):
+        self.handlers = {}
+        self.futures = {}
+        self.max_workers = max_workers or int(os.getenv('JOB_WORKERS', '4'))
+        self.stale_after = stale_after or int(os.getenv('JOB_STALE_SECONDS', '600'))
+        self.retention_seconds = retention_seconds or float(os.getenv('JOB_RETENTION_HOURS', '24')) * 3600
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+
+    def handler(self, kind):
+        """Registers a function that takes the job payload and returns a JSON-able result."""
+        def decorator(fn):
+            self.handlers[kind] = fn
+            return fn
+        return decorator
+
+    def submit(self, kind, payload, user_id=None):
+        from models import Job
+
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(id=uuid.uuid4().hex, kind=kind, payload=payload, user_id=user_id, status='queued')
+        db.session.add(job)
+        db.session.commit()
+        self._dispatch(job.id)
+        return job
+
+    def _dispatch(self, job_id):
+        future = self.executor.submit(self._run, job_id)
+        self.futures[job_id] = future
+        future.add_done_callback(lambda f: self.futures.pop(job_id, None))
+
+    def _run(self, job_id):
+        from models import Job
+
+        with self.app.app_context():
+            try:
+                claimed = Job.query.filter_by(id=job_id, status='queued').update(
+                    {'status': 'running', 'updated_at': datetime.utcnow()}
+                )
+                db.session.commit()
+                if not claimed:
+                    return
+
+                job = db.session.get(Job, job_id)
+                try:
+                    job.result = self.handlers[job.kind](job.payload)
+                    job.status = 'done'
+                except Exception as e:
+                    print(f"Job {job_id} ({job.kind}) failed: {e}")
+                    db.session.rollback()
+                    job = db.session.get(Job, job_id)
+                    job.status = 'failed'
+                    job.error = str(e)
+                db.session.commit()
+            finally:
+                db.session.remove()
+
+    def recover(self):
+        """Re-dispatches queued jobs and resets jobs whose worker died mid-run."""
+        from models import Job
+
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        Job.query.filter(Job.status == 'running', Job.updated_at < cutoff).update(
+            {'status': 'queued'}, synchronize_session=False
+        )
+        db.session.commit()
+        for (job_id,) in db.session.query(Job.id).filter_by(status='queued').all():
+            if job_id not in self.futures:
+                self._dispatch(job_id)
+
+    def prune(self, now=None):
+        """Deletes done/failed jobs last updated more than retention_seconds ago; returns how many."""
+        from models import Job
+
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=self.retention_seconds)
+        with self.app.app_context():
+            try:
+                removed = Job.query.filter(Job.status.in_(('done', 'failed')), Job.updated_at < cutoff).delete(
+                    synchronize_session=False
+                )
+                db.session.commit()
+                return removed
+            finally:
+                db.session.remove()
+
+    def wait(self, job_id, timeout=None):
+        """Blocks until a job dispatched by this process has finished."""
+        future = self.futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
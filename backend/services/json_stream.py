@@ -0,0 +1,119 @@
+import json
+
+
+class JSONObjectStream:
+    """Incremental parser for a streamed top-level JSON object.
+
+    feed() takes the next chunk of text and returns the events it completed:
+      ('item', key, index, value) - an element of a top-level array member finished
+      ('field', key, value)       - a top-level member finished
+
+    Only the top-level structure is tracked; each completed piece is handed to
+    json.loads, so nested values are parsed once they are whole.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.done = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self._value_is_array = False
+        self._item_start = None
+        self._item_index = 0
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        events = []
+        buf = self.buffer
+        for i in range(self.pos, len(buf)):
+            c = buf[i]
+            if self.done:
+                break
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            if c in ' \t\r\n:':
+                continue
+            if self.depth == 0:
+                if c == '{':
+                    self.depth = 1
+                continue
+
+            if c in '}]':
+                if self.depth == 3 and self._value_is_array:
+                    self._emit_item(events, buf[self._item_start:i + 1])
+                elif self.depth == 2:
+                    if self._item_start is not None:
+                        self._emit_item(events, buf[self._item_start:i])
+                    self._emit_field(events, buf[self._value_start:i + 1])
+                elif self.depth == 1:
+                    if self._value_start is not None:
+                        self._emit_field(events, buf[self._value_start:i])
+                    self.done = True
+                self.depth -= 1
+                continue
+
+            if c == ',':
+                if self.depth == 1 and self._value_start is not None:
+                    self._emit_field(events, buf[self._value_start:i])
+                elif self.depth == 2 and self._value_is_array and self._item_start is not None:
+                    self._emit_item(events, buf[self._item_start:i])
+                continue
+
+            # Start of a key, value or array element
+            if self.depth == 1:
+                if self._key is None:
+                    self._key_start = i
+                elif self._value_start is None:
+                    self._value_start = i
+                    self._value_is_array = c == '['
+            elif self.depth == 2 and self._value_is_array and self._item_start is None:
+                self._item_start = i
+
+            if c == '"':
+                self.in_string = True
+            elif c in '{[':
+                self.depth += 1
+        self.pos = len(buf)
+        return events
+
+    def result(self):
+        """The whole object, once the stream is complete."""
+        return json.loads(self.buffer)
+
+    def _emit_item(self, events, text):
+        events.append(('item', self._key, self._item_index, json.loads(text)))
+        self._item_index += 1
+        self._item_start = None
+
+    def _emit_field(self, events, text):
+        events.append(('field', self._key, json.loads(text)))
+        self._key = None
+        self._value_start = None
+        self._value_is_array = False
+        self._item_start = None
+        self._item_index = 0
+
+
+def object_events(obj):
+    """The events JSONObjectStream would produce for an already complete object."""
+    events = []
+    for key, value in obj.items():
+        if isinstance(value, list):
+            events.extend(('item', key, index, item) for index, item in enumerate(value))
+        events.append(('field', key, value))
+    return events
@@ -0,0 +1,128 @@
+import os
+import re
+from collections import Counter
+
+# Letters/digits plus the punctuation that appears inside skill names
+# (c++, c#, node.js, ci/cd, r&d, objective-c), and a leading dot before a letter (.net).
+TOKEN_PATTERN = re.compile(r"(?:\.(?=[a-z]))?[a-z0-9][a-z0-9+#./&\-]*")
+MAX_NGRAM = 3
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers herself him himself his how i if in into is it its itself just me more most my myself no nor not
+now of off on once only or other our ours ourselves out over own same she should so some such than that the
+their theirs them themselves then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your yours yourself yourselves
+experience work working team teams role job strong ability skills years year including using use etc
+""".split())
+
+
+def tokenize(text):
+    """Lowercases and splits text into tokens, keeping skill punctuation intact."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall((text or '').lower()):
+        # Sentence punctuation sticks to the last word ("python." / "apis,")
+        token = token.rstrip('.-/&')
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def load_vocabulary(path=None):
+    path = path or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'skills.txt')
+    with open(path, encoding='utf-8') as f:
+        return frozenset(
+            ' '.join(tokenize(line))
+            for line in f
+            if line.strip() and not line.lstrip().startswith('#')
+        )
+
+
+class KeywordScorer:
+    """Deterministic resume/JD keyword matcher that needs no LLM round trip.
+
+    Skills from the bundled vocabulary are extracted from both texts as 1-3 word
+    n-grams. Each JD skill is weighted with BM25 term-frequency saturation (a
+    skill repeated in the JD matters more, but with diminishing returns) and a
+    boost for multi-word phrases, which are more specific. The score is the
+    share of that weight the resume covers. When a JD mentions no known skills
+    the same computation runs over its plain content words instead.
+    """
+
+    def __init__(self, vocabulary=None, k1=1.2):
+        self.vocabulary = vocabulary if vocabulary is not None else load_vocabulary()
+        self.k1 = k1
+
+    def extract_keywords(self, text):
+        """Counts vocabulary skills in text, preferring the longest match at each position."""
+        tokens = tokenize(text)
+        counts = Counter()
+        i = 0
+        while i < len(tokens):
+            for n in range(min(MAX_NGRAM, len(tokens) - i), 0, -1):
+                phrase = ' '.join(tokens[i:i + n])
+                if phrase in self.vocabulary:
+                    counts[phrase] += 1
+                    i += n
+                    break
+            else:
+                i += 1
+        return counts
+
+    def content_terms(self, text):
+        return Counter(t for t in tokenize(text) if t not in STOPWORDS and len(t) > 2 and not t.isdigit())
+
+    def term_weight(self, term, tf):
+        saturation = tf * (self.k1 + 1) / (tf + self.k1)
+        return saturation * (1 + 0.5 * (term.count(' ')))
+
+    def match(self, resume_text, jd_text):
+        """Returns (score 0-100, matched terms, missing terms by descending weight)."""
+        jd_terms = self.extract_keywords(jd_text)
+        resume_terms = self.extract_keywords(resume_text)
+        if not jd_terms:
+            jd_terms = self.content_terms(jd_text)
+            resume_terms = self.content_terms(resume_text)
+
+        weights = {term: self.term_weight(term, tf) for term, tf in jd_terms.items()}
+        total = sum(weights.values())
+        if not total:
+            return 0, [], []
+
+        ranked = sorted(weights, key=lambda t: (-weights[t], t))
+        matched = [t for t in ranked if t in resume_terms]
+        missing = [t for t in ranked if t not in resume_terms]
+        covered = sum(weights[t] for t in matched)
+        return int(round(100 * covered / total)), matched, missing
+
+    def score_resume(self, resume_text, jd_text, max_suggestions=5):
+        """Same shape as GeminiService.score_resume, plus the matched/missing lists."""
+        score, matched, missing = self.match(resume_text, jd_text)
+        suggestions = [
+            f"Add concrete evidence of {term} (a project, metric or role where you used it)."
+            for term in missing[:max_suggestions]
+        ]
+        return {
+            "score": score,
+            "improvement_suggestions": suggestions,
+            "matched_keywords": matched,
+            "missing_keywords": missing,
+            "mode": "local"
+        }
+
+    def analyze_gap(self, resume_text, jd_text, max_keywords=10):
+        """Same shape as GeminiService.analyze_gap, with templated questions."""
+        _, _, missing = self.match(resume_text, jd_text)
+        missing = missing[:max_keywords]
+        return {
+            "missing_keywords": missing,
+            "context_questions": [
+                {
+                    "keyword": term,
+                    "question": f"The JD mentions {term}. Can you describe any experience you have with {term}?"
+                }
+                for term in missing
+            ],
+            "mode": "local"
+        }
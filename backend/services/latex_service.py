@@ -1,10 +1,47 @@
+import hashlib
+import io
 import os
+import re
 import subprocess
+import tempfile
 from jinja2 import Environment, FileSystemLoader
 import uuid
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import simpleSplit
+from services.pdf_cache import PdfCache
+from services.tectonic_env import TectonicEnvironment, CompileQueueFull
+
+# Representative data used to compile the template once at startup, so the
+# Tectonic format file and every package the template needs are cached.
+WARMUP_RESUME = {
+    "name": "Warm Up",
+    "role": "Engineer",
+    "email": "warmup@example.com",
+    "phone": "000",
+    "location": "Nowhere",
+    "linkedin": "https://linkedin.com",
+    "github": "https://github.com",
+    "objective": "Warm the LaTeX toolchain.",
+    "education": [{"school": "School", "location": "City", "degree": "Degree", "dates": "2020"}],
+    "experience": [{"title": "Title", "company": "Company", "location": "City", "dates": "2021", "points": ["Point"]}],
+    "projects": [{"title": "Project", "description": "Description", "stack": "Python"}],
+    "skills": {"languages": "Python", "frameworks": "Flask", "tools": "Git", "ai_ml": "PyTorch"},
+    "achievements": ["Award"]
+}
+
+LATEX_SPECIAL_CHARS = re.compile(r'[\\&%$#_{}~^]')
+LATEX_REPLACEMENTS = (
+    ('&', '\\&'),
+    ('%', '\\%'),
+    ('$', '\\$'),
+    ('#', '\\#'),
+    ('_', '\\_'),
+    ('{', '\\{'),
+    ('}', '\\}'),
+    ('~', '\\textasciitilde{}'),
+    ('^', '\\textasciicircum{}'),
+)
 
 class LatexService:
     def __init__(self, template_dir='templates'):
@@ -21,59 +58,99 @@ class LatexService:
             line_comment_prefix='%#',
             trim_blocks=True,
             autoescape=False,
+            auto_reload=False,
         )
         self.env.filters['latex_escape'] = self.latex_escape
+        # Compiled once; render_latex never goes back through the loader
+        self.template = self.env.get_template('resume.tex')
+        # Stored alongside memoized LaTeX so edits to the template invalidate it
+        with open(self.template.filename, 'rb') as f:
+            self.template_version = hashlib.sha256(f.read()).hexdigest()
+        self.output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
+        self.pdf_cache = PdfCache(os.path.join(self.output_dir, 'pdf_cache'))
+        self.tectonic = TectonicEnvironment()
 
     @staticmethod
     def latex_escape(value):
         if not isinstance(value, str):
             return value
-        escaped = value.replace('\\', '\\textbackslash{}') \
-                    .replace('&', '\\&') \
-                    .replace('%', '\\%') \
-                    .replace('$', '\\$') \
-                    .replace('#', '\\#') \
-                    .replace('_', '\\_') \
-                    .replace('{', '\\{') \
-                    .replace('}', '\\}') \
-                    .replace('~', '\\textasciitilde{}') \
-                    .replace('^', '\\textasciicircum{}')
-        return escaped
+        # Most fields (names, dates, places) need no escaping at all
+        if not LATEX_SPECIAL_CHARS.search(value):
+            return value
+        # Park backslashes on a NUL placeholder so the braces of \textbackslash{}
+        # are not escaped by the passes below, then restore them last.
+        escaped = value.replace('\\', '\0')
+        for char, replacement in LATEX_REPLACEMENTS:
+            if char in escaped:
+                escaped = escaped.replace(char, replacement)
+        return escaped.replace('\0', '\\textbackslash{}')
 
     def render_latex(self, data):
         """Renders the LaTeX template with the provided data."""
         try:
-            template = self.env.get_template('resume.tex')
-            return template.render(data)
+            return self.template.render(data)
         except Exception as e:
             print(f"Error rendering template: {e}")
             return None
 
+    def render_many(self, resumes):
+        """Renders a batch of resume dicts; failed renders come back as None."""
+        return [self.render_latex(data) for data in resumes]
+
     def compile_pdf_from_string(self, latex_content):
-        """Compiles a raw LaTeX string into a PDF."""
-        output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
-        os.makedirs(output_dir, exist_ok=True)
+        """Compiles a raw LaTeX string into a PDF, reusing the cached PDF for identical sources."""
+        cache_key = self.pdf_cache.key_for(latex_content)
+        cached_path = self.pdf_cache.get(cache_key)
+        if cached_path:
+            return cached_path
         
-        unique_id = str(uuid.uuid4())
-        tex_filename = f"resume_{unique_id}.tex"
-        pdf_filename = f"resume_{unique_id}.pdf"
-        tex_path = os.path.join(output_dir, tex_filename)
-        pdf_path = os.path.join(output_dir, pdf_filename)
+        cached_path, _ = self._compile(latex_content, cache_key)
+        return cached_path
+
+    def compile_pdf_bytes(self, latex_content):
+        """Like compile_pdf_from_string, but returns the PDF bytes for streaming."""
+        cache_key = self.pdf_cache.key_for(latex_content)
+        cached_path = self.pdf_cache.get(cache_key)
+        if cached_path:
+            try:
+                with open(cached_path, 'rb') as f:
+                    return f.read()
+            except FileNotFoundError:
+                pass # Evicted between lookup and read; compile again
+        
+        _, pdf_bytes = self._compile(latex_content, cache_key)
+        return pdf_bytes
+
+    def _compile(self, latex_content, cache_key):
+        """Runs Tectonic in a throwaway workdir and returns (cached_path, pdf_bytes)."""
+        os.makedirs(self.output_dir, exist_ok=True)
         
-        print(f"tex_path: {tex_path}")
-        print(f"pdf_path: {pdf_path}")
-        with open(tex_path, 'w', encoding='utf-8') as f:
-            f.write(latex_content)
-            
         try:
-            # Use Tectonic instead of pdflatex
-            # Tectonic automatically downloads packages and handles multiple passes
-            subprocess.run(['tectonic', tex_path], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            return pdf_path
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            # Each compile gets its own workdir so concurrent runs never share
+            # intermediate files; Tectonic handles multiple passes itself. The
+            # directory, with its .tex/.aux/.log files, is deleted afterwards.
+            with tempfile.TemporaryDirectory(prefix='tectonic_', dir=self.output_dir) as workdir:
+                pdf_path = self.tectonic.compile(latex_content, workdir)
+                with open(pdf_path, 'rb') as f:
+                    pdf_bytes = f.read()
+                return self.pdf_cache.put(cache_key, pdf_path), pdf_bytes
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
             print(f"LaTeX compilation failed: {e}")
             raise e
 
+    def warm_up(self):
+        """Compiles the resume template once so later requests start from a warm cache."""
+        latex_content = self.render_latex(WARMUP_RESUME)
+        os.makedirs(self.output_dir, exist_ok=True)
+        try:
+            with tempfile.TemporaryDirectory(prefix='tectonic_', dir=self.output_dir) as workdir:
+                self.tectonic.compile(latex_content, workdir)
+            self.tectonic.warm = True
+            print(f"Tectonic warm-up finished in {self.tectonic.stats.last_seconds:.2f}s")
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError, CompileQueueFull) as e:
+            print(f"Tectonic warm-up failed: {e}")
+        return self.tectonic.warm
+
     def generate_pdf(self, data):
         # 1. Render LaTeX
         latex_content = self.render_latex(data)
@@ -82,19 +159,41 @@ class LatexService:
         if latex_content:
             try:
                 return self.compile_pdf_from_string(latex_content)
+            except CompileQueueFull:
+                # Shed load rather than piling more work onto a saturated host
+                raise
             except Exception:
                 print("Falling back to ReportLab...")
         
         # 3. Fallback
-        output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
+        output_dir = self.output_dir
         os.makedirs(output_dir, exist_ok=True)
         unique_id = str(uuid.uuid4())
         pdf_path = os.path.join(output_dir, f"resume_{unique_id}.pdf")
         self.generate_fallback_pdf(data, pdf_path)
         return pdf_path
 
+    def generate_pdf_bytes(self, data):
+        """Renders and compiles a resume entirely in memory, falling back to ReportLab."""
+        latex_content = self.render_latex(data)
+        
+        if latex_content:
+            try:
+                return self.compile_pdf_bytes(latex_content)
+            except CompileQueueFull:
+                raise
+            except Exception:
+                print("Falling back to ReportLab...")
+        
+        buffer = io.BytesIO()
+        self.generate_fallback_pdf(data, buffer)
+        return buffer.getvalue()
+
     def generate_fallback_pdf(self, data, output_path):
-        """Generates a simple PDF using ReportLab when LaTeX is unavailable."""
+        """Generates a simple PDF using ReportLab when LaTeX is unavailable.
+
+        `output_path` may be a filename or a writable binary file object such as BytesIO.
+        """
         c = canvas.Canvas(output_path, pagesize=letter)
         width, height = letter
         y = height - 50
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from services.cache_service import make_cache_key
+from services.resilience import Backoff, CircuitBreaker, is_retryable, is_upstream_failure, rate_limiter_from_env
+
+
+class LLMBusy(Exception):
+    """Raised when too many LLM calls are already running or waiting."""
+
+    def __init__(self, retry_after, message=None):
+        super().__init__(message or f"LLM request queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class LLMUnavailable(LLMBusy):
+    """Raised when Gemini keeps failing: retries are exhausted or the circuit breaker is open."""
+
+
+class LLMClient:
+    """Front for a Gemini model that bounds concurrent calls and coalesces duplicates.
+
+    Identical requests (same prompt and generation config) that arrive while one is
+    already in flight wait for that call instead of issuing their own. Limits are
+    per process, shared by every caller holding this client. Calls also draw from a
+    token bucket (optionally shared across workers, see rate_limiter_from_env), are
+    retried with jittered backoff on 429/5xx, and fail fast while the circuit
+    breaker is open.
+
+    Configuration comes from the environment:
+      LLM_MAX_CONCURRENCY  - upstream calls allowed at once (default 4)
+      LLM_MAX_QUEUE        - callers allowed to wait for a slot before we shed load (default 16)
+      LLM_ACQUIRE_TIMEOUT  - seconds a caller waits for a slot before giving up (default 30)
+    """
+
+    def __init__(self, model, max_concurrency=None, max_queue=None, acquire_timeout=None,
+                 rate_limiter=None, breaker=None, backoff=None, sleep=time.sleep):
+        self.model = model
+        self.max_concurrency = max_concurrency or int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv('LLM_MAX_QUEUE', '16'))
+        self.acquire_timeout = acquire_timeout or float(os.getenv('LLM_ACQUIRE_TIMEOUT', '30'))
+        self.running = 0
+        self.waiting = 0
+        self.calls = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.rate_limiter = rate_limiter if rate_limiter is not None else rate_limiter_from_env()
+        self.breaker = breaker or CircuitBreaker()
+        self.backoff = backoff or Backoff()
+        self.sleep = sleep
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._inflight = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def request_key(self, prompt, generation_config=None):
+        config = json.dumps(generation_config or {}, sort_keys=True, default=str)
+        return make_cache_key('generate_content', getattr(self.model, 'model_name', None), prompt, config)
+
+    def retry_after(self):
+        """Rough seconds until a slot frees up, based on observed call times."""
+        avg = self.total_seconds / self.calls if self.calls else 10.0
+        backlog = (self.waiting + self.running) / self.max_concurrency
+        return max(1, int(avg * backlog + 0.5))
+
+    def generate(self, prompt, generation_config=None):
+        """Blocking generate_content; runs on the calling thread unless an identical call is in flight."""
+        key = self.request_key(prompt, generation_config)
+        future, leader = self._join(key)
+        if leader:
+            self._lead(key, future, prompt, generation_config)
+        return future.result()
+
+    def submit(self, prompt, generation_config=None):
+        """Starts generate_content on the client's worker threads and returns a Future."""
+        key = self.request_key(prompt, generation_config)
+        future, leader = self._join(key)
+        if leader:
+            self._pool().submit(self._lead, key, future, prompt, generation_config)
+        return future
+
+    async def agenerate(self, prompt, generation_config=None):
+        """Awaitable generate_content for the asyncio-based agent."""
+        return await asyncio.wrap_future(self.submit(prompt, generation_config))
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Room for every running and waiting call, so submitted work is shed like sync calls
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency + self.max_queue, thread_name_prefix='llm'
+                )
+            return self._executor
+
+    def _join(self, key):
+        """Returns (future, True) for a new request, or the in-flight future and False."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _lead(self, key, future, prompt, generation_config):
+        try:
+            result = self._call_with_retries(prompt, generation_config)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+        else:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_result(result)
+
+    def _call_with_retries(self, prompt, generation_config):
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                retry_after = self.breaker.retry_after()
+                raise LLMUnavailable(retry_after, f"Gemini is failing, circuit open for another {retry_after}s")
+            try:
+                response = self._call(prompt, generation_config)
+            except LLMBusy:
+                # Shed before reaching upstream, so it says nothing about Gemini's health
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                # Anything but a 5xx/timeout proves upstream is reachable
+                if is_upstream_failure(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if not is_retryable(e):
+                    raise
+                delay = self.backoff.delay(attempt, e)
+                if attempt >= self.backoff.max_retries:
+                    raise LLMUnavailable(
+                        max(1, math.ceil(delay)), f"Gemini unavailable after {attempt + 1} attempts: {e}"
+                    ) from e
+                with self._lock:
+                    self.retries += 1
+                self.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return response
+
+    def _call(self, prompt, generation_config):
+        with self._slot():
+            return self.model.generate_content(prompt, generation_config=generation_config)
+
+    def stream(self, prompt, generation_config=None):
+        """Yields text chunks of a streaming generate_content, holding a slot until it ends.
+
+        Streams are neither coalesced nor retried (a partial answer can't be replayed),
+        but they count against the same rate limit, concurrency slots and breaker.
+        """
+        if not self.breaker.allow():
+            retry_after = self.breaker.retry_after()
+            raise LLMUnavailable(retry_after, f"Gemini is failing, circuit open for another {retry_after}s")
+        recorded = False
+        try:
+            with self._slot():
+                try:
+                    for chunk in self.model.generate_content(prompt, generation_config=generation_config, stream=True):
+                        yield chunk.text
+                except Exception as e:
+                    if is_upstream_failure(e):
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    recorded = True
+                    raise
+            self.breaker.record_success()
+            recorded = True
+        finally:
+            # Shed by _slot or abandoned by the consumer (GeneratorExit): no verdict on upstream
+            if not recorded:
+                self.breaker.release_trial()
+
+    @contextmanager
+    def _slot(self):
+        """Waits for a rate-limit token and a concurrency slot, shedding load when both are scarce."""
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.reserve(self.acquire_timeout)
+            if wait is None:
+                with self._lock:
+                    self.rejected += 1
+                raise LLMBusy(self.retry_after(), "Gemini rate limit budget exhausted")
+            if wait:
+                self.sleep(wait)
+
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise LLMBusy(self.retry_after())
+            self.waiting += 1
+
+        acquired = self._slots.acquire(timeout=self.acquire_timeout)
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+        if not acquired:
+            raise LLMBusy(self.retry_after())
+
+        with self._lock:
+            self.running += 1
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.running -= 1
+                self.calls += 1
+                self.total_seconds += elapsed
+                if failed:
+                    self.failures += 1
+            self._slots.release()
+
+    def metrics(self):
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'running': self.running,
+            'waiting': self.waiting,
+            'in_flight': len(self._inflight),
+            'calls': self.calls,
+            'failures': self.failures,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'retries': self.retries,
+            'rate_limit': self.rate_limiter.metrics() if self.rate_limiter is not None else None,
+            'breaker': self.breaker.metrics(),
+            'avg_seconds': round(self.total_seconds / self.calls, 3) if self.calls else None,
+        }
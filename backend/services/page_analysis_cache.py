@@ -0,0 +1,112 @@
+import hashlib
+import os
+from extensions import db
+from services.agent_scheduler import job_domain
+
+
+def form_fingerprint(controls):
+    """SHA-256 of a page's form structure; controls are strings like "input|email|email"."""
+    return hashlib.sha256('\n'.join(sorted(controls)).encode('utf-8')).hexdigest()
+
+
+class PageAnalysisCache:
+    """Persists the agent's page analyses by (domain, form fingerprint).
+
+    Job boards render the same form for every posting, so an analysis that
+    worked once is served again without an LLM call. Each use reports how many
+    of its selectors failed; confidence is scaled by the success ratio (and
+    nudged up by clean runs), and an entry that drops below min_confidence is
+    deleted so the next visit re-analyzes the page.
+
+    Configuration comes from the environment:
+      PAGE_CACHE_ENABLED         - "false" to always ask the LLM (default true)
+      PAGE_CACHE_MIN_CONFIDENCE  - entries below this are invalidated (default 0.5)
+    """
+
+    SUCCESS_BOOST = 0.1
+
+    def __init__(self, app, min_confidence=None, enabled=None):
+        self.app = app
+        self.min_confidence = min_confidence or float(os.getenv('PAGE_CACHE_MIN_CONFIDENCE', '0.5'))
+        if enabled is None:
+            enabled = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def key(self, url, controls):
+        return job_domain(url), form_fingerprint(controls)
+
+    def get(self, domain, fingerprint):
+        from models import PageAnalysis
+
+        if not self.enabled:
+            return None
+        with self.app.app_context():
+            try:
+                entry = PageAnalysis.query.filter_by(domain=domain, fingerprint=fingerprint).first()
+                if entry is None or entry.confidence < self.min_confidence:
+                    self.misses += 1
+                    return None
+                entry.hits = (entry.hits or 0) + 1
+                db.session.commit()
+                self.hits += 1
+                return entry.analysis
+            finally:
+                db.session.remove()
+
+    def put(self, domain, fingerprint, analysis):
+        from models import PageAnalysis
+
+        if not self.enabled:
+            return
+        with self.app.app_context():
+            try:
+                entry = PageAnalysis.query.filter_by(domain=domain, fingerprint=fingerprint).first()
+                if entry is None:
+                    db.session.add(PageAnalysis(domain=domain, fingerprint=fingerprint, analysis=analysis, confidence=1.0, hits=0))
+                else:
+                    entry.analysis, entry.confidence = analysis, 1.0
+                db.session.commit()
+            except Exception as e:
+                # Another worker stored the same page first
+                db.session.rollback()
+                print(f"Page analysis cache: could not store {domain}: {e}")
+            finally:
+                db.session.remove()
+
+    def record(self, domain, fingerprint, attempted, failed):
+        """Adjusts confidence after a cached analysis was used; returns the new confidence, or None."""
+        from models import PageAnalysis
+
+        if not self.enabled or not attempted:
+            return None
+        with self.app.app_context():
+            try:
+                entry = PageAnalysis.query.filter_by(domain=domain, fingerprint=fingerprint).first()
+                if entry is None:
+                    return None
+                if failed:
+                    entry.confidence *= 1 - failed / attempted
+                else:
+                    entry.confidence = min(1.0, entry.confidence + self.SUCCESS_BOOST)
+                confidence = entry.confidence
+                if confidence < self.min_confidence:
+                    print(f"Page analysis cache: invalidating {domain} ({failed}/{attempted} selectors failed)")
+                    db.session.delete(entry)
+                    self.invalidations += 1
+                db.session.commit()
+                return confidence
+            finally:
+                db.session.remove()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,34 @@
+"""Parser worker process, started by ParserService as `python -m services.parse_worker`.
+
+Reads pickled (fn, args) calls from stdin and writes pickled (ok, value)
+replies to stdout, one at a time. Only the called function's module is
+imported, never app.py, so starting a worker doesn't re-run the app's
+startup (job recovery, janitor, agent scheduler).
+"""
+import pickle
+import sys
+
+
+def main():
+    calls, replies = sys.stdin.buffer, sys.stdout.buffer
+    # Anything a parser prints must not end up in the reply stream
+    sys.stdout = sys.stderr
+    while True:
+        try:
+            fn, args = pickle.load(calls)
+        except EOFError:
+            return
+        try:
+            reply = (True, fn(*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            data = pickle.dumps(reply)
+        except Exception:
+            data = pickle.dumps((False, RuntimeError(repr(reply[1]))))
+        replies.write(data)
+        replies.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,34 +1,220 @@
 import PyPDF2
 import docx
-import io
+from docx.table import Table
+import hashlib
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+from services.resume_structure import parse_resume_text
+
+COPY_CHUNK_BYTES = 64 * 1024
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+def pdf_chunks(path, max_pages):
+    reader = PyPDF2.PdfReader(path)
+    for index, page in enumerate(reader.pages):
+        if index >= max_pages:
+            break
+        yield page.extract_text() or ''
+
+
+def docx_chunks(path):
+    """Paragraph and table text in document order; table rows become ' | '-separated lines."""
+    document = docx.Document(path)
+    for block in document.iter_inner_content():
+        if isinstance(block, Table):
+            for row in block.rows:
+                cells = []
+                for cell in row.cells:
+                    # Merged cells are reported once per grid column they span
+                    text = cell.text.strip()
+                    if text and (not cells or cells[-1] != text):
+                        cells.append(text)
+                if cells:
+                    yield ' | '.join(cells)
+        else:
+            yield block.text
+
+
+class ParseWorker:
+    """One `python -m services.parse_worker` process; a call that overruns kills only this worker."""
+
+    MAX_TASKS = 100
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'services.parse_worker'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=BACKEND_DIR,
+        )
+        self.tasks = 0
+        self._replies = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        while True:
+            try:
+                self._replies.put(pickle.load(self.process.stdout))
+            except Exception:
+                # EOF: the process exited or was killed
+                self._replies.put((False, RuntimeError("parser worker exited")))
+                return
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def reusable(self):
+        return self.alive() and self.tasks < self.MAX_TASKS
+
+    def call(self, fn, args, timeout):
+        self.tasks += 1
+        pickle.dump((fn, args), self.process.stdin)
+        self.process.stdin.flush()
+        try:
+            ok, value = self._replies.get(timeout=timeout)
+        except queue.Empty:
+            # The only way to stop a runaway parse is to kill its process
+            self.kill()
+            raise ParseTimeout()
+        if not ok:
+            raise value
+        return value
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+
+
+def extract_file(path, kind, max_pages):
+    """Runs in a parser worker process; joins the chunks once instead of growing a string."""
+    chunks = pdf_chunks(path, max_pages) if kind == 'pdf' else docx_chunks(path)
+    return '\n'.join(chunks) + '\n'
+
 
 class ParserService:
+    """Extracts resume text from PDF/DOCX uploads.
+
+    Uploads are spooled to a temporary file with a size cap and parsed in one
+    of a few worker processes, so a pathological file can be killed at the
+    timeout instead of pinning a request worker's CPU. Only the stuck worker is
+    killed; parses running in the others carry on.
+
+    Configuration comes from the environment:
+      PARSE_MAX_MB      - largest accepted upload (default 10)
+      PARSE_MAX_PAGES   - PDF pages read (default 20)
+      PARSE_TIMEOUT     - seconds before a parse is abandoned and its worker killed (default 20)
+      PARSE_WORKERS     - parser processes; 0 parses in-process without a timeout (default 2)
+    """
+
+    # extract_text reports failures in-band; these prefixes mark such messages
+    ERROR_PREFIXES = ("Unsupported file format", "Error reading")
+
+    def __init__(self, max_bytes=None, max_pages=None, timeout=None, workers=None):
+        self.max_bytes = max_bytes or int(float(os.getenv('PARSE_MAX_MB', '10')) * 1024 * 1024)
+        self.max_pages = max_pages or int(os.getenv('PARSE_MAX_PAGES', '20'))
+        self.timeout = timeout or float(os.getenv('PARSE_TIMEOUT', '20'))
+        self.workers = workers if workers is not None else int(os.getenv('PARSE_WORKERS', '2'))
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(max(self.workers, 1))
+        self._lock = threading.Lock()
+
+    def is_error(self, text):
+        return text.startswith(self.ERROR_PREFIXES)
+
+    def file_hash(self, file_storage):
+        """SHA-256 of the upload, read in chunks; rewinds the stream afterwards."""
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: file_storage.stream.read(COPY_CHUNK_BYTES), b''):
+            digest.update(chunk)
+        file_storage.stream.seek(0)
+        return digest.hexdigest()
+
     def extract_text(self, file_storage):
         filename = file_storage.filename.lower()
-        
+
         if filename.endswith('.pdf'):
-            return self._extract_from_pdf(file_storage)
+            kind, label = 'pdf', 'PDF'
         elif filename.endswith('.docx'):
-            return self._extract_from_docx(file_storage)
+            kind, label = 'docx', 'DOCX'
         else:
             return "Unsupported file format. Please upload PDF or DOCX."
 
-    def _extract_from_pdf(self, file_storage):
+        path = None
         try:
-            pdf_reader = PyPDF2.PdfReader(file_storage)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+            path = self._spool(file_storage)
+            return self.run(extract_file, path, kind, self.max_pages)
+        except ParseTimeout:
+            return f"Error reading {label}: parsing took longer than {self.timeout:g}s"
         except Exception as e:
-            return f"Error reading PDF: {str(e)}"
+            return f"Error reading {label}: {str(e)}"
+        finally:
+            if path:
+                os.remove(path)
 
-    def _extract_from_docx(self, file_storage):
+    def parse_structured(self, text):
+        """Splits extracted text into the JSON shape templates/resume.tex renders, without the LLM.
+
+        Sections are found by their headings; entries the heuristics cannot
+        read are left with empty fields rather than guessed.
+        """
+        return parse_resume_text(text)
+
+    def _spool(self, file_storage):
+        """Copies the upload to a temp file in chunks, refusing anything over max_bytes."""
+        fd, path = tempfile.mkstemp(prefix='modres-upload-')
         try:
-            doc = docx.Document(file_storage)
-            text = ""
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-            return text
-        except Exception as e:
-            return f"Error reading DOCX: {str(e)}"
+            with os.fdopen(fd, 'wb') as out:
+                copied = 0
+                for chunk in iter(lambda: file_storage.stream.read(COPY_CHUNK_BYTES), b''):
+                    copied += len(chunk)
+                    if copied > self.max_bytes:
+                        raise ValueError(f"file is larger than {self.max_bytes // (1024 * 1024)} MB")
+                    out.write(chunk)
+        except Exception:
+            os.remove(path)
+            raise
+        return path
+
+    def run(self, fn, *args):
+        """Calls fn(*args) in a parser process, raising ParseTimeout after self.timeout seconds."""
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ParseTimeout()
+        try:
+            worker = self._checkout()
+            try:
+                return worker.call(fn, args, self.timeout)
+            finally:
+                self._checkin(worker)
+        finally:
+            self._slots.release()
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return ParseWorker()
+
+    def _checkin(self, worker):
+        if worker.reusable():
+            with self._lock:
+                self._idle.append(worker)
+        else:
+            worker.kill()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
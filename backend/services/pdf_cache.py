@@ -0,0 +1,70 @@
+import hashlib
+import os
+import threading
+
+
+class PdfCache:
+    """Content-addressed store of compiled PDFs, keyed by the LaTeX source hash.
+
+    Entries are plain files named `<sha256>.pdf`. A hit refreshes the file's
+    mtime, so evicting the oldest mtimes first gives LRU behaviour within a
+    total size budget.
+    """
+
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv('PDF_CACHE_MAX_MB', '200')) * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(latex_content):
+        return hashlib.sha256(latex_content.encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key, pdf_path):
+        """Moves a freshly compiled PDF into the store and returns its cached path."""
+        path = self.path_for(key)
+        os.replace(pdf_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.pdf'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,251 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+
+THROTTLED_STATUSES = frozenset({429})
+SERVER_ERROR_STATUSES = frozenset({500, 502, 503, 504})
+
+
+def _refill(tokens, updated_at, now, rate, capacity):
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+
+class _BucketStats:
+    def __init__(self):
+        self.granted = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    def record(self, wait):
+        if wait is None:
+            self.rejected += 1
+            return
+        self.granted += 1
+        if wait > 0:
+            self.throttled += 1
+            self.wait_seconds += wait
+
+    def as_dict(self):
+        return {
+            'granted': self.granted,
+            'throttled': self.throttled,
+            'rejected': self.rejected,
+            'wait_seconds': round(self.wait_seconds, 3),
+        }
+
+
+class TokenBucket:
+    """In-process token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated_at = clock()
+        self.stats = _BucketStats()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait):
+        """Takes a token and returns how long to wait before using it, or None if that exceeds max_wait."""
+        with self._lock:
+            now = self.clock()
+            tokens = _refill(self.tokens, self.updated_at, now, self.rate, self.capacity)
+            wait = max(0.0, (1 - tokens) / self.rate)
+            if wait <= max_wait:
+                tokens -= 1
+            else:
+                wait = None
+            self.tokens, self.updated_at = tokens, now
+            self.stats.record(wait)
+            return wait
+
+    def metrics(self):
+        return dict(self.stats.as_dict(), backend='memory', rate_per_minute=self.rate * 60, burst=self.capacity)
+
+
+class SQLiteTokenBucket:
+    """Token bucket kept in a SQLite file so every gunicorn worker on a host draws from one budget."""
+
+    def __init__(self, path, rate, capacity, name='gemini'):
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        self.name = name
+        self.stats = _BucketStats()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limit (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def reserve(self, max_wait):
+        now = time.time()
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front so read-modify-write is atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT tokens, updated_at FROM rate_limit WHERE name = ?", (self.name,)).fetchone()
+            tokens = _refill(row[0], row[1], now, self.rate, self.capacity) if row else float(self.capacity)
+            wait = max(0.0, (1 - tokens) / self.rate)
+            if wait <= max_wait:
+                tokens -= 1
+            else:
+                wait = None
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (self.name, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        self.stats.record(wait)
+        return wait
+
+    def metrics(self):
+        return dict(self.stats.as_dict(), backend='sqlite', rate_per_minute=self.rate * 60, burst=self.capacity)
+
+
+def rate_limiter_from_env():
+    """Builds the Gemini token bucket from LLM_RATE_* environment variables (None when disabled)."""
+    kind = os.getenv('LLM_RATE_LIMIT_BACKEND', 'memory').lower()
+    if kind == 'none':
+        return None
+    rate = float(os.getenv('LLM_RATE_PER_MINUTE', '60')) / 60
+    burst = int(os.getenv('LLM_RATE_BURST', '10'))
+    if kind == 'sqlite':
+        default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'llm_rate.db')
+        return SQLiteTokenBucket(os.getenv('LLM_RATE_LIMIT_PATH', default_path), rate, burst)
+    return TokenBucket(rate, burst)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures, letting one trial call through per reset period."""
+
+    def __init__(self, failure_threshold=None, reset_timeout=None, clock=time.monotonic):
+        self.failure_threshold = failure_threshold or int(os.getenv('LLM_BREAKER_THRESHOLD', '5'))
+        self.reset_timeout = reset_timeout or float(os.getenv('LLM_BREAKER_RESET', '30'))
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.opens = 0
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    def retry_after(self):
+        if self.opened_at is None:
+            return 0
+        return max(1, int(self.opened_at + self.reset_timeout - self.clock() + 0.5))
+
+    def allow(self):
+        """True if a call may go upstream; half-open admits a single trial call."""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.opened_at = None
+
+    def release_trial(self):
+        """Hands back a half-open trial that never reached upstream, so the next caller can make it."""
+        with self._lock:
+            if self.state == 'half_open':
+                self.state = 'open'
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.opens += 1
+                self.state = 'open'
+                self.opened_at = self.clock()
+
+    def metrics(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'opens': self.opens,
+            'short_circuited': self.short_circuited,
+        }
+
+
+def status_code(exc):
+    """HTTP status of an upstream error (google.api_core exceptions carry it as .code), if any."""
+    code = getattr(exc, 'code', None)
+    if code is None or callable(code):
+        return None
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc):
+    return (
+        status_code(exc) in THROTTLED_STATUSES | SERVER_ERROR_STATUSES
+        or isinstance(exc, (TimeoutError, ConnectionError))
+    )
+
+
+def is_upstream_failure(exc):
+    """Errors that mean the service itself is unhealthy (counted by the circuit breaker)."""
+    return status_code(exc) in SERVER_ERROR_STATUSES or isinstance(exc, (TimeoutError, ConnectionError))
+
+
+def retry_after_hint(exc):
+    """Seconds the upstream asked us to wait, from a Retry-After header or a RetryInfo detail."""
+    value = getattr(exc, 'retry_after', None)
+    headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    if value is None and headers:
+        value = headers.get('Retry-After')
+    if value is None:
+        for detail in getattr(exc, 'details', None) or []:
+            delay = getattr(detail, 'retry_delay', None)
+            if delay is not None:
+                value = delay.seconds + delay.nanos / 1e9
+                break
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class Backoff:
+    """Exponential backoff with full jitter; an upstream Retry-After takes precedence."""
+
+    def __init__(self, max_retries=None, base_delay=None, max_delay=None):
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('LLM_MAX_RETRIES', '3'))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv('LLM_BACKOFF_BASE', '1'))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv('LLM_BACKOFF_MAX', '30'))
+
+    def delay(self, attempt, exc=None):
+        hint = retry_after_hint(exc) if exc is not None else None
+        if hint is not None:
+            return min(hint, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
@@ -0,0 +1,244 @@
+import re
+
+# Heading text (lowercased, without trailing colon) -> section
+SECTION_ALIASES = {
+    'summary': 'objective', 'objective': 'objective', 'profile': 'objective', 'about me': 'objective',
+    'professional summary': 'objective', 'career objective': 'objective', 'career summary': 'objective',
+    'experience': 'experience', 'work experience': 'experience', 'professional experience': 'experience',
+    'employment': 'experience', 'employment history': 'experience', 'work history': 'experience',
+    'relevant experience': 'experience', 'internships': 'experience', 'experience & internships': 'experience',
+    'education': 'education', 'academic background': 'education', 'academics': 'education',
+    'education & certifications': 'education',
+    'skills': 'skills', 'technical skills': 'skills', 'core competencies': 'skills', 'technologies': 'skills',
+    'skills & tools': 'skills', 'tech stack': 'skills', 'key skills': 'skills',
+    'projects': 'projects', 'personal projects': 'projects', 'academic projects': 'projects',
+    'selected projects': 'projects', 'key projects': 'projects',
+    'achievements': 'achievements', 'awards': 'achievements', 'honors': 'achievements',
+    'honors & awards': 'achievements', 'awards & achievements': 'achievements',
+    'certifications': 'achievements', 'accomplishments': 'achievements', 'publications': 'achievements',
+}
+
+# Skill line labels ("Languages: Python, Go") -> template skills key, first match wins.
+# Whole words only, so "Databases" isn't "data", "Containers" isn't "ai" and "HTML" isn't "ml".
+SKILL_LABELS = (
+    ('languages', re.compile(r"\b(languages?|programming)\b", re.IGNORECASE)),
+    ('web', re.compile(r"\b(web|frontend|front-end|backend|back-end)\b", re.IGNORECASE)),
+    ('frameworks', re.compile(r"\b(frameworks?|librar(y|ies))\b", re.IGNORECASE)),
+    ('tools', re.compile(r"\bdatabases?\b", re.IGNORECASE)),
+    ('ai_ml', re.compile(r"\b(ai|ml|machine learning|deep learning|data)\b", re.IGNORECASE)),
+    ('tools', re.compile(r"\b(tools?|platforms?|cloud|devops|other|technolog(y|ies))\b", re.IGNORECASE)),
+)
+KNOWN_LANGUAGES = frozenset(
+    'python java javascript typescript c c++ c# go golang rust ruby php kotlin swift scala r sql bash shell '
+    'matlab perl dart haskell elixir lua julia html css'.split()
+)
+
+BULLET = re.compile(r"^[-•*▪●◦‣–·]\s*")
+# A bullet ending like this was wrapped onto the next line
+DANGLING = re.compile(r"(,|\b(a|an|and|by|for|from|in|of|on|or|the|to|with))$", re.IGNORECASE)
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+PHONE = re.compile(r"(\+?\(?\d[\d\s().-]{7,}\d)")
+URL = re.compile(r"(https?://)?(www\.)?(linkedin\.com|github\.com|kaggle\.com)/[^\s|,]+", re.IGNORECASE)
+MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE = rf"(({MONTH}\s*)?\d{{4}}|\d{{1,2}}/\d{{4}})"
+DATE_RANGE = re.compile(
+    rf"{DATE}(\s*(-|–|—|to)\s*({DATE}|present|current|now|ongoing))?",
+    re.IGNORECASE,
+)
+SEPARATORS = re.compile(r"\s+[|–—]\s+|\s+-\s+|\s+at\s+|\s*@\s*|,\s+|\t+")
+HEADER_SEPARATORS = re.compile(r"\s*[|•·]\s*|\t+|\s{3,}")
+DEGREE = re.compile(
+    r"\b(bachelor|master|ph\.?d|doctor|associate|diploma|b\.?s\.?c?|m\.?s\.?c?|b\.?a\.?|m\.?a\.?|b\.?tech|m\.?tech"
+    r"|b\.?e\.?|m\.?e\.?|mba|degree|high school)\b",
+    re.IGNORECASE,
+)
+SCHOOL = re.compile(r"\b(university|college|institute|school|academy|polytechnic)\b", re.IGNORECASE)
+LOCATION = re.compile(r"^[A-Z][\w .'-]+,\s*[A-Z][\w .'-]+$|^remote$", re.IGNORECASE)
+STACK_LABEL = re.compile(r"^(stack|tech stack|tech|technologies|tools|built with)\s*:\s*", re.IGNORECASE)
+
+
+def section_of(line):
+    key = re.sub(r"\s+", ' ', line.strip().rstrip(':').lower())
+    return SECTION_ALIASES.get(key)
+
+
+def _empty_resume():
+    return {
+        "name": "", "role": "", "email": "", "phone": "", "location": "",
+        "linkedin": "", "github": "", "kaggle": "", "objective": "",
+        "education": [], "experience": [], "projects": [],
+        "skills": {"languages": "", "web": "", "frameworks": "", "ai_ml": "", "tools": ""},
+        "achievements": [],
+    }
+
+
+def split_sections(lines):
+    """Returns (header lines, {section: lines}) using SECTION_ALIASES headings."""
+    header, sections, current = [], {}, None
+    for line in lines:
+        section = section_of(line) if len(line) <= 40 else None
+        if section:
+            current = section
+            sections.setdefault(current, [])
+        elif current is None:
+            header.append(line)
+        else:
+            sections[current].append(line)
+    return header, sections
+
+
+def entries(lines):
+    """Groups section lines into entries of (header lines, bullet points)."""
+    result = []
+    for line in lines:
+        if BULLET.match(line):
+            if not result:
+                result.append(([], []))
+            result[-1][1].append(BULLET.sub('', line))
+        elif result and result[-1][1] and (line[:1].islower() or DANGLING.search(result[-1][1][-1])):
+            # Wrapped continuation of the previous bullet
+            result[-1][1][-1] += ' ' + line
+        elif not result or result[-1][1]:
+            result.append(([line], []))
+        else:
+            result[-1][0].append(line)
+    return result
+
+
+def take_dates(text):
+    """Pulls the first date range out of text; returns (dates, remaining text)."""
+    match = DATE_RANGE.search(text)
+    if not match:
+        return '', text
+    remaining = (text[:match.start()] + ' ' + text[match.end():]).strip(' |,–—-\t')
+    return match.group(0).strip(), re.sub(r"\s{2,}", ' ', remaining)
+
+
+def _parts(text):
+    return [p.strip() for p in SEPARATORS.split(text) if p and p.strip()]
+
+
+def parse_header(header, resume):
+    text = ' | '.join(header)
+    email = EMAIL.search(text)
+    if email:
+        resume["email"] = email.group(0)
+    for match in URL.finditer(text):
+        url = match.group(0)
+        site = match.group(3).lower().split('.')[0]
+        resume[site] = url if url.lower().startswith('http') else 'https://' + url
+    phone = PHONE.search(EMAIL.sub('', URL.sub('', text)))
+    if phone:
+        resume["phone"] = phone.group(1).strip()
+
+    plain = []
+    for line in header:
+        for part in (p.strip() for p in HEADER_SEPARATORS.split(line) if p.strip()):
+            if not (EMAIL.search(part) or URL.search(part) or PHONE.fullmatch(part)):
+                plain.append(part)
+    if plain:
+        resume["name"] = plain[0]
+    for part in plain[1:]:
+        if not resume["location"] and LOCATION.match(part):
+            resume["location"] = part
+        elif not resume["role"] and len(part.split()) <= 6:
+            resume["role"] = part
+
+
+def parse_experience(lines):
+    experience = []
+    for header, points in entries(lines):
+        dates, text = take_dates(' | '.join(header))
+        parts = _parts(text)
+        location = next((p for p in parts[2:] if LOCATION.match(p)), '')
+        if not location and len(parts) > 2 and LOCATION.match(', '.join(parts[-2:])):
+            location = ', '.join(parts[-2:])
+            parts = parts[:-2]
+        rest = [p for p in parts if p != location]
+        experience.append({
+            "title": rest[0] if rest else '',
+            "company": rest[1] if len(rest) > 1 else '',
+            "location": location,
+            "dates": dates,
+            "points": points,
+        })
+    return experience
+
+
+def parse_education(lines):
+    education = []
+    for header, points in entries(lines):
+        entry = {"school": "", "location": "", "degree": "", "dates": ""}
+        for line in header + points:
+            dates, line = take_dates(line)
+            entry["dates"] = entry["dates"] or dates
+            # School names keep their commas and "at" ("University of California, Berkeley")
+            if SCHOOL.search(line) and not DEGREE.search(line) and not entry["school"]:
+                entry["school"] = line
+                continue
+            for part in _parts(line):
+                if SCHOOL.search(part) and not entry["school"]:
+                    entry["school"] = part
+                elif DEGREE.search(part) and not entry["degree"]:
+                    entry["degree"] = part
+                elif entry["degree"] and not entry["location"] and LOCATION.match(part):
+                    entry["location"] = part
+                elif entry["degree"] and part[:1].isupper() and ' ' in part and not LOCATION.match(part):
+                    entry["degree"] += ', ' + part
+        if not entry["school"] and header:
+            entry["school"] = header[0]
+        education.append(entry)
+    return education
+
+
+def parse_skills(lines):
+    skills = {key: [] for key in ('languages', 'web', 'frameworks', 'ai_ml', 'tools')}
+    for line in lines:
+        line = BULLET.sub('', line)
+        label, sep, values = line.partition(':')
+        items = [v.strip() for v in re.split(r"[,;|•]", values if sep else line) if v.strip()]
+        key = None
+        if sep:
+            key = next((k for k, pattern in SKILL_LABELS if pattern.search(label)), 'tools')
+        for item in items:
+            skills[key or ('languages' if item.lower() in KNOWN_LANGUAGES else 'tools')].append(item)
+    return {key: ', '.join(values) for key, values in skills.items()}
+
+
+def parse_projects(lines):
+    projects = []
+    for header, points in entries(lines):
+        title, stack = header[0] if header else '', ''
+        description = []
+        for line in header[1:] + points:
+            if STACK_LABEL.match(line):
+                stack = STACK_LABEL.sub('', line)
+            else:
+                description.append(line)
+        paren = re.search(r"\(([^)]*)\)\s*$", title)
+        if paren and not stack:
+            stack = paren.group(1)
+            title = title[:paren.start()].strip()
+        title, sep, inline_stack = title.partition(' | ')
+        stack = stack or inline_stack
+        projects.append({"title": title.strip(), "description": ' '.join(description), "stack": stack.strip()})
+    return projects
+
+
+def parse_resume_text(text):
+    """Segments plain resume text into the JSON shape templates/resume.tex renders."""
+    lines = [re.sub(r"\s+", ' ', line).strip() for line in (text or '').splitlines()]
+    lines = [line for line in lines if line]
+    header, sections = split_sections(lines)
+    resume = _empty_resume()
+    parse_header(header, resume)
+
+    resume["objective"] = ' '.join(BULLET.sub('', l) for l in sections.get('objective', []))
+    resume["experience"] = parse_experience(sections.get('experience', []))
+    resume["education"] = parse_education(sections.get('education', []))
+    resume["skills"] = parse_skills(sections.get('skills', []))
+    resume["projects"] = parse_projects(sections.get('projects', []))
+    resume["achievements"] = [BULLET.sub('', l) for l in sections.get('achievements', [])]
+    if not resume["role"] and resume["experience"]:
+        resume["role"] = resume["experience"][0]["title"]
+    return resume
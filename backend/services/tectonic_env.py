@@ -0,0 +1,176 @@
+import os
+import subprocess
+import threading
+import time
+
+
+class CompileStats:
+    """Thread-safe counters for Tectonic compile timings."""
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self.count += 1
+            if not ok:
+                self.failures += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.last_seconds = seconds
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'failures': self.failures,
+            'avg_seconds': round(self.total_seconds / self.count, 3) if self.count else None,
+            'max_seconds': round(self.max_seconds, 3),
+            'last_seconds': round(self.last_seconds, 3) if self.last_seconds is not None else None,
+        }
+
+
+class CompileQueueFull(Exception):
+    """Raised when too many compiles are already running or waiting."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"LaTeX compile queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class CompileExecutor:
+    """Caps concurrent Tectonic processes and the number of callers waiting for one.
+
+    Configuration comes from the environment:
+      LATEX_MAX_CONCURRENCY   - compiles allowed to run at once (default 2)
+      LATEX_MAX_QUEUE         - callers allowed to wait for a slot before we shed load (default 8)
+      LATEX_COMPILE_TIMEOUT   - seconds before a compile is killed (default 60)
+    """
+
+    def __init__(self, max_concurrency=None, max_queue=None, timeout=None, stats=None):
+        self.max_concurrency = max_concurrency or int(os.getenv('LATEX_MAX_CONCURRENCY', '2'))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv('LATEX_MAX_QUEUE', '8'))
+        self.timeout = timeout or float(os.getenv('LATEX_COMPILE_TIMEOUT', '60'))
+        self.stats = stats
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+
+    def retry_after(self):
+        """Rough seconds until a slot frees up, based on observed compile times."""
+        avg = 5.0
+        if self.stats and self.stats.count:
+            avg = self.stats.total_seconds / self.stats.count
+        backlog = (self.waiting + self.running) / self.max_concurrency
+        return max(1, int(avg * backlog + 0.5))
+
+    def run(self, cmd, **kwargs):
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise CompileQueueFull(self.retry_after())
+            self.waiting += 1
+
+        acquired = self._slots.acquire(timeout=self.timeout)
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+        if not acquired:
+            raise CompileQueueFull(self.retry_after())
+
+        with self._lock:
+            self.running += 1
+        try:
+            # subprocess.run kills the child when the timeout expires
+            return subprocess.run(cmd, timeout=self.timeout, **kwargs)
+        except subprocess.TimeoutExpired:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+
+    def metrics(self):
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'running': self.running,
+            'waiting': self.waiting,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+        }
+
+
+class TectonicEnvironment:
+    """Builds Tectonic invocations against a managed, pre-seeded resource cache.
+
+    Configuration comes from the environment:
+      TECTONIC_CACHE_DIR   - where Tectonic keeps its downloaded bundle files and format cache
+      TECTONIC_BUNDLE      - optional local bundle file used instead of the network bundle
+      TECTONIC_ONLY_CACHED - "true" to forbid network access (requires a seeded cache)
+    """
+
+    def __init__(self, cache_dir=None, bundle=None, only_cached=None, binary='tectonic'):
+        self.cache_dir = cache_dir or os.getenv('TECTONIC_CACHE_DIR')
+        self.bundle = bundle or os.getenv('TECTONIC_BUNDLE')
+        if only_cached is None:
+            only_cached = os.getenv('TECTONIC_ONLY_CACHED', 'false').lower() == 'true'
+        self.only_cached = only_cached
+        self.binary = binary
+        self.warm = False
+        self.stats = CompileStats()
+        self.executor = CompileExecutor(stats=self.stats)
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def command(self, tex_path, outdir):
+        cmd = [self.binary, '--outdir', outdir]
+        if self.bundle:
+            cmd += ['--bundle', self.bundle]
+        if self.only_cached:
+            cmd.append('--only-cached')
+        cmd.append(tex_path)
+        return cmd
+
+    def env(self):
+        env = dict(os.environ)
+        if self.cache_dir:
+            env['TECTONIC_CACHE_DIR'] = self.cache_dir
+        return env
+
+    def compile(self, latex_content, workdir):
+        """Compiles LaTeX inside an isolated workdir and returns the produced PDF path."""
+        tex_path = os.path.join(workdir, 'resume.tex')
+        with open(tex_path, 'w', encoding='utf-8') as f:
+            f.write(latex_content)
+
+        start = time.perf_counter()
+        ok = False
+        try:
+            self.executor.run(
+                self.command(tex_path, workdir),
+                check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                cwd=workdir, env=self.env()
+            )
+            ok = True
+        finally:
+            self.stats.record(time.perf_counter() - start, ok=ok)
+        return os.path.join(workdir, 'resume.pdf')
+
+    def metrics(self):
+        return dict(
+            self.stats.as_dict(),
+            warm=self.warm,
+            only_cached=self.only_cached,
+            executor=self.executor.metrics()
+        )
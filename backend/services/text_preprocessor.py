@@ -0,0 +1,178 @@
+import os
+import re
+import unicodedata
+
+# Explicit page markers ("Page 2", "Page 2 of 4", "- Page 2 -"); bare numbers may be years or phone numbers
+PAGE_MARKER = re.compile(r"^[-\s]*page\s*\d+(\s*(of|/)\s*\d+)?[-\s]*$", re.IGNORECASE)
+
+# Legal/HR text that appears in most JDs and never affects tailoring
+BOILERPLATE_LINE = re.compile(
+    r"equal (employment )?opportunity|\beeo\b|affirmative action|without regard to (race|age|sex|gender)"
+    r"|reasonable accommodation|e-verify|protected veteran|pay transparency|applicant privacy"
+    r"|fair chance|drug[- ]free workplace|background check",
+    re.IGNORECASE,
+)
+# Whole heading lines that introduce a legal/HR paragraph; a prefix match would eat
+# real sections ("Privacy engineering duties:", "Legal Counsel")
+BOILERPLATE_HEADING = re.compile(
+    r"(eeoc?|equal (employment )?opportunity( employer)?)( statement)?"
+    r"|(reasonable )?accommodations?( statement)?|(applicant |candidate )?privacy (notice|policy|statement)"
+    r"|(legal )?disclaimer|legal notice",
+    re.IGNORECASE,
+)
+
+# JD sections dropped first when a JD is over budget
+LOW_PRIORITY_SECTION = re.compile(
+    r"benefits|perks|what we offer|about (us|the company)|who we are|our (culture|values|story)|life at"
+    r"|compensation|salary|why join",
+    re.IGNORECASE,
+)
+
+TRUNCATION_MARKER = '[...]'
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count (about four characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def _is_heading(line):
+    words = line.rstrip(':').split()
+    return 0 < len(words) <= 5 and (line.endswith(':') or line.isupper()) and not line.startswith(('-', '*', '•'))
+
+
+class TextPreprocessor:
+    """Shrinks resume and JD text before it is interpolated into an LLM prompt.
+
+    Whitespace and PDF artifacts are normalized, repeated header/footer lines
+    are removed, JD page markers and legal boilerplate are stripped, and text
+    over its token budget is cut section by section rather than from the end.
+
+    Configuration comes from the environment:
+      PROMPT_PREPROCESS         - "false" to pass text through untouched (default true)
+      PROMPT_MAX_RESUME_TOKENS  - resume budget (default 3000)
+      PROMPT_MAX_JD_TOKENS      - job description budget (default 1500)
+    """
+
+    def __init__(self, max_resume_tokens=None, max_jd_tokens=None, enabled=None):
+        self.max_resume_tokens = max_resume_tokens or int(os.getenv('PROMPT_MAX_RESUME_TOKENS', '3000'))
+        self.max_jd_tokens = max_jd_tokens or int(os.getenv('PROMPT_MAX_JD_TOKENS', '1500'))
+        if enabled is None:
+            enabled = os.getenv('PROMPT_PREPROCESS', 'true').lower() == 'true'
+        self.enabled = enabled
+
+    def normalize(self, text):
+        text = unicodedata.normalize('NFKC', text)
+        # Words hyphenated across PDF line breaks
+        text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+        lines = [re.sub(r"[ \t\f\v]+", ' ', line).strip() for line in text.splitlines()]
+        return '\n'.join(lines)
+
+    def clean_lines(self, text, strip_boilerplate=False, strip_page_markers=False):
+        """Drops repeated long lines (headers/footers) and, optionally, page markers and boilerplate."""
+        seen = set()
+        kept = []
+        skipping = False
+        for line in text.split('\n'):
+            if not line:
+                skipping = False
+                if kept and kept[-1]:
+                    kept.append('')
+                continue
+            if skipping or (strip_page_markers and PAGE_MARKER.match(line)):
+                continue
+            if strip_boilerplate:
+                if _is_heading(line) and BOILERPLATE_HEADING.fullmatch(line.rstrip(':').strip()):
+                    skipping = True # drop the whole paragraph under it
+                    continue
+                if BOILERPLATE_LINE.search(line):
+                    continue
+            # Short repeated lines are usually legitimate ("Responsibilities:", "Python")
+            if len(line) >= 25:
+                fingerprint = line.lower()
+                if fingerprint in seen:
+                    continue
+                seen.add(fingerprint)
+            kept.append(line)
+        return '\n'.join(kept).strip()
+
+    def sections(self, text):
+        """Splits text into (heading, lines) blocks; text before the first heading has heading None."""
+        blocks = [(None, [])]
+        for line in text.split('\n'):
+            if _is_heading(line):
+                blocks.append((line, []))
+            else:
+                blocks[-1][1].append(line)
+        return [b for b in blocks if b[0] is not None or any(b[1])]
+
+    def truncate(self, text, budget, drop_low_priority=False):
+        """Fits text into budget tokens, trimming the largest sections first and keeping every heading."""
+        if estimate_tokens(text) <= budget:
+            return text
+        blocks = self.sections(text)
+        if drop_low_priority:
+            kept = [b for b in blocks if not (b[0] and LOW_PRIORITY_SECTION.search(b[0]))]
+            if kept:
+                blocks = kept
+            text = self._join(blocks)
+            if estimate_tokens(text) <= budget:
+                return text
+
+        # Water-fill: small sections keep everything, the rest share what's left equally
+        sizes = [estimate_tokens('\n'.join(lines)) for _, lines in blocks]
+        overhead = sum(estimate_tokens(heading or '') + 1 for heading, _ in blocks)
+        remaining = max(budget - overhead, 0)
+        allowance = [0] * len(blocks)
+        pending = sorted(range(len(blocks)), key=lambda i: sizes[i])
+        while pending:
+            share = remaining // len(pending)
+            i = pending.pop(0)
+            allowance[i] = min(sizes[i], share)
+            remaining -= allowance[i]
+
+        trimmed = []
+        for (heading, lines), size, allowed in zip(blocks, sizes, allowance):
+            if size > allowed:
+                lines = self._trim(lines, allowed)
+            trimmed.append((heading, lines))
+        return self._join(trimmed)
+
+    def _trim(self, lines, budget):
+        kept = []
+        used = estimate_tokens(TRUNCATION_MARKER)
+        for line in lines:
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget:
+                if not kept:
+                    # One long unbroken line (PDFs without line breaks): cut it by characters
+                    kept.append(line[:max(budget - used, 0) * 4].rsplit(' ', 1)[0])
+                break
+            kept.append(line)
+            used += cost
+        return kept + [TRUNCATION_MARKER]
+
+    def _join(self, blocks):
+        parts = []
+        for heading, lines in blocks:
+            if heading:
+                parts.append(heading)
+            parts.extend(lines)
+        return '\n'.join(parts).strip()
+
+    def prepare_resume(self, text):
+        return self._prepare('resume', text, self.max_resume_tokens, boilerplate=False)
+
+    def prepare_jd(self, text):
+        return self._prepare('jd', text, self.max_jd_tokens, boilerplate=True)
+
+    def _prepare(self, kind, text, budget, boilerplate):
+        if not self.enabled or not text:
+            return text
+        before = estimate_tokens(text)
+        # Resume lines are never treated as page markers; a lone number there is content
+        cleaned = self.clean_lines(self.normalize(text), strip_boilerplate=boilerplate, strip_page_markers=boilerplate)
+        cleaned = self.truncate(cleaned, budget, drop_low_priority=boilerplate)
+        after = estimate_tokens(cleaned)
+        print(f"Preprocessed {kind}: ~{before} -> ~{after} tokens")
+        return cleaned
@@ -0,0 +1,321 @@
+import asyncio
+from datetime import datetime
+import threading
+import pytest
+from app import app, db
+import app as app_module
+from models import AgentRun, Application, Resume, User, UserProfile
+from services.agent_scheduler import AgentScheduler
+from services.browser_pool import BrowserPool
+
+
+class FakeAgent:
+    """Stands in for AutoApplyAgent; each run waits until the test releases it."""
+
+    def __init__(self, headless, gate, started, outcome='applied'):
+        self.headless = headless
+        self.gate = gate
+        self.started = started
+        self.outcome = outcome
+        self.status_log = []
+        self.cancelled = False
+        self.run_id = None
+
+    async def start_application(self, job_url, user_profile, resume_path, run_id=None):
+        self.run_id = run_id
+        self.status_log.append(f"Starting application for: {job_url} as {user_profile['full_name']}")
+        self.started.release()
+        try:
+            while not self.gate.is_set():
+                await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        self.status_log.append("done")
+        return {'success': True, 'status': self.outcome, 'log': self.status_log, 'screenshot': 'output/shot.png'}
+
+
+@pytest.fixture
+def env():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        user = User(email='agent@example.com', password_hash='hashed')
+        other = User(email='agent-other@example.com', password_hash='hashed')
+        db.session.add_all([user, other])
+        db.session.commit()
+        db.session.add(UserProfile(user_id=user.id, full_name='Jane Doe', email='jane@example.com'))
+        application = Application(user_id=user.id, job_title='Engineer', company='Acme', job_url='https://jobs.example.com/1')
+        db.session.add(application)
+        db.session.commit()
+        db.session.add(Resume(application_id=application.id, json_data={}, pdf_path='output/resume.pdf'))
+        db.session.commit()
+        ids = {'user': user.id, 'other': other.id, 'application': application.id}
+
+    gate = threading.Event()
+    started = threading.Semaphore(0)
+    agents = []
+
+    def factory(headless):
+        agent = FakeAgent(headless, gate, started)
+        agents.append(agent)
+        return agent
+
+    pool = BrowserPool(launcher=None, health_interval=0)
+    scheduler = AgentScheduler(app, pool, gemini=None, max_runs=2, cancel_poll=0.05, agent_factory=factory)
+    yield scheduler, ids, gate, started, agents
+
+    gate.set()
+    for future in list(scheduler.futures.values()):
+        try:
+            future.result(timeout=5)
+        except BaseException:
+            pass
+    pool.close()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _submit(scheduler, ids, **kwargs):
+    with app.app_context():
+        return scheduler.submit(ids['user'], 'https://jobs.example.com/1', 'output/resume.pdf', **kwargs).id
+
+
+def _run(run_id):
+    with app.app_context():
+        run = db.session.get(AgentRun, run_id)
+        db.session.expunge(run)
+        return run
+
+
+def _wait_for(run_id, status):
+    for _ in range(250):
+        if _run(run_id).status == status:
+            return True
+        threading.Event().wait(0.02)
+    return False
+
+
+def test_run_is_persisted_and_updates_application(env):
+    scheduler, ids, gate, started, agents = env
+    with app.app_context():
+        db.session.get(Application, ids['application']).notes = 'Referred by Sam'
+        db.session.commit()
+    run_id = _submit(scheduler, ids, application_id=ids['application'])
+    assert started.acquire(timeout=5)
+    assert _run(run_id).status == 'running'
+    assert scheduler.live_log(run_id) == ['Starting application for: https://jobs.example.com/1 as Jane Doe']
+    assert agents[0].run_id == run_id
+
+    gate.set()
+    assert _wait_for(run_id, 'done')
+    run = _run(run_id)
+    assert run.status == 'done'
+    assert run.outcome == 'applied'
+    assert run.screenshot_path == 'output/shot.png'
+    assert run.log.endswith('done')
+    with app.app_context():
+        application = db.session.get(Application, ids['application'])
+        assert application.status == 'Applied'
+        assert application.notes.startswith('Referred by Sam\n\nAgent log:\nStarting application')
+
+
+def test_concurrent_runs_are_bounded(env):
+    scheduler, ids, gate, started, agents = env
+    run_ids = [_submit(scheduler, ids) for _ in range(3)]
+    assert started.acquire(timeout=5) and started.acquire(timeout=5)
+    assert not started.acquire(timeout=0.2)
+    assert sorted(_run(r).status for r in run_ids) == ['queued', 'running', 'running']
+
+    gate.set()
+    assert all(_wait_for(run_id, 'done') for run_id in run_ids)
+
+
+def test_cancel_running_and_queued_runs(env):
+    scheduler, ids, gate, started, agents = env
+    scheduler.max_runs = 1
+    running = _submit(scheduler, ids)
+    assert started.acquire(timeout=5)
+    queued = _submit(scheduler, ids)
+
+    with app.app_context():
+        assert scheduler.cancel(queued)
+        assert scheduler.cancel(running)
+
+    assert _wait_for(running, 'cancelled')
+    assert _run(queued).status == 'cancelled'
+    assert agents[0].cancelled
+    assert len(agents) == 1
+    with app.app_context():
+        assert not scheduler.cancel(running)
+
+
+def test_cancel_requested_by_another_worker_is_noticed(env):
+    scheduler, ids, gate, started, agents = env
+    run_id = _submit(scheduler, ids)
+    assert started.acquire(timeout=5)
+    with app.app_context():
+        AgentRun.query.filter_by(id=run_id).update({'cancel_requested': True})
+        db.session.commit()
+    assert _wait_for(run_id, 'cancelled')
+    assert agents[0].cancelled
+
+
+def test_heartbeat_keeps_a_long_run_from_being_recovered(env):
+    scheduler, ids, gate, started, agents = env
+    run_id = _submit(scheduler, ids)
+    assert started.acquire(timeout=5)
+    with app.app_context():
+        AgentRun.query.filter_by(id=run_id).update({'updated_at': datetime(2020, 1, 1)})
+        db.session.commit()
+    threading.Event().wait(0.2)
+
+    # Another worker restarting sees a fresh heartbeat and leaves the run alone
+    with app.app_context():
+        scheduler.recover()
+    assert _run(run_id).status == 'running'
+    gate.set()
+    assert _wait_for(run_id, 'done')
+
+
+def test_finish_does_not_overwrite_a_recovered_run(env):
+    scheduler, ids, gate, started, agents = env
+    run_id = _submit(scheduler, ids, application_id=ids['application'])
+    assert started.acquire(timeout=5)
+    with app.app_context():
+        AgentRun.query.filter_by(id=run_id).update({'status': 'failed', 'error': 'Interrupted by a worker restart'})
+        db.session.commit()
+
+    gate.set()
+    future = scheduler.futures.get(run_id)
+    if future is not None:
+        future.result(timeout=5)
+    run = _run(run_id)
+    assert run.status == 'failed' and run.outcome is None
+    with app.app_context():
+        assert db.session.get(Application, ids['application']).status != 'Applied'
+
+
+def test_auto_apply_routes(env, mocker):
+    scheduler, ids, gate, started, agents = env
+    mocker.patch.object(app_module, 'agent_scheduler', scheduler)
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(ids['user'])
+        response = client.post('/api/auto-apply', json={'job_url': 'https://jobs.example.com/1', 'application_id': ids['application']})
+        assert response.status_code == 202
+        run_id = response.get_json()['run_id']
+        assert response.get_json()['status_url'] == f'/api/auto-apply/{run_id}'
+        assert started.acquire(timeout=5)
+
+        status = client.get(f'/api/auto-apply/{run_id}').get_json()
+        assert status['status'] == 'running'
+        assert status['log'][0].startswith('Starting application')
+
+        assert client.post(f'/api/auto-apply/{run_id}/cancel').get_json()['cancel_requested'] is True
+
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(ids['other'])
+        assert client.get(f'/api/auto-apply/{run_id}').status_code == 403
+        assert client.get('/api/auto-apply/missing').status_code == 404
+
+
+def test_auto_apply_rejects_another_users_application(env, mocker):
+    scheduler, ids, gate, started, agents = env
+    mocker.patch.object(app_module, 'agent_scheduler', scheduler)
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(ids['other'])
+        with app.app_context():
+            db.session.add(UserProfile(user_id=ids['other'], full_name='Mallory', email='m@example.com'))
+            db.session.commit()
+        response = client.post('/api/auto-apply', json={'job_url': 'https://jobs.example.com/1', 'application_id': ids['application']})
+        assert response.status_code == 403
+        response = client.post('/api/auto-apply', json={'job_url': 'https://jobs.example.com/1', 'application_id': 999999})
+        assert response.status_code == 404
+    with app.app_context():
+        assert AgentRun.query.count() == 0
+
+
+def test_runs_on_one_domain_are_capped(env):
+    scheduler, ids, gate, started, agents = env
+    scheduler.max_runs, scheduler.domain_limit = 3, 1
+    with app.app_context():
+        runs = scheduler.submit_batch(ids['user'], [
+            {'job_url': 'https://boards.greenhouse.io/a/1', 'resume_path': 'a.pdf'},
+            {'job_url': 'https://www.boards.greenhouse.io/a/2', 'resume_path': 'a.pdf'},
+            {'job_url': 'https://jobs.lever.co/b/3', 'resume_path': 'b.pdf'},
+        ])
+        run_ids = [run.id for run in runs]
+    assert started.acquire(timeout=5) and started.acquire(timeout=5)
+    assert not started.acquire(timeout=0.2)
+    assert [_run(r).status for r in run_ids] == ['running', 'queued', 'running']
+
+    gate.set()
+    assert all(_wait_for(run_id, 'done') for run_id in run_ids)
+
+
+def test_batch_pairs_each_application_with_its_latest_resume(env, mocker):
+    scheduler, ids, gate, started, agents = env
+    mocker.patch.object(app_module, 'agent_scheduler', scheduler)
+    with app.app_context():
+        second = Application(user_id=ids['user'], job_title='Engineer', company='Globex', job_url='https://jobs.lever.co/globex/2')
+        no_url = Application(user_id=ids['user'], job_title='Engineer', company='Initech')
+        no_resume = Application(user_id=ids['user'], job_title='Engineer', company='Hooli', job_url='https://hooli.example.com/4')
+        foreign = Application(user_id=ids['other'], job_title='Engineer', company='Umbrella', job_url='https://umbrella.example.com/5')
+        db.session.add_all([second, no_url, no_resume, foreign])
+        db.session.commit()
+        db.session.add_all([
+            Resume(application_id=second.id, json_data={}, pdf_path='output/old.pdf', created_at=datetime(2024, 1, 1)),
+            Resume(application_id=second.id, json_data={}, pdf_path='output/new.pdf', created_at=datetime(2024, 2, 1)),
+        ])
+        db.session.commit()
+        app_ids = [ids['application'], second.id, no_url.id, no_resume.id, foreign.id]
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(ids['user'])
+        response = client.post('/api/auto-apply/batch', json={'application_ids': app_ids})
+        assert response.status_code == 202
+        data = response.get_json()
+        assert [r['application_id'] for r in data['runs']] == app_ids[:2]
+        assert [s['reason'] for s in data['skipped']] == [
+            'No job URL', 'No resume found for this application', 'Application not found'
+        ]
+        assert [_run(r['run_id']).resume_path for r in data['runs']] == ['output/resume.pdf', 'output/new.pdf']
+
+        assert started.acquire(timeout=5) and started.acquire(timeout=5)
+        progress = client.get(data['status_url']).get_json()
+        assert progress['total'] == 2 and progress['counts']['running'] == 2 and not progress['done']
+
+        gate.set()
+        assert all(_wait_for(r['run_id'], 'done') for r in data['runs'])
+        progress = client.get(data['status_url']).get_json()
+        assert progress['progress'] == 1 and progress['done']
+        assert progress['outcomes'] == {'applied': 2}
+
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(ids['other'])
+        assert client.get(data['status_url']).status_code == 404
+
+
+def test_batch_cancel_stops_unfinished_runs(env, mocker):
+    scheduler, ids, gate, started, agents = env
+    scheduler.max_runs = 1
+    mocker.patch.object(app_module, 'agent_scheduler', scheduler)
+    with app.app_context():
+        runs = scheduler.submit_batch(ids['user'], [
+            {'job_url': f'https://jobs.example.com/{i}', 'resume_path': 'r.pdf'} for i in range(3)
+        ])
+        batch_id, run_ids = runs[0].batch_id, [run.id for run in runs]
+    assert started.acquire(timeout=5)
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(ids['user'])
+        assert client.post(f'/api/auto-apply/batch/{batch_id}/cancel').get_json()['cancelled'] == 3
+    assert all(_wait_for(run_id, 'cancelled') for run_id in run_ids)
+    assert len(agents) == 1
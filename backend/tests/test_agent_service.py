@@ -0,0 +1,65 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from services.agent_service import AutoApplyAgent
+
+FORM = {
+    "title": "Apply for Engineer", "heading": "Engineer", "captcha": False, "iframes": 0,
+    "fields": [
+        {"label": "Email", "type": "email", "name": "email", "selector": "#email", "required": True},
+        {"label": "Country", "type": "select", "name": "country", "selector": "#country", "options": ["US", "Canada"]},
+    ],
+    "buttons": [{"text": "Submit Application", "selector": "#submit_app"}],
+}
+ANALYSIS = {"apply_button_selector": None, "form_fields": [], "captcha_detected": False, "page_type": "application_form"}
+
+
+class FakePage:
+    url = 'https://jobs.example.com/1'
+
+    def __init__(self, form):
+        self.form = form
+        self.content = AsyncMock(return_value='<html>' + 'x' * 50000)
+        self.screenshot = AsyncMock(return_value=b'png-bytes')
+
+    async def evaluate(self, script):
+        return self.form
+
+
+def _analyze(form, **kwargs):
+    llm = MagicMock()
+    llm.agenerate = AsyncMock(return_value=SimpleNamespace(text=json.dumps(ANALYSIS)))
+    agent = AutoApplyAgent(headless=True, gemini=SimpleNamespace(llm=llm), **kwargs)
+    page = FakePage(form)
+    analysis = asyncio.run(agent.analyze_page(page))
+    return analysis, llm.agenerate.call_args.args[0], page
+
+
+def test_prompt_carries_extracted_controls_not_html():
+    analysis, contents, page = _analyze(FORM)
+
+    assert isinstance(contents, str)
+    assert json.dumps(FORM, separators=(',', ':')) in contents
+    assert len(contents) < 2000
+    page.content.assert_not_called()
+    page.screenshot.assert_not_called()
+    assert analysis['page_type'] == 'application_form'
+
+
+def test_screenshot_only_when_the_dom_has_no_controls():
+    empty = dict(FORM, fields=[], buttons=[])
+    _, contents, page = _analyze(empty)
+    assert contents[1] == {"mime_type": "image/png", "data": b'png-bytes'}
+
+    _, contents, page = _analyze(empty, screenshots='never')
+    assert isinstance(contents, str)
+    page.screenshot.assert_not_called()
+
+    _, contents, page = _analyze(FORM, screenshots='always')
+    assert isinstance(contents, list)
+
+
+def test_captcha_found_in_the_dom_is_reported():
+    analysis, _, _ = _analyze(dict(FORM, captcha=True))
+    assert analysis['captcha_detected'] is True
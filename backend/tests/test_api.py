@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock
 import json
 import io
+import hashlib
 
 def test_health_check(client):
     response = client.get('/health')
@@ -23,7 +24,8 @@ def test_parse_resume_success(client, mocker):
     response = client.post('/api/parse-resume', data=data, content_type='multipart/form-data')
     
     assert response.status_code == 200
-    assert response.json == {"text": "Mocked Resume Text"}
+    assert response.json["text"] == "Mocked Resume Text"
+    assert response.json["resume_hash"] == hashlib.sha256(b"dummy pdf content").hexdigest()
 
 def test_analyze_gap_success(client, mocker):
     # Mock Gemini Service
@@ -58,3 +60,46 @@ def test_score_resume_success(client, mocker):
     
     assert response.status_code == 200
     assert response.json == mock_response
+
+def test_analyze_and_score_success(client, mocker):
+    mock_response = {
+        "missing_keywords": ["Python"],
+        "context_questions": [{"keyword": "Python", "question": "Do you know Python?"}],
+        "score": 60,
+        "improvement_suggestions": ["Learn Python"]
+    }
+    mocker.patch('services.gemini_service.GeminiService.analyze_and_score', return_value=mock_response)
+    
+    data = {
+        "resume_text": "I know Java",
+        "jd_text": "Looking for Python dev"
+    }
+    response = client.post('/api/analyze-and-score', json=data)
+    
+    assert response.status_code == 200
+    assert response.json == mock_response
+
+def test_analyze_and_score_missing_text(client):
+    response = client.post('/api/analyze-and-score', json={"resume_text": "I know Java"})
+    assert response.status_code == 400
+
+def test_compile_latex_returns_503_when_busy(client, mocker):
+    from services.tectonic_env import CompileQueueFull
+    mocker.patch('services.latex_service.LatexService.compile_pdf_bytes', side_effect=CompileQueueFull(7))
+
+    response = client.post('/api/compile-latex', json={"latex_code": "\\relax"})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
+
+def test_generate_pdf_streams_fallback_from_memory(client, mocker):
+    from services.latex_service import LatexService
+    mocker.patch.object(LatexService, 'compile_pdf_bytes', side_effect=FileNotFoundError("tectonic"))
+    fallback = mocker.spy(LatexService, 'generate_fallback_pdf')
+
+    response = client.post('/api/generate-pdf', json={"name": "Jane Doe", "experience": []})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert response.data.startswith(b"%PDF")
+    assert isinstance(fallback.call_args.args[2], io.BytesIO)
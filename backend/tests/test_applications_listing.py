@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime, timedelta
+from app import app, db
+from models import User, Application
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            user = User(email='lister@example.com', password_hash='hashed')
+            other = User(email='other@example.com', password_hash='hashed')
+            db.session.add_all([user, other])
+            db.session.commit()
+            
+            base = datetime(2024, 1, 1)
+            for i in range(5):
+                db.session.add(Application(
+                    user_id=user.id,
+                    job_title=f'Engineer {i}',
+                    company='Acme' if i % 2 == 0 else 'Globex',
+                    jd_text='x' * 1000,
+                    status='Applied' if i < 2 else 'Wishlist',
+                    notes='remote friendly' if i == 3 else None,
+                    created_at=base + timedelta(days=i)
+                ))
+            db.session.add(Application(user_id=other.id, job_title='Hidden', company='Acme', created_at=base))
+            db.session.commit()
+            
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user.id)
+                
+        yield client
+        
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+def test_listing_without_paging_is_a_list(client):
+    response = client.get('/api/applications')
+    data = response.get_json()
+    assert [a['job_title'] for a in data] == [f'Engineer {i}' for i in range(4, -1, -1)]
+    assert 'jd_text' not in data[0]
+
+def test_cursor_pagination_walks_all_pages(client):
+    titles = []
+    cursor = None
+    while True:
+        url = '/api/applications?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url).get_json()
+        assert data['total'] == 5
+        titles += [a['job_title'] for a in data['items']]
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert titles == [f'Engineer {i}' for i in range(4, -1, -1)]
+
+def test_filters_search_and_projection(client):
+    data = client.get('/api/applications?limit=10&status=Wishlist&company=acme&fields=company,status').get_json()
+    assert data['items'] == [
+        {'id': data['items'][0]['id'], 'company': 'Acme', 'status': 'Wishlist'},
+        {'id': data['items'][1]['id'], 'company': 'Acme', 'status': 'Wishlist'},
+    ]
+    assert data['status_counts'] == {'Wishlist': 2}
+    
+    data = client.get('/api/applications?q=remote').get_json()
+    assert [a['job_title'] for a in data] == ['Engineer 3']
+    
+    data = client.get('/api/applications?since=2024-01-04').get_json()
+    assert len(data) == 2
+
+def test_invalid_date_and_cursor(client):
+    assert client.get('/api/applications?since=yesterday').status_code == 400
+    assert client.get('/api/applications?cursor=garbage').status_code == 400
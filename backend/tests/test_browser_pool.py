@@ -0,0 +1,193 @@
+import asyncio
+import pytest
+from services.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+        self.browser.open_contexts -= 1
+
+
+class FakeBrowser:
+    def __init__(self, headless):
+        self.headless = headless
+        self.connected = True
+        self.closed = False
+        self.open_contexts = 0
+        self.fail_new_context = False
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        if self.fail_new_context:
+            raise RuntimeError("browser crashed")
+        self.open_contexts += 1
+        return FakeContext(self)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def launched():
+    return []
+
+
+@pytest.fixture
+def make_pool(launched):
+    pools = []
+
+    def make(**kwargs):
+        async def launcher(headless):
+            browser = FakeBrowser(headless)
+            launched.append(browser)
+            return browser
+        pool = BrowserPool(launcher=launcher, health_interval=0, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+async def _use(pool, headless=True, hold=None):
+    async with pool.context(headless=headless) as context:
+        if hold is not None:
+            await hold.wait()
+        return context
+
+
+async def _make_event():
+    return asyncio.Event()
+
+
+def test_contexts_share_one_browser_and_are_closed(make_pool, launched):
+    pool = make_pool(max_contexts=2, recycle_after=10)
+    first = pool.submit(_use(pool)).result(timeout=5)
+    second = pool.submit(_use(pool)).result(timeout=5)
+
+    assert len(launched) == 1
+    assert first is not second
+    assert first.closed and second.closed
+    assert pool.stats()["served"] == 2
+    assert pool.stats()["active_contexts"] == 0
+
+
+def _slow_launches(pool):
+    launch = pool._launcher
+
+    async def slow_launcher(headless):
+        await asyncio.sleep(0.05)
+        return await launch(headless)
+    pool._launcher = slow_launcher
+
+
+async def _use_together(pool, count):
+    return await asyncio.gather(*(_use(pool) for _ in range(count)))
+
+
+def test_concurrent_first_use_launches_one_browser(make_pool, launched):
+    pool = make_pool(max_contexts=3, recycle_after=10)
+    _slow_launches(pool)
+    pool.submit(_use_together(pool, 3)).result(timeout=5)
+
+    assert len(launched) == 1
+    assert pool.stats()["launches"] == 1
+    assert launched[0].open_contexts == 0
+
+
+def test_concurrent_runs_leak_no_browser_on_recycle(make_pool, launched):
+    pool = make_pool(max_contexts=3, recycle_after=2)
+    pool.submit(_use(pool)).result(timeout=5)
+    pool.submit(_use(pool)).result(timeout=5)
+    _slow_launches(pool)
+    pool.submit(_use_together(pool, 2)).result(timeout=5)
+
+    # Both runs share the one replacement; the worn-out browser is closed
+    assert len(launched) == 2
+    assert launched[0].closed
+    pool.close()
+    assert all(browser.closed for browser in launched)
+
+
+def test_headed_and_headless_runs_get_separate_browsers(make_pool, launched):
+    pool = make_pool(recycle_after=10)
+    pool.submit(_use(pool, headless=True)).result(timeout=5)
+    pool.submit(_use(pool, headless=False)).result(timeout=5)
+    assert [b.headless for b in launched] == [True, False]
+
+
+def test_max_contexts_makes_extra_runs_wait(make_pool, launched):
+    pool = make_pool(max_contexts=1, recycle_after=10)
+    release = pool.submit(_make_event()).result(timeout=5)
+    holder = pool.submit(_use(pool, hold=release))
+    waiter = pool.submit(_use(pool))
+
+    pool.submit(asyncio.sleep(0.05)).result(timeout=5)
+    assert not waiter.done()
+    assert pool.stats()["waiting"] == 1
+
+    pool._loop.call_soon_threadsafe(release.set)
+    holder.result(timeout=5)
+    waiter.result(timeout=5)
+    assert pool.stats()["served"] == 2
+
+
+def test_browser_is_recycled_after_n_uses_once_idle(make_pool, launched):
+    pool = make_pool(max_contexts=2, recycle_after=2)
+    release = pool.submit(_make_event()).result(timeout=5)
+    pool.submit(_use(pool)).result(timeout=5)
+    holder = pool.submit(_use(pool, hold=release))
+    pool.submit(asyncio.sleep(0.01)).result(timeout=5)
+
+    # Third run gets a fresh browser; the old one stays open for the held context
+    pool.submit(_use(pool)).result(timeout=5)
+    assert len(launched) == 2
+    assert not launched[0].closed
+
+    pool._loop.call_soon_threadsafe(release.set)
+    holder.result(timeout=5)
+    assert launched[0].closed
+    assert pool.stats()["recycled"] == 1
+
+
+def test_disconnected_browser_is_relaunched(make_pool, launched):
+    pool = make_pool(recycle_after=10)
+    pool.submit(_use(pool)).result(timeout=5)
+    launched[0].connected = False
+    pool.submit(_use(pool)).result(timeout=5)
+    assert len(launched) == 2
+    assert pool.stats()["unhealthy"] == 1
+
+
+def test_health_check_retires_browser_that_cannot_open_contexts(make_pool, launched):
+    pool = make_pool(recycle_after=10)
+    pool.submit(_use(pool)).result(timeout=5)
+    launched[0].fail_new_context = True
+
+    pool.submit(pool.check_health()).result(timeout=5)
+    assert launched[0].closed
+    assert pool.stats()["browsers"] == 0
+
+    pool.submit(_use(pool)).result(timeout=5)
+    assert len(launched) == 2
+
+
+def test_context_is_released_when_the_run_fails(make_pool, launched):
+    pool = make_pool(max_contexts=1, recycle_after=10)
+
+    async def failing():
+        async with pool.context():
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        pool.submit(failing()).result(timeout=5)
+    pool.submit(_use(pool)).result(timeout=5)
+    assert launched[0].open_contexts == 0
@@ -0,0 +1,80 @@
+import pytest
+from unittest.mock import MagicMock
+from services.cache_service import (
+    MemoryCacheBackend, SQLiteCacheBackend, ResponseCache, make_cache_key
+)
+from services.gemini_service import GeminiService
+
+def test_cache_key_ignores_whitespace_differences():
+    a = make_cache_key('score_resume', 'model', "I know  Python\n", "Need Python")
+    b = make_cache_key('score_resume', 'model', "I know Python", "  Need Python ")
+    c = make_cache_key('analyze_gap', 'model', "I know Python", "Need Python")
+    assert a == b
+    assert a != c
+
+def test_memory_backend_lru_eviction():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+    backend.get('a')  # 'a' is now most recently used
+    backend.set('c', 3, ttl=60)
+    assert backend.get('a') == 1
+    assert backend.get('b') is None
+    assert backend.get('c') == 3
+
+def test_memory_backend_ttl_expiry(mocker):
+    backend = MemoryCacheBackend()
+    clock = mocker.patch('services.cache_service.time.time', return_value=1000.0)
+    backend.set('a', {'score': 1}, ttl=10)
+    clock.return_value = 1011.0
+    assert backend.get('a') is None
+
+def test_sqlite_backend_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    SQLiteCacheBackend(path).set('k', {'score': 90}, ttl=60)
+    assert SQLiteCacheBackend(path).get('k') == {'score': 90}
+
+def test_sqlite_backend_evicts_least_recently_used(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.db'), max_entries=2)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+    backend.set('c', 3, ttl=60)
+    assert len(backend) == 2
+    assert backend.get('a') is None
+
+def test_gemini_service_serves_repeat_requests_from_cache():
+    service = GeminiService(cache=ResponseCache(MemoryCacheBackend()))
+    service.model = MagicMock()
+    service.model.generate_content.return_value.text = '{"score": 80, "improvement_suggestions": []}'
+
+    first = service.score_resume("Resume", "JD")
+    second = service.score_resume("Resume ", "JD")
+
+    assert first == second == {"score": 80, "improvement_suggestions": []}
+    assert service.model.generate_content.call_count == 1
+    assert service.cache.stats()['hits'] == 1
+    assert service.cache.stats()['misses'] == 1
+
+def test_gemini_service_does_not_cache_errors():
+    service = GeminiService(cache=ResponseCache(MemoryCacheBackend()))
+    service.model = MagicMock()
+    service.model.generate_content.side_effect = RuntimeError("quota")
+
+    assert "error" in service.analyze_gap("Resume", "JD")
+    assert len(service.cache.backend) == 0
+
+def test_gap_and_score_served_from_combined_result():
+    service = GeminiService(cache=ResponseCache(MemoryCacheBackend()))
+    service.model = MagicMock()
+    service.model.generate_content.return_value.text = (
+        '{"missing_keywords": ["Go"], "context_questions": [], '
+        '"score": 70, "improvement_suggestions": ["Mention Go"]}'
+    )
+
+    service.analyze_and_score("Resume", "JD")
+    gap = service.analyze_gap("Resume", "JD")
+    score = service.score_resume("Resume", "JD")
+
+    assert gap == {"missing_keywords": ["Go"], "context_questions": []}
+    assert score == {"score": 70, "improvement_suggestions": ["Mention Go"]}
+    assert service.model.generate_content.call_count == 1
@@ -0,0 +1,103 @@
+import pytest
+from app import app, db, jd_ranker
+from models import User, Application
+from services.jd_ranker import JDRanker
+from services.keyword_scorer import KeywordScorer
+
+JDS = {
+    1: "Python developer with Django and PostgreSQL. Python is a must.",
+    2: "Java engineer: Spring Boot, Kafka and AWS.",
+    3: "Python and AWS data engineer with Airflow.",
+}
+
+def _loader(jds, calls):
+    def load(ids):
+        calls.append(sorted(ids))
+        return [(i, {"company": f"Company {i}"}, jds[i]) for i in ids]
+    return load
+
+@pytest.fixture
+def ranker():
+    return JDRanker(KeywordScorer(), max_users=2)
+
+def test_rank_orders_by_coverage(ranker):
+    ranker.sync(7, {i: 1 for i in JDS}, _loader(JDS, []))
+    results = ranker.rank(7, "Python, Django and PostgreSQL backend developer")
+
+    assert [r['application_id'] for r in results] == [1, 3, 2]
+    assert results[0]['score'] == 100
+    assert results[0]['company'] == 'Company 1'
+    assert results[2]['score'] == 0
+    assert set(results[1]['missing_keywords']) == {'aws', 'airflow'}
+
+def test_rank_agrees_with_single_scorer_ordering(ranker):
+    scorer = KeywordScorer()
+    resume = "AWS and Kafka on Java"
+    ranker.sync(7, {i: 1 for i in JDS}, _loader(JDS, []))
+    ranked = [r['application_id'] for r in ranker.rank(7, resume)]
+    single = sorted(JDS, key=lambda i: -scorer.match(resume, JDS[i])[0])
+    assert ranked[0] == single[0] == 2
+
+def test_sync_only_reloads_changed_rows(ranker):
+    calls = []
+    jds = dict(JDS)
+    assert ranker.sync(7, {1: 'a', 2: 'a', 3: 'a'}, _loader(jds, calls)) == 3
+    assert ranker.sync(7, {1: 'a', 2: 'a', 3: 'a'}, _loader(jds, calls)) == 0
+
+    jds[2] = "Python and Django"
+    assert ranker.sync(7, {1: 'a', 2: 'b'}, _loader(jds, calls)) == 1
+    assert calls == [[1, 2, 3], [2]]
+
+    results = ranker.rank(7, "Django")
+    assert [r['application_id'] for r in results] == [2, 1]
+
+def test_cache_is_bounded_per_user(ranker):
+    for user_id in (1, 2, 3):
+        ranker.sync(user_id, {1: 1}, _loader(JDS, []))
+    assert ranker.stats() == {'users': 2, 'rows': 2}
+    assert ranker.rank(1, "Python") == []
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    jd_ranker.invalidate(1)
+    
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            user = User(email='ranker@example.com', password_hash='hashed')
+            db.session.add(user)
+            db.session.commit()
+            for i, jd in JDS.items():
+                db.session.add(Application(user_id=user.id, company=f'Company {i}', job_title='Engineer', jd_text=jd))
+            db.session.add(Application(user_id=user.id, company='No JD', job_title='Engineer'))
+            db.session.commit()
+            
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user.id)
+                
+        yield client
+        
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+def test_rank_endpoint_follows_edits(client):
+    response = client.post('/api/applications/rank', json={"resume_text": "Java, Spring Boot and Kafka"})
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['total'] == 3
+    assert data['results'][0]['company'] == 'Company 2'
+
+    with app.app_context():
+        application = Application.query.filter_by(company='Company 3').first()
+        application.jd_text = "Kafka, Spring Boot and Java"
+        db.session.commit()
+
+    data = client.post('/api/applications/rank', json={"resume_text": "Java, Spring Boot and Kafka", "limit": 2}).get_json()
+    assert [r['company'] for r in data['results']] == ['Company 3', 'Company 2']
+    assert data['results'][0]['score'] == 100
+    assert data['results'][1]['missing_keywords'] == ['aws']
+
+def test_rank_endpoint_requires_resume(client):
+    assert client.post('/api/applications/rank', json={}).status_code == 400
@@ -0,0 +1,113 @@
+import os
+import subprocess
+import sys
+import pytest
+from datetime import datetime, timedelta
+from app import app, db, job_queue
+from models import Job
+
+def test_tailor_resume_async_returns_job_id(client, mocker):
+    mock_data = {"name": "Jane", "role": "Engineer", "experience": []}
+    mocker.patch('services.gemini_service.GeminiService.tailor_resume', return_value=mock_data)
+    mocker.patch('services.latex_service.LatexService.render_latex', return_value="\\documentclass{article}")
+
+    response = client.post('/api/tailor-resume?async=1', json={
+        "resume_text": "I know Java",
+        "jd_text": "Looking for Python dev"
+    })
+    assert response.status_code == 202
+    job_id = response.json['job_id']
+
+    job_queue.wait(job_id, timeout=5)
+
+    response = client.get(f'/api/jobs/{job_id}')
+    assert response.status_code == 200
+    assert response.json['status'] == 'done'
+    assert response.json['result']['tailored_data'] == mock_data
+    assert response.json['result']['latex_code'] == "\\documentclass{article}"
+
+def test_failed_job_reports_error(client, mocker):
+    mocker.patch('services.latex_service.LatexService.compile_pdf_from_string', side_effect=RuntimeError("tectonic missing"))
+
+    response = client.post('/api/compile-latex?async=1', json={"latex_code": "\\relax"})
+    job_id = response.json['job_id']
+    job_queue.wait(job_id, timeout=5)
+
+    response = client.get(f'/api/jobs/{job_id}')
+    assert response.json['status'] == 'failed'
+    assert "tectonic missing" in response.json['error']
+
+def test_pdf_job_hides_server_path(client, mocker, tmp_path):
+    pdf_path = tmp_path / "resume.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4")
+    mocker.patch('services.latex_service.LatexService.compile_pdf_from_string', return_value=str(pdf_path))
+
+    response = client.post('/api/compile-latex?async=1', json={"latex_code": "\\relax"})
+    job_id = response.json['job_id']
+    job_queue.wait(job_id, timeout=5)
+
+    response = client.get(f'/api/jobs/{job_id}')
+    assert response.json['result'] == {"download_url": f"/api/jobs/{job_id}/pdf"}
+
+    response = client.get(f'/api/jobs/{job_id}/pdf')
+    assert response.status_code == 200
+    assert response.data == b"%PDF-1.4"
+
+def test_recover_runs_queued_jobs_once(client, mocker):
+    handler = mocker.Mock(return_value={"ok": True})
+    job_queue.handlers['noop'] = handler
+    try:
+        db.session.add(Job(id='recovered-job', kind='noop', payload={}, status='queued'))
+        db.session.commit()
+
+        job_queue.recover()
+        job_queue.wait('recovered-job', timeout=5)
+        job_queue._run('recovered-job')  # a second claim must be a no-op
+
+        db.session.expire_all()
+        assert db.session.get(Job, 'recovered-job').status == 'done'
+        assert handler.call_count == 1
+    finally:
+        del job_queue.handlers['noop']
+
+def test_importing_the_app_does_not_claim_queued_jobs(tmp_path):
+    # `flask db upgrade` imports app.py; queued work must wait for a serving process
+    url = f"sqlite:///{tmp_path / 'startup.db'}"
+    script = (
+        "from app import app, db, job_queue\n"
+        "from models import Job\n"
+        "with app.app_context():\n"
+        "    db.create_all()\n"
+        "    db.session.add(Job(id='left-behind', kind='generate_pdf', payload={}, status='queued'))\n"
+        "    db.session.commit()\n"
+    )
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DATABASE_URL=url, OUTPUT_JANITOR_INTERVAL='0')
+    subprocess.run([sys.executable, '-c', script], cwd=backend, env=env, check=True, capture_output=True)
+    check = "import app\nfrom models import Job\nwith app.app.app_context(): print(app.db.session.get(Job, 'left-behind').status)"
+    out = subprocess.run([sys.executable, '-c', check], cwd=backend, env=env, check=True, capture_output=True, text=True)
+    assert out.stdout.strip().splitlines()[-1] == 'queued'
+
+def test_start_background_work_recovers_queued_jobs(client, mocker):
+    recover = mocker.patch.object(job_queue, 'recover')
+    mocker.patch('app.agent_scheduler.recover')
+    mocker.patch('app.output_janitor.start')
+    from app import start_background_work
+    start_background_work()
+    recover.assert_called_once()
+
+def test_prune_deletes_only_old_finished_jobs(client):
+    old = datetime.utcnow() - timedelta(days=2)
+    for job_id, status, updated_at in [
+        ('old-done', 'done', old), ('old-failed', 'failed', old), ('old-queued', 'queued', old),
+        ('new-done', 'done', datetime.utcnow()),
+    ]:
+        db.session.add(Job(id=job_id, kind='noop', payload={}, status=status, updated_at=updated_at))
+    db.session.commit()
+
+    assert job_queue.prune() == 2
+    assert sorted(job_id for (job_id,) in db.session.query(Job.id)) == ['new-done', 'old-queued']
+
+def test_unknown_job(client):
+    response = client.get('/api/jobs/does-not-exist')
+    assert response.status_code == 404
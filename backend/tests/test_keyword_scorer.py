@@ -0,0 +1,60 @@
+import pytest
+from services.keyword_scorer import KeywordScorer, tokenize
+
+@pytest.fixture
+def scorer():
+    return KeywordScorer()
+
+def test_tokenize_keeps_skill_punctuation():
+    assert tokenize("C++, Node.js and CI/CD. Python.") == ['c++', 'node.js', 'and', 'ci/cd', 'python']
+
+def test_extract_prefers_longest_phrase(scorer):
+    counts = scorer.extract_keywords("Machine learning and more machine learning with Spring Boot")
+    assert counts['machine learning'] == 2
+    assert counts['spring boot'] == 1
+    assert 'spring' not in counts
+
+def test_dotnet_keeps_its_leading_dot(scorer):
+    assert tokenize("Built .NET and ASP.NET apps. Net 30 terms") == ['built', '.net', 'and', 'asp.net', 'apps', 'net', '30', 'terms']
+    assert 'net' not in scorer.extract_keywords("Grew net income; a safety net; Net 30 invoices")
+    result = scorer.score_resume("Python developer", "Looking for .NET and Python")
+    assert result['missing_keywords'] == ['.net']
+
+def test_single_letter_c_is_not_a_skill(scorer):
+    counts = scorer.extract_keywords("Grade C or above in maths, vitamin C supplements, C++ and C# a plus")
+    assert 'c' not in counts
+    assert counts['c++'] == 1 and counts['c#'] == 1
+
+def test_score_reflects_coverage(scorer):
+    jd = "We need Python, Kubernetes and AWS. Python is key."
+    full = scorer.score_resume("Python, Kubernetes and AWS expert", jd)
+    partial = scorer.score_resume("Python developer", jd)
+    none = scorer.score_resume("Chef and baker", jd)
+
+    assert full['score'] == 100
+    assert 0 < partial['score'] < 100
+    assert none['score'] == 0
+    assert partial['missing_keywords'] == ['aws', 'kubernetes']
+    assert len(partial['improvement_suggestions']) == 2
+
+def test_falls_back_to_content_words_without_known_skills(scorer):
+    result = scorer.score_resume("Experienced pastry chef", "Looking for a pastry chef")
+    assert result['score'] == 100
+
+def test_analyze_gap_shape(scorer):
+    result = scorer.analyze_gap("Java developer", "Java and Terraform required")
+    assert result['missing_keywords'] == ['terraform']
+    assert result['context_questions'][0]['keyword'] == 'terraform'
+
+def test_local_mode_endpoints_skip_llm(client, mocker):
+    llm = mocker.patch('services.gemini_service.GeminiService.score_resume')
+    data = {"resume_text": "I know Java", "jd_text": "Looking for Python and Java dev"}
+
+    response = client.post('/api/score-resume?mode=local', json=data)
+    assert response.status_code == 200
+    assert response.json['missing_keywords'] == ['python']
+    assert response.json['mode'] == 'local'
+
+    response = client.post('/api/analyze-gap', json=dict(data, mode='local'))
+    assert response.json['missing_keywords'] == ['python']
+    assert llm.call_count == 0
@@ -25,3 +25,20 @@ def test_latex_escape_characters():
     assert "Test \\& User" in latex_code
     assert "test\\_email" in latex_code
     assert "To test \\$ and \\%" in latex_code
+
+def test_latex_escape_backslash_is_not_double_escaped():
+    assert LatexService.latex_escape("C:\\path {x}") == "C:\\textbackslash{}path \\{x\\}"
+    assert LatexService.latex_escape("~^") == "\\textasciitilde{}\\textasciicircum{}"
+    assert LatexService.latex_escape(42) == 42
+
+def test_render_many_matches_single_renders():
+    service = LatexService()
+    resumes = [
+        {"name": f"User {i}", "role": "Dev", "education": [], "experience": [], "skills": {}}
+        for i in range(3)
+    ]
+
+    rendered = service.render_many(resumes)
+
+    assert rendered == [service.render_latex(r) for r in resumes]
+    assert "User 2" in rendered[2]
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock
+from services.llm_client import LLMClient, LLMBusy
+
+class SlowModel:
+    """generate_content blocks until released, recording peak concurrency."""
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        self.release.wait(5)
+        with self._lock:
+            self.active -= 1
+        return f"response to {prompt}"
+
+def _wait_for(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("condition never became true")
+
+def test_identical_in_flight_requests_are_coalesced():
+    model = SlowModel()
+    client = LLMClient(model, max_concurrency=4)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.generate("same"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    _wait_for(lambda: client.coalesced == 4)
+    model.release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["response to same"] * 5
+    assert model.calls == 1
+    assert client.metrics()['in_flight'] == 0
+
+def test_concurrency_is_bounded_across_sync_and_async_callers():
+    model = SlowModel()
+    client = LLMClient(model, max_concurrency=2, max_queue=10)
+    futures = [client.submit(f"prompt {i}") for i in range(3)]
+    sync = threading.Thread(target=client.generate, args=("prompt sync",))
+    sync.start()
+    _wait_for(lambda: client.running == 2 and client.waiting == 2)
+    model.release.set()
+    sync.join()
+
+    assert [f.result(5) for f in futures] == [f"response to prompt {i}" for i in range(3)]
+    assert model.peak == 2
+    assert model.calls == 4
+
+def test_sheds_load_when_queue_is_full():
+    model = SlowModel()
+    client = LLMClient(model, max_concurrency=1, max_queue=1)
+    first = client.submit("a")
+    _wait_for(lambda: client.running == 1)
+    waiting = threading.Thread(target=client.generate, args=("b",))
+    waiting.start()
+    _wait_for(lambda: client.waiting == 1)
+
+    with pytest.raises(LLMBusy) as excinfo:
+        client.generate("c")
+    assert excinfo.value.retry_after >= 1
+    assert client.metrics()['rejected'] == 1
+
+    model.release.set()
+    waiting.join()
+    assert first.result(5) == "response to a"
+
+def test_failures_reach_every_waiter_and_are_not_remembered():
+    model = MagicMock()
+    model.generate_content.side_effect = [RuntimeError("quota"), "ok"]
+    client = LLMClient(model, max_concurrency=1)
+
+    with pytest.raises(RuntimeError):
+        client.generate("p")
+    assert client.generate("p") == "ok"
+    assert client.metrics()['failures'] == 1
+
+def test_agenerate_awaits_the_shared_call():
+    model = MagicMock()
+    model.generate_content.return_value = "ok"
+    client = LLMClient(model, max_concurrency=1)
+    assert asyncio.run(client.agenerate("p", {"response_mime_type": "application/json"})) == "ok"
+
+def test_busy_llm_returns_503(mocker):
+    from app import app
+    mocker.patch('services.gemini_service.GeminiService.score_resume', side_effect=LLMBusy(7))
+    with app.test_client() as client:
+        response = client.post('/api/score-resume', json={"resume_text": "r", "jd_text": "j"})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
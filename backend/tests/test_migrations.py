@@ -0,0 +1,131 @@
+import os
+import pytest
+from datetime import datetime
+from flask import Flask
+from flask_migrate import Migrate, upgrade
+from sqlalchemy import text
+from extensions import db
+from models import User, Application, Resume
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+
+def _database_urls():
+    urls = [pytest.param('sqlite', id='sqlite')]
+    pg = os.getenv('TEST_POSTGRES_URL')
+    urls.append(pytest.param(pg or 'postgresql', id='postgres', marks=pytest.mark.skipif(
+        not pg, reason="set TEST_POSTGRES_URL to run query plan tests against Postgres"
+    )))
+    return urls
+
+@pytest.fixture(params=_database_urls())
+def migrated_app(request, tmp_path):
+    url = request.param
+    if url == 'sqlite':
+        url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    
+    migrated = Flask(__name__)
+    migrated.config['SQLALCHEMY_DATABASE_URI'] = url
+    db.init_app(migrated)
+    Migrate(migrated, db, directory=MIGRATIONS_DIR, render_as_batch=True)
+    
+    with migrated.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        user = User(email='plan@example.com', password_hash='hashed')
+        db.session.add(user)
+        db.session.commit()
+        for i in range(3):
+            application = Application(user_id=user.id, company=f'Company {i}', job_title='Engineer', status='Drafting')
+            db.session.add(application)
+            db.session.commit()
+            db.session.add(Resume(application_id=application.id, json_data={}, created_at=datetime(2024, 1, i + 1)))
+        db.session.commit()
+        yield migrated
+        db.session.remove()
+        db.drop_all()
+        db.session.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        db.session.commit()
+
+def _plan(query):
+    """Returns the database's query plan for a SQLAlchemy ORM query as one string."""
+    engine = db.engine
+    sql = str(query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        if engine.dialect.name == 'sqlite':
+            rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+            return "\n".join(row[-1] for row in rows)
+        # Tiny test tables would otherwise always be sequentially scanned
+        conn.execute(text("SET enable_seqscan = off"))
+        rows = conn.execute(text(f"EXPLAIN {sql}")).fetchall()
+        return "\n".join(row[0] for row in rows)
+
+def test_dedup_lookup_uses_unique_index(migrated_app):
+    plan = _plan(Application.query.filter_by(user_id=1, company='Company 1', job_title='Engineer'))
+    if db.engine.dialect.name == 'sqlite':
+        assert 'SEARCH application USING INDEX sqlite_autoindex_application' in plan
+    else:
+        assert 'uq_application_user_company_title' in plan
+
+def test_latest_resume_lookup_uses_composite_index(migrated_app):
+    plan = _plan(Resume.query.filter_by(application_id=1).order_by(Resume.created_at.desc()).limit(1))
+    assert 'ix_resume_application_created' in plan
+    assert 'TEMP B-TREE' not in plan
+    assert 'Sort' not in plan
+
+def test_listing_uses_user_created_index(migrated_app):
+    plan = _plan(Application.query.filter_by(user_id=1).order_by(Application.created_at.desc()))
+    assert 'ix_application_user_created' in plan
+    assert 'TEMP B-TREE' not in plan
+    assert 'Sort' not in plan
+
+def test_status_filter_uses_user_status_index(migrated_app):
+    plan = _plan(Application.query.filter_by(user_id=1, status='Applied'))
+    assert 'ix_application_user_status' in plan
+
+def test_unique_constraint_rejects_duplicate_application(migrated_app):
+    from sqlalchemy.exc import IntegrityError
+    db.session.add(Application(user_id=1, company='Company 1', job_title='Engineer'))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+def test_duplicate_applications_are_merged_not_dropped(tmp_path):
+    migrated = Flask(__name__)
+    migrated.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'dedup.db'}"
+    db.init_app(migrated)
+    Migrate(migrated, db, directory=MIGRATIONS_DIR, render_as_batch=True)
+
+    with migrated.app_context():
+        upgrade(directory=MIGRATIONS_DIR, revision='0001_baseline')
+        db.session.execute(text("INSERT INTO user (id, email, password_hash) VALUES (1, 'dup@example.com', 'hashed')"))
+        rows = [
+            (1, None, 'Drafting', None),
+            (2, 'Full JD', 'Applied', 'Recruiter: Sam'),
+            (3, 'Other JD', 'Drafting', 'Follow up Friday'),
+        ]
+        for app_id, jd_text, status, notes in rows:
+            db.session.execute(text(
+                "INSERT INTO application (id, user_id, company, job_title, jd_text, status, notes) "
+                "VALUES (:id, 1, 'Acme', 'Engineer', :jd, :status, :notes)"
+            ), {'id': app_id, 'jd': jd_text, 'status': status, 'notes': notes})
+            db.session.execute(text("INSERT INTO resume (application_id, json_data) VALUES (:id, '{}')"), {'id': app_id})
+        for app_id, status in [(4, 'Ready to Apply'), (5, 'Wishlist')]:
+            db.session.execute(text(
+                "INSERT INTO application (id, user_id, company, job_title, status) VALUES (:id, 1, 'Globex', 'Engineer', :status)"
+            ), {'id': app_id, 'status': status})
+        db.session.commit()
+
+        upgrade(directory=MIGRATIONS_DIR)
+        kept = db.session.execute(text("SELECT id, jd_text, status, notes FROM application ORDER BY id")).fetchall()
+        assert [(row.id, row.status) for row in kept] == [(1, 'Applied'), (4, 'Ready to Apply')]
+        app_id, jd_text, status, notes = kept[0]
+        assert (app_id, jd_text, status) == (1, 'Full JD', 'Applied')
+        assert notes == (
+            "[Merged from duplicate application #2]\nRecruiter: Sam\n\n"
+            "[Merged from duplicate application #3]\nFollow up Friday\n\nJob description:\nOther JD"
+        )
+        assert db.session.execute(text("SELECT COUNT(*) FROM resume WHERE application_id = 1")).scalar() == 3
+
+        db.session.remove()
+        db.drop_all()
+        db.session.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        db.session.commit()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from app import app, db
+from models import PageAnalysis
+from services.agent_service import AutoApplyAgent, form_signature
+from services.page_analysis_cache import PageAnalysisCache, form_fingerprint
+
+FORM = {
+    "title": "Apply", "heading": "Engineer", "captcha": False, "iframes": 0,
+    "fields": [
+        {"label": "First Name", "type": "text", "name": "first_name", "selector": "#first_name"},
+        {"label": "Email", "type": "email", "name": "email", "selector": "#email", "required": True},
+        {"label": "Resume", "type": "file", "name": "resume", "selector": "#resume"},
+    ],
+    "buttons": [{"text": "Submit Application", "selector": "#submit_app"}],
+}
+CONTROLS = form_signature(FORM)
+ANALYSIS = {
+    "apply_button_selector": None,
+    "form_fields": [
+        {"label": "First Name", "selector": "#first_name", "type": "text"},
+        {"label": "Email", "selector": "#email", "type": "email"},
+    ],
+    "captcha_detected": False,
+    "page_type": "application_form",
+}
+PROFILE = {'full_name': 'Jane Doe', 'email': 'jane@example.com'}
+
+
+@pytest.fixture
+def cache():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+    yield PageAnalysisCache(app, min_confidence=0.5, enabled=True)
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+class FakePage:
+    def __init__(self, url, form=FORM, broken=()):
+        self.url = url
+        self.form = form
+        self.broken = set(broken)
+        self.filled = {}
+
+    async def evaluate(self, script):
+        return self.form
+
+    async def screenshot(self, **kwargs):
+        return b'png'
+
+    async def fill(self, selector, value):
+        if selector in self.broken:
+            raise TimeoutError(f"waiting for {selector}")
+        self.filled[selector] = value
+
+
+def _agent(cache, analysis=ANALYSIS):
+    llm = MagicMock()
+    llm.agenerate = AsyncMock(return_value=SimpleNamespace(text=json.dumps(analysis)))
+    return AutoApplyAgent(headless=True, gemini=SimpleNamespace(llm=llm), page_cache=cache), llm
+
+
+async def _analyze_and_fill(agent, page):
+    analysis = await agent.analyze_page(page)
+    for field in analysis['form_fields']:
+        await agent.fill_form_field(page, field, PROFILE)
+    await agent._report_selectors()
+    return analysis
+
+
+def test_fingerprint_ignores_control_order():
+    assert CONTROLS == ['input|text|first_name', 'input|email|email', 'input|file|resume']
+    assert form_fingerprint(CONTROLS) == form_fingerprint(list(reversed(CONTROLS)))
+    assert form_fingerprint(CONTROLS) != form_fingerprint(CONTROLS[:-1])
+
+
+def test_same_form_on_same_domain_skips_the_llm(cache):
+    first, first_llm = _agent(cache)
+    asyncio.run(_analyze_and_fill(first, FakePage('https://boards.greenhouse.io/acme/jobs/1')))
+    assert first_llm.agenerate.await_count == 1
+
+    second, second_llm = _agent(cache)
+    page = FakePage('https://www.boards.greenhouse.io/globex/jobs/2', dict(FORM, fields=list(reversed(FORM['fields']))))
+    analysis = asyncio.run(_analyze_and_fill(second, page))
+
+    assert second_llm.agenerate.await_count == 0
+    assert analysis == ANALYSIS
+    assert page.filled == {'#first_name': 'Jane', '#email': 'jane@example.com'}
+    assert cache.stats()['hits'] == 1
+
+    # A different form, or the same form on another site, is analyzed again
+    third, third_llm = _agent(cache)
+    asyncio.run(third.analyze_page(FakePage('https://jobs.lever.co/acme/3')))
+    asyncio.run(third.analyze_page(FakePage('https://boards.greenhouse.io/acme/jobs/4', dict(FORM, fields=FORM['fields'][:2]))))
+    assert third_llm.agenerate.await_count == 2
+
+
+def test_failing_selectors_lower_confidence_then_invalidate(cache):
+    url = 'https://acme.wd5.myworkdayjobs.com/job/1'
+    domain, fingerprint = cache.key(url, CONTROLS)
+    cache.put(domain, fingerprint, ANALYSIS)
+
+    agent, _ = _agent(cache)
+    asyncio.run(_analyze_and_fill(agent, FakePage(url)))
+    with app.app_context():
+        assert db.session.query(PageAnalysis.confidence).scalar() == 1.0
+
+    # One of two selectors fails: confidence halves but the entry is still served
+    agent, llm = _agent(cache)
+    asyncio.run(_analyze_and_fill(agent, FakePage(url, broken={'#email'})))
+    assert llm.agenerate.await_count == 0
+    with app.app_context():
+        assert db.session.query(PageAnalysis.confidence).scalar() == 0.5
+
+    agent, llm = _agent(cache)
+    asyncio.run(_analyze_and_fill(agent, FakePage(url, broken={'#email'})))
+    with app.app_context():
+        assert PageAnalysis.query.count() == 0
+    assert cache.stats()['invalidations'] == 1
+
+    # Next visit asks the LLM again and stores the fresh analysis
+    agent, llm = _agent(cache)
+    asyncio.run(agent.analyze_page(FakePage(url)))
+    assert llm.agenerate.await_count == 1
+    with app.app_context():
+        assert PageAnalysis.query.count() == 1
+
+
+def test_failed_analysis_is_not_cached(cache):
+    agent, llm = _agent(cache)
+    llm.agenerate.side_effect = ValueError("bad json")
+    analysis = asyncio.run(agent.analyze_page(FakePage('https://jobs.example.com/1')))
+    assert analysis['page_type'] == 'unknown'
+    with app.app_context():
+        assert PageAnalysis.query.count() == 0
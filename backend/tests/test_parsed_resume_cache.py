@@ -0,0 +1,76 @@
+import io
+import pytest
+from app import app, db
+from models import User, ParsedResume
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+        yield client
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+def _upload(client, content=b"%PDF resume bytes", name='resume.pdf'):
+    return client.post('/api/parse-resume', data={'resume': (io.BytesIO(content), name)}, content_type='multipart/form-data')
+
+def _login(client, email):
+    with app.app_context():
+        user = User(email=email, password_hash='hashed')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+    return user_id
+
+def test_repeat_upload_is_served_from_cache(client, mocker):
+    extract = mocker.patch('services.parser_service.ParserService.extract_text', return_value="Parsed text")
+    first = _upload(client).get_json()
+    second = _upload(client).get_json()
+
+    assert first['cached'] is False
+    assert second == {"text": "Parsed text", "resume_hash": first['resume_hash'], "cached": True}
+    assert extract.call_count == 1
+
+def test_cache_is_per_user(client, mocker):
+    extract = mocker.patch('services.parser_service.ParserService.extract_text', return_value="Parsed text")
+    _upload(client)
+    user_id = _login(client, 'parser@example.com')
+    _upload(client)
+    _upload(client)
+
+    assert extract.call_count == 2
+    with app.app_context():
+        assert ParsedResume.query.filter_by(user_id=user_id).count() == 1
+
+def test_parse_errors_are_not_cached(client, mocker):
+    mocker.patch('services.parser_service.ParserService.extract_text', return_value="Error reading PDF: bad xref")
+    response = _upload(client).get_json()
+    assert response == {"text": "Error reading PDF: bad xref"}
+    with app.app_context():
+        assert ParsedResume.query.count() == 0
+
+def test_resume_hash_stands_in_for_resume_text(client, mocker):
+    mocker.patch('services.parser_service.ParserService.extract_text', return_value="I know Java")
+    _login(client, 'owner@example.com')
+    resume_hash = _upload(client).get_json()['resume_hash']
+
+    response = client.post('/api/score-resume?mode=local', json={"resume_hash": resume_hash, "jd_text": "Java and Python"})
+    assert response.status_code == 200
+    assert response.get_json()['missing_keywords'] == ['python']
+
+    # Another user can't use a hash they never uploaded
+    _login(client, 'other@example.com')
+    response = client.post('/api/score-resume?mode=local', json={"resume_hash": resume_hash, "jd_text": "Java"})
+    assert response.status_code == 404
+
+def test_anonymous_upload_usable_after_login(client, mocker):
+    mocker.patch('services.parser_service.ParserService.extract_text', return_value="I know Java")
+    resume_hash = _upload(client).get_json()['resume_hash']
+    _login(client, 'late@example.com')
+    response = client.post('/api/score-resume?mode=local', json={"resume_hash": resume_hash, "jd_text": "Java"})
+    assert response.get_json()['score'] == 100
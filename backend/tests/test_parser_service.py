@@ -0,0 +1,96 @@
+import io
+import os
+import threading
+import time
+import docx
+import pytest
+from reportlab.pdfgen import canvas
+from werkzeug.datastructures import FileStorage
+from services.parser_service import ParserService, ParseTimeout
+
+def _pdf(pages):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for i in range(pages):
+        pdf.drawString(72, 720, f"Page {i} experience with Python")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+def _upload(content, name):
+    return FileStorage(stream=io.BytesIO(content), filename=name)
+
+def test_pdf_respects_page_limit():
+    service = ParserService(max_pages=2, workers=0)
+    text = service.extract_text(_upload(_pdf(5), 'resume.pdf'))
+    assert "Page 0 experience" in text
+    assert "Page 1 experience" in text
+    assert "Page 2" not in text
+
+def test_docx_includes_tables_in_document_order():
+    document = docx.Document()
+    document.add_paragraph("Summary paragraph")
+    table = document.add_table(rows=2, cols=3)
+    table.cell(0, 0).text = "Skill"
+    table.cell(0, 1).text = "Level"
+    table.cell(1, 0).merge(table.cell(1, 1)).text = "Python"
+    table.cell(1, 2).text = "Expert"
+    document.add_paragraph("After the table")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    text = ParserService(workers=0).extract_text(_upload(buffer.getvalue(), 'resume.docx'))
+    assert text.split('\n')[:4] == ["Summary paragraph", "Skill | Level", "Python | Expert", "After the table"]
+
+def test_rejects_uploads_over_byte_limit():
+    service = ParserService(max_bytes=100, workers=0)
+    text = service.extract_text(_upload(_pdf(1), 'resume.pdf'))
+    assert text.startswith("Error reading PDF: file is larger than")
+    assert service.is_error(text)
+
+def test_hash_rewinds_stream():
+    upload = _upload(b"same bytes", 'resume.pdf')
+    service = ParserService(workers=0)
+    assert service.file_hash(upload) == service.file_hash(upload)
+
+def test_parses_in_worker_process_and_kills_runaways():
+    service = ParserService(timeout=2, workers=1)
+    try:
+        assert "Page 0 experience" in service.extract_text(_upload(_pdf(1), 'resume.pdf'))
+
+        service.timeout = 0.5
+        started = time.perf_counter()
+        with pytest.raises(ParseTimeout):
+            service.run(time.sleep, 30)
+        assert time.perf_counter() - started < 5
+
+        # A fresh worker replaces the killed one
+        service.timeout = 10
+        assert "Page 0 experience" in service.extract_text(_upload(_pdf(1), 'resume.pdf'))
+    finally:
+        service.close()
+
+def test_timeout_kills_only_the_stuck_worker():
+    service = ParserService(timeout=10, workers=2)
+    try:
+        slow = {}
+        thread = threading.Thread(target=lambda: slow.update(pid=service.run(os.getpid), slept=service.run(time.sleep, 1.5)))
+        thread.start()
+        time.sleep(0.5)
+
+        service.timeout = 0.5
+        with pytest.raises(ParseTimeout):
+            service.run(time.sleep, 30)
+        thread.join()
+        assert slow == {'pid': slow['pid'], 'slept': None}
+        assert slow['pid'] != os.getpid()
+    finally:
+        service.close()
+
+def test_worker_does_not_import_the_app():
+    service = ParserService(timeout=10, workers=1)
+    try:
+        loaded = "[name in __import__('sys').modules for name in ('app', 'flask', 'sqlalchemy')]"
+        assert service.run(eval, loaded) == [False, False, False]
+    finally:
+        service.close()
@@ -0,0 +1,167 @@
+import pytest
+from unittest.mock import MagicMock
+from google.api_core import exceptions as api_exceptions
+from services.llm_client import LLMClient, LLMBusy, LLMUnavailable
+from services.resilience import Backoff, CircuitBreaker, SQLiteTokenBucket, TokenBucket, retry_after_hint
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+    assert bucket.reserve(0) == 0
+    assert bucket.reserve(0) == 0
+    assert bucket.reserve(0) is None
+    assert bucket.reserve(1) == pytest.approx(0.5)
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+    clock.now += 10
+    assert bucket.reserve(0) == 0
+    assert bucket.metrics()['throttled'] == 2
+    assert bucket.metrics()['rejected'] == 1
+
+def test_sqlite_bucket_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'rate.db')
+    worker_a = SQLiteTokenBucket(path, rate=0.01, capacity=2)
+    worker_b = SQLiteTokenBucket(path, rate=0.01, capacity=2)
+
+    assert worker_a.reserve(0) == 0
+    assert worker_b.reserve(0) == 0
+    assert worker_a.reserve(0) is None
+
+def test_circuit_breaker_opens_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.retry_after() == 30
+
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.metrics()['opens'] == 2
+
+def test_backoff_prefers_retry_after_hint():
+    throttled = api_exceptions.ResourceExhausted('quota')
+    throttled.retry_after = 4
+    backoff = Backoff(max_retries=3, base_delay=1, max_delay=10)
+    assert retry_after_hint(throttled) == 4
+    assert backoff.delay(0, throttled) == 4
+    assert 0 <= backoff.delay(3) <= 8
+
+def _client(model, sleeps, **kwargs):
+    kwargs.setdefault('breaker', CircuitBreaker(failure_threshold=5, reset_timeout=30))
+    return LLMClient(
+        model, max_concurrency=1,
+        rate_limiter=TokenBucket(rate=100, capacity=100),
+        backoff=Backoff(max_retries=2, base_delay=1, max_delay=10),
+        sleep=sleeps.append, **kwargs
+    )
+
+def test_retries_transient_errors_with_backoff():
+    model = MagicMock()
+    throttled = api_exceptions.ResourceExhausted('quota')
+    throttled.retry_after = 3
+    model.generate_content.side_effect = [throttled, api_exceptions.ServiceUnavailable('down'), "ok"]
+    sleeps = []
+    client = _client(model, sleeps)
+
+    assert client.generate("p") == "ok"
+    assert sleeps[0] == 3
+    assert 0 <= sleeps[1] <= 2
+    assert client.metrics()['retries'] == 2
+    assert client.breaker.state == 'closed'
+
+def test_gives_up_with_retry_after_and_skips_non_retryable_errors():
+    model = MagicMock()
+    model.generate_content.side_effect = api_exceptions.ServiceUnavailable('down')
+    client = _client(model, [])
+    with pytest.raises(LLMUnavailable) as excinfo:
+        client.generate("p")
+    assert excinfo.value.retry_after >= 1
+    assert model.generate_content.call_count == 3
+
+    model.generate_content.side_effect = api_exceptions.InvalidArgument('bad prompt')
+    with pytest.raises(api_exceptions.InvalidArgument):
+        client.generate("other")
+    assert model.generate_content.call_count == 4
+
+def test_open_circuit_fails_fast_without_calling_upstream():
+    model = MagicMock()
+    model.generate_content.side_effect = api_exceptions.InternalServerError('boom')
+    client = _client(model, [], breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30))
+
+    with pytest.raises(LLMUnavailable):
+        client.generate("p")
+    assert model.generate_content.call_count == 2
+
+    with pytest.raises(LLMUnavailable, match="circuit open"):
+        client.generate("q")
+    assert model.generate_content.call_count == 2
+    assert client.metrics()['breaker']['short_circuited'] == 2
+
+def test_exhausted_rate_budget_sheds_load():
+    model = MagicMock()
+    client = LLMClient(model, max_concurrency=1, acquire_timeout=1, rate_limiter=TokenBucket(rate=0.01, capacity=1))
+    client.generate("p")
+    with pytest.raises(LLMBusy, match="rate limit"):
+        client.generate("q")
+    assert client.metrics()['rate_limit']['rejected'] == 1
+
+def _half_open_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 30
+    return breaker
+
+def test_shed_half_open_trial_is_handed_back():
+    model = MagicMock()
+    model.generate_content.return_value = "ok"
+    client = LLMClient(model, max_concurrency=1, acquire_timeout=1, rate_limiter=TokenBucket(rate=0.01, capacity=1),
+                       breaker=_half_open_breaker())
+    client.rate_limiter.reserve(0)
+
+    with pytest.raises(LLMBusy, match="rate limit"):
+        client.generate("p")
+    assert client.breaker.state == 'open'
+    client.rate_limiter = None
+    assert client.generate("q") == "ok"
+    assert client.breaker.state == 'closed'
+
+def test_abandoned_stream_hands_back_half_open_trial():
+    model = MagicMock()
+    model.generate_content.side_effect = lambda *a, **kw: iter([MagicMock(text="a"), MagicMock(text="b")])
+    client = _client(model, [], breaker=_half_open_breaker())
+
+    chunks = client.stream("p")
+    assert next(chunks) == "a"
+    chunks.close()
+    assert client.breaker.state == 'open'
+    assert client.metrics()['running'] == 0
+    assert list(client.stream("q")) == ["a", "b"]
+    assert client.breaker.state == 'closed'
+
+def test_tailor_resume_surfaces_outage_instead_of_fake_resume(mocker):
+    from app import app, gemini_service
+    mocker.patch.object(gemini_service.llm, 'generate', side_effect=LLMUnavailable(12, "down"))
+    gemini_service.cache.clear()
+    with app.test_client() as client:
+        response = client.post('/api/tailor-resume', json={"resume_text": "r", "jd_text": "j"})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '12'
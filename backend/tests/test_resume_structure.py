@@ -0,0 +1,111 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from app import gemini_service, parser_service
+from services.resume_structure import parse_resume_text
+
+RESUME = """Jane Doe
+Senior Backend Engineer
+San Francisco, CA | jane@example.com | +1 415 555 0100 | linkedin.com/in/janedoe
+SUMMARY
+Backend engineer with 8 years building APIs.
+EXPERIENCE
+Senior Engineer | Acme Corp | Austin, TX | Jan 2020 - Present
+- Built a payment service handling 1M requests/day
+- Led the migration to
+  Kubernetes across four teams
+Engineer at Beta Inc, Jun 2016 - Dec 2019
+• Wrote Python ETL jobs
+EDUCATION
+University of Texas at Austin
+B.S. Computer Science, 2012 - 2016
+Technical Skills:
+Languages: Python, Go, SQL
+Cloud & Tools: Docker, Kubernetes
+PROJECTS
+ModRes (Flask, Vue)
+- Resume tailoring tool
+Awards
+- Hackathon winner 2019
+"""
+
+def test_parse_resume_text_fills_template_fields():
+    resume = parse_resume_text(RESUME)
+
+    assert resume["name"] == "Jane Doe"
+    assert resume["role"] == "Senior Backend Engineer"
+    assert resume["location"] == "San Francisco, CA"
+    assert resume["email"] == "jane@example.com"
+    assert resume["phone"] == "+1 415 555 0100"
+    assert resume["linkedin"] == "https://linkedin.com/in/janedoe"
+    assert resume["objective"] == "Backend engineer with 8 years building APIs."
+    assert resume["experience"] == [
+        {"title": "Senior Engineer", "company": "Acme Corp", "location": "Austin, TX", "dates": "Jan 2020 - Present",
+         "points": ["Built a payment service handling 1M requests/day", "Led the migration to Kubernetes across four teams"]},
+        {"title": "Engineer", "company": "Beta Inc", "location": "", "dates": "Jun 2016 - Dec 2019",
+         "points": ["Wrote Python ETL jobs"]},
+    ]
+    assert resume["education"] == [
+        {"school": "University of Texas at Austin", "location": "", "degree": "B.S. Computer Science", "dates": "2012 - 2016"}
+    ]
+    assert resume["skills"]["languages"] == "Python, Go, SQL"
+    assert resume["skills"]["tools"] == "Docker, Kubernetes"
+    assert resume["projects"] == [{"title": "ModRes", "description": "Resume tailoring tool", "stack": "Flask, Vue"}]
+    assert resume["achievements"] == ["Hackathon winner 2019"]
+
+def test_parse_resume_text_keeps_parenthesized_area_code():
+    resume = parse_resume_text("Jane Doe\nAustin, TX | (555) 123-4567 | jane@example.com\nEXPERIENCE\n")
+    assert resume["phone"] == "(555) 123-4567"
+    assert resume["location"] == "Austin, TX"
+    assert parse_resume_text("Jane Doe\n+1 (555) 123-4567\n")["phone"] == "+1 (555) 123-4567"
+
+def test_skill_labels_match_whole_words():
+    resume = parse_resume_text(
+        "Jane Doe\nSKILLS\nDatabases: PostgreSQL, MySQL\nContainers & Orchestration: Docker\n"
+        "Domain Knowledge: Payments\nHTML/CSS: Tailwind\nData & ML: Pandas, PyTorch\nAI: LangChain\n"
+    )
+    assert resume["skills"]["tools"] == "PostgreSQL, MySQL, Docker, Payments, Tailwind"
+    assert resume["skills"]["ai_ml"] == "Pandas, PyTorch, LangChain"
+
+def test_parse_resume_text_without_headings_keeps_template_shape():
+    resume = parse_resume_text("Just a paragraph about me")
+    assert resume["name"] == "Just a paragraph about me"
+    assert resume["experience"] == [] and resume["education"] == []
+    assert set(resume["skills"]) == {"languages", "web", "frameworks", "ai_ml", "tools"}
+
+def _mock_model(mocker, payload):
+    gemini_service.cache.clear()
+    model = MagicMock()
+    model.generate_content.return_value = SimpleNamespace(text=json.dumps(payload))
+    mocker.patch.object(gemini_service.llm, 'model', model)
+    mocker.patch.object(gemini_service.llm, 'breaker', MagicMock(allow=MagicMock(return_value=True)))
+    return model
+
+def test_rewrite_mode_only_sends_sections_and_merges_bullets(client, mocker):
+    model = _mock_model(mocker, {
+        "role": "Platform Engineer",
+        "objective": "Platform engineer who ships.",
+        "experience": [{"points": ["Scaled payments to 1M requests/day"]}, {"points": ["Built ETL in Python"]}],
+        "skills": {"languages": "Python, Go", "web": "", "frameworks": "", "ai_ml": "", "tools": "Kubernetes"},
+    })
+
+    response = client.post('/api/tailor-resume', json={"resume_text": RESUME, "jd_text": "Platform role", "mode": "rewrite"})
+
+    assert response.status_code == 200
+    data = response.get_json()['tailored_data']
+    prompt = model.generate_content.call_args.args[0]
+    assert "SUMMARY" not in prompt and "University of Texas" not in prompt
+    assert data["role"] == "Platform Engineer"
+    assert data["experience"][0]["company"] == "Acme Corp"
+    assert data["experience"][0]["points"] == ["Scaled payments to 1M requests/day"]
+    assert data["skills"]["tools"] == "Kubernetes"
+    assert data["education"] == parser_service.parse_structured(RESUME)["education"]
+
+def test_rewrite_mode_falls_back_to_full_tailoring_without_experience(client, mocker):
+    _mock_model(mocker, {"name": "Jane Doe", "experience": []})
+    rewrite = mocker.spy(gemini_service, 'rewrite_resume')
+
+    response = client.post('/api/tailor-resume', json={"resume_text": "Jane Doe", "jd_text": "j", "mode": "rewrite"})
+
+    assert response.get_json()['tailored_data']["name"] == "Jane Doe"
+    assert rewrite.call_count == 0
@@ -40,3 +40,134 @@ def test_render_latex_template():
         # If template not found, that's a configuration issue we might need to fix
         # but for unit testing logic, we might want to mock the template loader
         pytest.fail(f"Latex rendering failed: {e}")
+
+def _fake_tectonic(cmd, **kwargs):
+    # Tectonic writes <stem>.pdf into --outdir
+    outdir = cmd[cmd.index('--outdir') + 1]
+    stem = os.path.splitext(os.path.basename(cmd[-1]))[0]
+    with open(os.path.join(outdir, f"{stem}.pdf"), 'wb') as f:
+        f.write(b"%PDF-1.4 fake")
+
+def test_compile_pdf_reuses_cached_pdf(mocker, tmp_path):
+    service = LatexService()
+    service.output_dir = str(tmp_path)
+    from services.pdf_cache import PdfCache
+    service.pdf_cache = PdfCache(str(tmp_path / 'pdf_cache'))
+    run = mocker.patch('services.tectonic_env.subprocess.run', side_effect=_fake_tectonic)
+
+    first = service.compile_pdf_from_string("\\documentclass{article}")
+    second = service.compile_pdf_from_string("\\documentclass{article}")
+    third = service.compile_pdf_from_string("\\documentclass{report}")
+
+    assert first == second != third
+    assert run.call_count == 2
+    assert service.pdf_cache.stats() == {'hits': 1, 'misses': 2}
+
+def test_pdf_cache_evicts_least_recently_used(tmp_path):
+    from services.pdf_cache import PdfCache
+    cache = PdfCache(str(tmp_path), max_bytes=20)
+    for i, key in enumerate(['a', 'b', 'c']):
+        src = tmp_path / f"src_{key}.bin"
+        src.write_bytes(b"x" * 10)
+        cache.put(key, str(src))
+        os.utime(cache.path_for(key), (1000 + i, 1000 + i))
+        cache.evict()
+
+    assert cache.get('a') is None
+    assert cache.get('b') is not None
+    assert cache.get('c') is not None
+
+def test_tectonic_command_uses_managed_cache(tmp_path):
+    from services.tectonic_env import TectonicEnvironment
+    env = TectonicEnvironment(cache_dir=str(tmp_path / 'cache'), bundle='/bundles/tl.tar', only_cached=True)
+
+    cmd = env.command('/work/resume.tex', '/work')
+
+    assert cmd == ['tectonic', '--outdir', '/work', '--bundle', '/bundles/tl.tar', '--only-cached', '/work/resume.tex']
+    assert env.env()['TECTONIC_CACHE_DIR'] == str(tmp_path / 'cache')
+
+def test_warm_up_compiles_template_in_isolated_workdir(mocker, tmp_path):
+    service = LatexService()
+    service.output_dir = str(tmp_path)
+    run = mocker.patch('services.tectonic_env.subprocess.run', side_effect=_fake_tectonic)
+
+    assert service.warm_up() is True
+
+    workdir = run.call_args.kwargs['cwd']
+    assert workdir.startswith(str(tmp_path))
+    assert not os.path.exists(workdir)
+    assert service.tectonic.metrics()['count'] == 1
+    assert service.tectonic.metrics()['warm'] is True
+
+def test_compile_executor_sheds_load_when_queue_full(mocker):
+    import threading
+    import time
+    from services.tectonic_env import CompileExecutor, CompileQueueFull
+    executor = CompileExecutor(max_concurrency=1, max_queue=1, timeout=5)
+    release = threading.Event()
+    mocker.patch('services.tectonic_env.subprocess.run', side_effect=lambda cmd, **kwargs: release.wait(5))
+
+    # One compile holds the only slot and a second one waits for it
+    workers = [threading.Thread(target=executor.run, args=(['tectonic'],)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    deadline = time.time() + 5
+    while (executor.running, executor.waiting) != (1, 1) and time.time() < deadline:
+        time.sleep(0.01)
+
+    with pytest.raises(CompileQueueFull) as exc:
+        executor.run(['tectonic'])
+    release.set()
+    for worker in workers:
+        worker.join()
+
+    assert exc.value.retry_after >= 1
+    assert executor.metrics()['rejected'] == 1
+    assert executor.metrics()['running'] == 0
+
+def test_compile_executor_counts_timeouts(mocker):
+    import subprocess
+    from services.tectonic_env import CompileExecutor
+    executor = CompileExecutor(max_concurrency=1, max_queue=1, timeout=0.1)
+    mocker.patch('services.tectonic_env.subprocess.run', side_effect=subprocess.TimeoutExpired('tectonic', 0.1))
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        executor.run(['tectonic'])
+
+    assert executor.metrics()['timeouts'] == 1
+    assert executor.metrics()['running'] == 0
+
+def test_compile_pdf_bytes_leaves_no_workdir(mocker, tmp_path):
+    from services.pdf_cache import PdfCache
+    service = LatexService()
+    service.output_dir = str(tmp_path)
+    service.pdf_cache = PdfCache(str(tmp_path / 'pdf_cache'))
+    mocker.patch('services.tectonic_env.subprocess.run', side_effect=_fake_tectonic)
+
+    pdf_bytes = service.compile_pdf_bytes("\\documentclass{article}")
+
+    assert pdf_bytes == b"%PDF-1.4 fake"
+    assert sorted(os.listdir(tmp_path)) == ['pdf_cache']
+
+def test_output_janitor_prunes_by_age_then_size(tmp_path):
+    from services.janitor import OutputJanitor
+    now = 100000.0
+    (tmp_path / 'tectonic_dead').mkdir()
+    os.utime(tmp_path / 'tectonic_dead', (now - 7200, now - 7200))
+    (tmp_path / 'pdf_cache').mkdir()
+    (tmp_path / 'screens').mkdir()
+    files = [
+        ('resume_old.pdf', 7200), ('pdf_cache/older_recent.pdf', 300), ('resume_newest.pdf', 10),
+        # Not cache artifacts: referenced by agent runs and the auto-apply fallback
+        ('pre_submit_run1.png', 7200), ('latest_resume.pdf', 7200), ('screens/shot.png', 7200),
+    ]
+    for name, age in files:
+        path = tmp_path / name
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (now - age, now - age))
+
+    OutputJanitor(str(tmp_path), max_age_seconds=3600, max_bytes=10, interval=0).sweep(now=now)
+
+    assert sorted(os.listdir(tmp_path)) == ['latest_resume.pdf', 'pdf_cache', 'pre_submit_run1.png', 'resume_newest.pdf', 'screens']
+    assert os.listdir(tmp_path / 'pdf_cache') == []
+    assert os.listdir(tmp_path / 'screens') == ['shot.png']
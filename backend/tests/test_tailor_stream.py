@@ -0,0 +1,84 @@
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from app import app, gemini_service
+from services.json_stream import JSONObjectStream, object_events
+from services.llm_client import LLMUnavailable
+
+TAILORED = {
+    "name": "Jane Doe",
+    "objective": "Backend engineer, \"API\" focused.",
+    "experience": [
+        {"title": "Engineer", "company": "Acme", "location": "Remote", "dates": "2020-2024", "points": ["Built {things}", "Shipped]"]},
+        {"title": "Intern", "company": "Globex", "location": "NYC", "dates": "2019", "points": []}
+    ],
+    "skills": {"languages": "Python", "frameworks": "Flask", "tools": "Git", "ai_ml": ""},
+    "achievements": ["Award"],
+    "education": [],
+    "score": 87
+}
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+@pytest.mark.parametrize('size', [1, 5, 64])
+def test_parser_emits_sections_as_they_complete(size):
+    parser = JSONObjectStream()
+    events = []
+    for chunk in _chunks(json.dumps(TAILORED, indent=2), size):
+        events.extend(parser.feed(chunk))
+
+    assert events == object_events(TAILORED)
+    assert parser.result() == TAILORED
+
+def test_parser_emits_before_the_object_is_finished():
+    parser = JSONObjectStream()
+    text = json.dumps(TAILORED)
+    partial = text[:text.index('"Intern"')]
+    events = parser.feed(partial)
+    assert ('field', 'objective', TAILORED['objective']) in events
+    assert events[-1] == ('item', 'experience', 0, TAILORED['experience'][0])
+
+def _parse_sse(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+def test_stream_endpoint_sends_sections_then_latex(mocker):
+    gemini_service.cache.clear()
+    model = MagicMock()
+    model.generate_content.return_value = [SimpleNamespace(text=c) for c in _chunks(json.dumps(TAILORED), 40)]
+    mocker.patch.object(gemini_service.llm, 'model', model)
+    mocker.patch.object(gemini_service.llm, 'breaker', MagicMock(allow=MagicMock(return_value=True)))
+
+    with app.test_client() as client:
+        response = client.post('/api/tailor-resume/stream', json={"resume_text": "r", "jd_text": "j"})
+        events = _parse_sse(response.get_data(as_text=True))
+
+    assert response.mimetype == 'text/event-stream'
+    assert model.generate_content.call_args.kwargs['stream'] is True
+    assert events[0] == ('section', {"key": "name", "value": "Jane Doe"})
+    assert ('item', {"key": "experience", "index": 1, "value": TAILORED['experience'][1]}) in events
+    kind, result = events[-1]
+    assert kind == 'result'
+    assert result['tailored_data'] == TAILORED
+    assert 'Jane Doe' in result['latex_code']
+
+    # The streamed result is cached for the blocking endpoint and for replays
+    model.generate_content.reset_mock()
+    with app.test_client() as client:
+        replay = _parse_sse(client.post('/api/tailor-resume/stream', json={"resume_text": "r", "jd_text": "j"}).get_data(as_text=True))
+    assert replay == events
+    assert gemini_service.tailor_resume("r", "j", []) == TAILORED
+    assert model.generate_content.call_count == 0
+
+def test_stream_endpoint_returns_503_when_llm_unavailable(mocker):
+    gemini_service.cache.clear()
+    mocker.patch.object(gemini_service.llm, 'stream', side_effect=LLMUnavailable(9, "down"))
+    with app.test_client() as client:
+        response = client.post('/api/tailor-resume/stream', json={"resume_text": "r", "jd_text": "j"})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '9'
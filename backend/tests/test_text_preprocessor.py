@@ -0,0 +1,110 @@
+from unittest.mock import MagicMock
+from services.cache_service import MemoryCacheBackend, ResponseCache
+from services.gemini_service import GeminiService
+from services.text_preprocessor import TextPreprocessor, TRUNCATION_MARKER, estimate_tokens
+
+RESUME_PDF_TEXT = """Jane   Doe\t\tjane@example.com
+Senior Engineer with ﬁve years of experi-
+ence building APIs.
+Jane Doe - Resume - jane@example.com
+Page 1 of 2
+EXPERIENCE
+- Built payment APIs in Python
+Jane Doe - Resume - jane@example.com
+2
+SKILLS
+Python
+Python
+"""
+
+def test_normalizes_and_removes_pdf_artifacts():
+    cleaned = TextPreprocessor().prepare_resume(RESUME_PDF_TEXT)
+    assert cleaned.splitlines() == [
+        "Jane Doe jane@example.com",
+        "Senior Engineer with five years of experience building APIs.",
+        "Jane Doe - Resume - jane@example.com",
+        "Page 1 of 2",
+        "EXPERIENCE",
+        "- Built payment APIs in Python",
+        "2",
+        "SKILLS",
+        "Python",
+        "Python",
+    ]
+
+def test_resume_numbers_are_not_page_markers():
+    resume = "Jane Doe\n9876543210\nEXPERIENCE\nAcme Corp\n2021\n2019 / 2021\n- Built payment APIs"
+    cleaned = TextPreprocessor().prepare_resume(resume)
+    assert cleaned == resume
+
+def test_only_explicit_page_markers_are_stripped_from_jds():
+    jd = "Backend Engineer\nPage 1 of 2\nFounded in\n2015\n- Page 2 -\nCall 9876543210"
+    cleaned = TextPreprocessor().prepare_jd(jd)
+    assert cleaned == "Backend Engineer\nFounded in\n2015\nCall 9876543210"
+
+def test_strips_jd_boilerplate():
+    jd = """Backend Engineer
+Requirements:
+- Python and SQL
+
+EEO Statement:
+We are committed to diversity in every form.
+All qualified applicants will be considered.
+
+Acme is an Equal Opportunity Employer.
+Benefits include remote work."""
+    cleaned = TextPreprocessor().prepare_jd(jd)
+    assert "diversity" not in cleaned
+    assert "Equal Opportunity" not in cleaned
+    assert "- Python and SQL" in cleaned
+    assert "Benefits include remote work." in cleaned
+
+def test_privacy_and_legal_roles_keep_their_sections():
+    jd = """Privacy Engineer
+Privacy engineering duties:
+Build data deletion pipelines.
+Maintain our privacy policy tooling.
+
+Legal:
+Work with counsel on GDPR requests.
+
+Requirements: 5 years Python.
+
+Privacy Notice:
+We process applicant data under our applicant privacy notice."""
+    cleaned = TextPreprocessor().prepare_jd(jd)
+    assert cleaned == (
+        "Privacy Engineer\nPrivacy engineering duties:\nBuild data deletion pipelines.\n"
+        "Maintain our privacy policy tooling.\n\nLegal:\nWork with counsel on GDPR requests.\n\n"
+        "Requirements: 5 years Python."
+    )
+
+def test_truncation_drops_low_priority_sections_first():
+    jd = "Requirements:\n- Python\n- Kubernetes\nBenefits:\n" + "- generous perk\n" * 200
+    cleaned = TextPreprocessor(max_jd_tokens=50).prepare_jd(jd)
+    assert cleaned == "Requirements:\n- Python\n- Kubernetes"
+
+def test_truncation_keeps_every_section_within_budget():
+    resume = "EXPERIENCE\n" + "\n".join(f"- Shipped feature number {i}" for i in range(300)) + "\nEDUCATION\nBSc Computer Science\nSKILLS\nPython, Go"
+    cleaned = TextPreprocessor(max_resume_tokens=200).prepare_resume(resume)
+    assert estimate_tokens(cleaned) <= 200
+    assert cleaned.endswith("EDUCATION\nBSc Computer Science\nSKILLS\nPython, Go")
+    assert "- Shipped feature number 0" in cleaned
+    assert TRUNCATION_MARKER in cleaned
+
+def test_gemini_prompt_and_cache_key_use_preprocessed_text(capsys):
+    service = GeminiService(cache=ResponseCache(MemoryCacheBackend()))
+    service.model = MagicMock()
+    service.model.generate_content.return_value.text = '{"score": 80, "improvement_suggestions": []}'
+
+    service.score_resume(RESUME_PDF_TEXT, "Need Python.\nPage 3")
+    service.score_resume(RESUME_PDF_TEXT + "\n\n", "Need Python.")
+
+    prompt = service.model.generate_content.call_args.args[0]
+    assert "Page 3" not in prompt
+    assert "five years of experience" in prompt
+    assert service.model.generate_content.call_count == 1
+    assert "Preprocessed resume" in capsys.readouterr().out
+
+def test_can_be_disabled():
+    assert TextPreprocessor(enabled=False).prepare_jd("a  \n\n\n b") == "a  \n\n\n b"
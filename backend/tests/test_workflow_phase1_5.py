@@ -87,3 +87,27 @@ def test_initiate_existing_application(client):
     with app.app_context():
         app_record = Application.query.filter_by(company='Test Corp').first()
         assert app_record.jd_text == 'New JD'
+
+def test_application_detail_serves_memoized_latex(client, mocker):
+    response = client.post('/api/initiate-tailoring', json={
+        'company_name': 'Test Corp',
+        'job_title': 'Software Engineer'
+    })
+    app_id = response.get_json()['application_id']
+    client.post(f'/api/application/{app_id}/finalize-resume', json={
+        'tailored_data': {'name': 'Jane Doe', 'role': 'Software Engineer', 'education': [], 'experience': [], 'skills': {}}
+    })
+    
+    from app import latex_service
+    render = mocker.spy(latex_service, 'render_latex')
+    response = client.get(f'/api/applications/{app_id}')
+    assert 'Jane Doe' in response.get_json()['resume']['latex_code']
+    assert render.call_count == 0
+    
+    # A template change invalidates the memoized rendering
+    mocker.patch.object(latex_service, 'template_version', 'edited-template')
+    client.get(f'/api/applications/{app_id}')
+    assert render.call_count == 1
+    with app.app_context():
+        resume = Resume.query.filter_by(application_id=app_id).first()
+        assert resume.template_version == 'edited-template'
@@ -1,10 +1,10 @@
-from app import app, db
+from app import app
+from flask_migrate import upgrade
 from models import UserProfile
 
 with app.app_context():
-    # This is a hacky way to update schema in dev without migrations
-    # It attempts to create tables that don't exist
-    db.create_all()
+    # Applies any pending Flask-Migrate revisions (same as `flask db upgrade`)
+    upgrade()
     print("Database schema updated!")
     
     # Verify UserProfile table exists
@@ -8,6 +8,9 @@ const api = axios.create({
     },
 });
 
+// A resume parsed by /parse-resume is sent as { hash } and referenced by resume_hash
+const resumeFields = (resume) => (resume && resume.hash ? { resume_hash: resume.hash } : { resume_text: resume });
+
 export default {
     parseResume(file) {
         const formData = new FormData();
@@ -18,24 +21,65 @@ export default {
             },
         });
     },
-    analyzeGap(resumeText, jdText) {
-        return api.post('/analyze-gap', { resume_text: resumeText, jd_text: jdText });
+    analyzeGap(resume, jdText) {
+        return api.post('/analyze-gap', { ...resumeFields(resume), jd_text: jdText });
+    },
+    scoreResume(resume, jdText) {
+        return api.post('/score-resume', { ...resumeFields(resume), jd_text: jdText });
     },
-    scoreResume(resumeText, jdText) {
-        return api.post('/score-resume', { resume_text: resumeText, jd_text: jdText });
+    analyzeAndScore(resume, jdText) {
+        return api.post('/analyze-and-score', { ...resumeFields(resume), jd_text: jdText });
     },
     generatePdf(data) {
         return api.post('/generate-pdf', data, {
             responseType: 'blob',
         });
     },
-    tailorResume(resumeText, jdText, userAnswers) {
+    tailorResume(resume, jdText, userAnswers) {
         return api.post('/tailor-resume', {
-            resume_text: resumeText,
+            ...resumeFields(resume),
             jd_text: jdText,
             user_answers: userAnswers
         });
     },
+    // Streams tailoring over Server-Sent Events. onEvent(type, data) sees each
+    // 'item' and 'section' as Gemini completes it; resolves with the 'result' payload.
+    async tailorResumeStream(resume, jdText, userAnswers, applicationId, onEvent) {
+        const response = await fetch(`${api.defaults.baseURL}/tailor-resume/stream`, {
+            method: 'POST',
+            credentials: 'include',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                ...resumeFields(resume),
+                jd_text: jdText,
+                user_answers: userAnswers,
+                application_id: applicationId
+            })
+        });
+        if (!response.ok) {
+            throw new Error(`Tailoring failed with status ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                const type = block.match(/^event: (.*)$/m)?.[1];
+                const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] || 'null');
+                if (type === 'error') throw new Error(data.error);
+                if (type === 'result') return data;
+                onEvent?.(type, data);
+            }
+        }
+        throw new Error('Tailoring stream ended without a result');
+    },
     compileLatex(latexCode) {
         return api.post('/compile-latex', { latex_code: latexCode }, {
             responseType: 'blob',
@@ -56,6 +100,13 @@ export default {
     getApplications() {
         return api.get('/applications');
     },
+    // Paginated listing: { limit, cursor, status, company, since, until, q, fields }
+    listApplications(params) {
+        return api.get('/applications', { params });
+    },
+    rankApplications(resume, limit = 20) {
+        return api.post('/applications/rank', { ...resumeFields(resume), limit });
+    },
     // Phase 2: Profile & Auto-Apply
     getProfile() {
         return api.get('/profile');
@@ -76,6 +127,23 @@ export default {
             headless: headless
         });
     },
+    // Run status: { status: queued|running|done|failed|cancelled, outcome, log, error }
+    getAutoApplyRun(runId) {
+        return api.get(`/auto-apply/${runId}`);
+    },
+    cancelAutoApplyRun(runId) {
+        return api.post(`/auto-apply/${runId}/cancel`);
+    },
+    // Queues one run per application; poll getAutoApplyBatch for { total, finished, progress, counts, runs }
+    batchAutoApply(applicationIds, headless = true) {
+        return api.post('/auto-apply/batch', { application_ids: applicationIds, headless });
+    },
+    getAutoApplyBatch(batchId) {
+        return api.get(`/auto-apply/batch/${batchId}`);
+    },
+    cancelAutoApplyBatch(batchId) {
+        return api.post(`/auto-apply/batch/${batchId}/cancel`);
+    },
     // Convenience methods
     get(url) {
         return api.get(url);